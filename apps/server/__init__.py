@@ -10,6 +10,9 @@ from apps.server.routes.web import create_web_blueprint
 from apps.server.services.game_data_receiver import GameDataReceiver
 from apps.server.services.server_game_state import ServerGameStateService
 
+# Largest request body accepted from clients, before any wire decompression
+MAX_REQUEST_BYTES = 2 * 1024 * 1024
+
 
 def create_app(
     show_table_cards=True,
@@ -38,6 +41,7 @@ def create_app(
         static_folder=static_dir,
     )
     app.secret_key = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
+    app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BYTES
     CORS(app, origins="*")
 
     game_state_service = ServerGameStateService()
@@ -6,6 +6,12 @@ from flask import Blueprint, jsonify, request
 from loguru import logger
 
 from apps.server.utils.game_data_formatter import format_game_data_for_web
+from apps.shared.protocol.wire_codec import (
+    DEFLATE_JSON_CONTENT_TYPE,
+    SUPPORTED_CONTENT_TYPES,
+    WireDecodeError,
+    decode_message,
+)
 
 
 def create_api_blueprint(
@@ -150,17 +156,31 @@ def create_api_blueprint(
             }
         )
 
-    @blueprint.route("/api/client/update", methods=["POST"])
-    def update_game_state():
+    def handle_client_post(operation):
         try:
-            data = request.get_json()
+            # Decode the body once, whichever format the client negotiated
+            if request.mimetype == DEFLATE_JSON_CONTENT_TYPE:
+                try:
+                    data = decode_message(request.get_data())
+                except WireDecodeError as e:
+                    return jsonify({"error": f"Invalid wire body: {e}"}), 400
+            else:
+                data = request.get_json(silent=True)
             if not data:
                 return jsonify({"error": "JSON data required"}), 400
 
-            response = game_data_receiver.handle_client_message(json.dumps(data))
+            response = game_data_receiver.handle_client_data(data)
 
             if response and response.status == "success":
-                return jsonify({"status": "success", "message": response.message})
+                return jsonify({"status": "success", "message": response.message,
+                                "resync_windows": response.resync_windows})
+
+            if response and response.status == "resync":
+                return (
+                    jsonify({"status": "resync", "message": response.message,
+                             "resync_windows": response.resync_windows}),
+                    409,
+                )
 
             return (
                 jsonify(
@@ -173,7 +193,19 @@ def create_api_blueprint(
             )
 
         except Exception as e:
-            logger.error(f"Error in game state update: {str(e)}")
+            logger.error(f"Error in {operation}: {str(e)}")
             return jsonify({"error": str(e)}), 500
 
+    @blueprint.route("/api/client/formats")
+    def get_client_formats():
+        return jsonify({"content_types": SUPPORTED_CONTENT_TYPES})
+
+    @blueprint.route("/api/client/update", methods=["POST"])
+    def update_game_state():
+        return handle_client_post("game state update")
+
+    @blueprint.route("/api/client/batch", methods=["POST"])
+    def update_game_state_batch():
+        return handle_client_post("game state batch")
+
     return blueprint
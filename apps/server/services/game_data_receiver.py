@@ -4,7 +4,7 @@ from loguru import logger
 
 from apps.server.services.server_game_state import ServerGameStateService
 from apps.shared.protocol.message_protocol import ServerResponseMessage, MessageParser, \
-    GameUpdateMessage, TableRemovalMessage
+    GameUpdateMessage, TableRemovalMessage, BatchUpdateMessage
 
 
 class GameDataReceiver:
@@ -13,19 +13,31 @@ class GameDataReceiver:
 
 
     def handle_client_message(self, message_json: str) -> Optional[ServerResponseMessage]:
-        """Process incoming message from client and return response if needed."""
+        """Process incoming JSON message from client and return response if needed."""
+        message = MessageParser.parse_message(message_json)
+        if message is None:
+            logger.error(f"Failed to parse message: {message_json}")
+            return MessageParser.create_response("error", "Invalid message format")
+        return self._handle_message(message)
+
+    def handle_client_data(self, data: dict) -> Optional[ServerResponseMessage]:
+        """Process a message the route already decoded (JSON or wire body) without parsing it again."""
+        message = MessageParser.parse_data(data) if isinstance(data, dict) else None
+        if message is None:
+            logger.error(f"Failed to parse message: {str(data)[:200]}")
+            return MessageParser.create_response("error", "Invalid message format")
+        return self._handle_message(message)
+
+    def _handle_message(self, message) -> ServerResponseMessage:
         try:
-            message = MessageParser.parse_message(message_json)
-            
-            if message is None:
-                logger.error(f"Failed to parse message: {message_json}")
-                return MessageParser.create_response("error", "Invalid message format")
-
             if isinstance(message, GameUpdateMessage):
                 return self._handle_game_update(message)
 
             elif isinstance(message, TableRemovalMessage):
                 return self._handle_table_removal(message)
+
+            elif isinstance(message, BatchUpdateMessage):
+                return self._handle_batch_update(message)
             
             else:
                 logger.warning(f"Unknown message type received: {message}")
@@ -39,7 +51,12 @@ class GameDataReceiver:
         """Handle game state update from client."""
         try:
             # Update game state directly - no enhancement needed as client sends detection_interval
-            self.game_state_service.update_game_state(message)
+            if not self.game_state_service.update_game_state(message):
+                logger.info(f"🔁 Resync - Client: {message.client_id} | Window: {message.window_name} | "
+                            f"Base version: {message.base_version}")
+                return MessageParser.create_response(
+                    "resync", "Delta base version mismatch", resync_windows=[message.window_name]
+                )
 
             # Log received data summary for debugging
             game_data = message.game_data
@@ -54,6 +71,9 @@ class GameDataReceiver:
                 f"Window: {message.window_name}"
             ]
 
+            if message.is_delta:
+                log_parts.append(f"Delta: {len(game_data)} changed, {len(message.removed_keys)} removed")
+
             if player_cards_str:
                 log_parts.append(f"Cards: {player_cards_str}")
 
@@ -95,6 +115,25 @@ class GameDataReceiver:
             return MessageParser.create_response("error", f"Removal failed: {str(e)}")
 
 
+    def _handle_batch_update(self, message: BatchUpdateMessage) -> ServerResponseMessage:
+        """Handle every update and removal of one client detection cycle in a single state change."""
+        try:
+            updated_count, removed_count, resync_windows = self.game_state_service.apply_batch(
+                message.updates, message.removals
+            )
+
+            logger.info(f"📦 Batch - Client: {message.client_id} | Updated: {updated_count} | "
+                        f"Removed: {removed_count} | Resync: {len(resync_windows)}")
+
+            return MessageParser.create_response(
+                "success", f"Updated {updated_count} tables, removed {removed_count} tables",
+                resync_windows=resync_windows
+            )
+
+        except Exception as e:
+            logger.error(f"Error applying batch for {message.client_id}: {str(e)}")
+            return MessageParser.create_response("error", f"Batch failed: {str(e)}")
+
     def handle_client_disconnect(self, client_id: str) -> None:
         """Handle client disconnection."""
         try:
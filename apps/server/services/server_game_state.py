@@ -1,8 +1,9 @@
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
 from loguru import logger
-from apps.shared.protocol.message_protocol import GameUpdateMessage
+from apps.shared.protocol.message_protocol import GameUpdateMessage, TableRemovalMessage
 
 
 class ServerGameStateService:
@@ -10,66 +11,144 @@ class ServerGameStateService:
         # client_id -> window_name -> game_data_with_metadata
         self.client_states: Dict[str, Dict[str, Dict[str, Any]]] = {}
         self.connected_clients: Dict[str, datetime] = {}
+        # Re-entrant so a batch can register clients and remove tables while holding it
+        self._lock = threading.RLock()
 
     def register_client(self, client_id: str) -> None:
         logger.info(f"Registering client {client_id}")
-        self.connected_clients[client_id] = datetime.now()
-        if client_id not in self.client_states:
-            self.client_states[client_id] = {}
+        with self._lock:
+            self.connected_clients[client_id] = datetime.now()
+            if client_id not in self.client_states:
+                self.client_states[client_id] = {}
 
     def disconnect_client(self, client_id: str) -> None:
         logger.info(f"Disconnecting client {client_id}")
-        if client_id in self.connected_clients:
-            del self.connected_clients[client_id]
-        if client_id in self.client_states:
-            del self.client_states[client_id]
+        with self._lock:
+            if client_id in self.connected_clients:
+                del self.connected_clients[client_id]
+            if client_id in self.client_states:
+                del self.client_states[client_id]
 
-    def update_game_state(self, message: GameUpdateMessage) -> None:
-        client_id = message.client_id
-        window_name = message.window_name
+    def update_game_state(self, message: GameUpdateMessage) -> bool:
+        """Store a full update or patch the stored table with a delta.
 
-        # Ensure client is registered (reuses existing registration logic)
-        self.register_client(client_id)
+        Returns:
+            False when a delta's base_version does not match the stored table (client must resync)
+        """
+        with self._lock:
+            entry = self._build_table_state(message, self._stored_table(message.client_id, message.window_name))
+            if entry is None:
+                return False
+            # Ensure client is registered (reuses existing registration logic)
+            self.register_client(message.client_id)
+            self.client_states[message.client_id][message.window_name] = entry
+            return True
+
+    def apply_batch(self, updates: List[GameUpdateMessage],
+                    removals: List[TableRemovalMessage]) -> Tuple[int, int, List[str]]:
+        """Apply one detection cycle's updates and removals as a single step.
+
+        Every new table entry is built before anything is stored, so a malformed update
+        raises with the stored state untouched instead of leaving half a batch applied.
+
+        Returns:
+            (updated table count, removed table count, windows whose delta needs a full resync)
+        """
+        resync_windows = []
+        with self._lock:
+            staged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+            for message in updates:
+                key = (message.client_id, message.window_name)
+                stored = staged[key] if key in staged else self._stored_table(*key)
+                entry = self._build_table_state(message, stored)
+                if entry is None:
+                    resync_windows.append(message.window_name)
+                else:
+                    staged[key] = entry
+
+            removed_tables = [(message.client_id, str(window_name))
+                              for message in removals for window_name in message.removed_windows]
+
+            # Nothing below can fail half way
+            for (client_id, window_name), entry in staged.items():
+                self.register_client(client_id)
+                self.client_states[client_id][window_name] = entry
+
+            removed_count = 0
+            for client_id, window_name in removed_tables:
+                if self.remove_client_window(client_id, window_name):
+                    removed_count += 1
+
+        return len(updates) - len(resync_windows), removed_count, resync_windows
+
+    def _stored_table(self, client_id: str, window_name: str) -> Optional[Dict[str, Any]]:
+        return self.client_states.get(client_id, {}).get(window_name)
+
+    @staticmethod
+    def _build_table_state(message: GameUpdateMessage,
+                           stored: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """New stored entry of a table, or None when a delta does not apply to the stored version.
+
+        Raises:
+            ValueError: game_data is not a dictionary
+        """
+        if not isinstance(message.game_data, dict):
+            raise ValueError(f"game_data of {message.window_name} is not an object")
+
+        if message.is_delta:
+            if stored is None or stored.get('version') != message.base_version:
+                return None
+            # Patch a copy so readers holding the previous entry never see it change
+            game_data = {**stored, **message.game_data}
+            for key in message.removed_keys:
+                game_data.pop(key, None)
+        else:
+            game_data = message.game_data
 
         # Update or create game state with metadata
-        self.client_states[client_id][window_name] = {
-            'client_id': client_id,
-            'window_name': window_name,
+        return {
+            **game_data,  # Include all game data fields
+            'client_id': message.client_id,
+            'window_name': message.window_name,
             'last_update': datetime.now().isoformat(),
             'detection_interval': message.detection_interval,  # Include detection interval from message
-            **message.game_data  # Include all game data fields
+            'version': message.version
         }
 
     def get_all_game_states(self) -> Dict[str, Any]:
         all_detections = []
         latest_update_str = None
-        
-        for client_id, windows in self.client_states.items():
-            for window_name, game_data in windows.items():
-                all_detections.append(game_data)
-                game_update = game_data.get('last_update')
-                if game_update and (latest_update_str is None or game_update > latest_update_str):
-                    latest_update_str = game_update
-        
+
+        with self._lock:
+            for client_id, windows in self.client_states.items():
+                for window_name, game_data in windows.items():
+                    all_detections.append(game_data)
+                    game_update = game_data.get('last_update')
+                    if game_update and (latest_update_str is None or game_update > latest_update_str):
+                        latest_update_str = game_update
+
         return {
             'detections': all_detections,
             'last_update': latest_update_str if latest_update_str else datetime.now().isoformat()
         }
 
     def get_client_game_states(self, client_id: str) -> List[Dict[str, Any]]:
-        if client_id not in self.client_states:
-            return []
-        
-        return list(self.client_states[client_id].values())
+        with self._lock:
+            if client_id not in self.client_states:
+                return []
+
+            return list(self.client_states[client_id].values())
 
     def get_connected_clients(self) -> List[str]:
-        return list(self.connected_clients.keys())
+        with self._lock:
+            return list(self.connected_clients.keys())
 
     def remove_client_window(self, client_id: str, window_name: str) -> bool:
-        if client_id in self.client_states and window_name in self.client_states[client_id]:
-            del self.client_states[client_id][window_name]
-            return True
-        return False
+        with self._lock:
+            if client_id in self.client_states and window_name in self.client_states[client_id]:
+                del self.client_states[client_id][window_name]
+                return True
+            return False
 
     def cleanup_stale_tables(self, stale_threshold_minutes: int = 1) -> Dict[str, int]:
         """Remove tables that haven't updated recently. Remove clients with no tables left.
@@ -85,33 +164,34 @@ class ServerGameStateService:
         tables_removed = 0
         clients_to_check = []
 
-        # Phase 1: Remove stale tables
-        for client_id, windows in list(self.client_states.items()):
-            for window_name, window_data in list(windows.items()):
-                last_update_str = window_data.get('last_update')
-                if not last_update_str:
-                    # No timestamp - shouldn't happen, but skip to be safe
-                    continue
-
-                last_update = datetime.fromisoformat(last_update_str)
-
-                if now - last_update > threshold:
-                    logger.info(
-                        f"🧹 Removing stale table: {client_id}/{window_name} "
-                        f"(last update: {last_update.strftime('%Y-%m-%d %H:%M:%S')})"
-                    )
-                    self.remove_client_window(client_id, window_name)
-                    tables_removed += 1
-
-            clients_to_check.append(client_id)
-
-        # Phase 2: Remove clients with no tables left
-        clients_removed = 0
-        for client_id in clients_to_check:
-            if client_id in self.client_states and len(self.client_states[client_id]) == 0:
-                logger.info(f"🔌 Removing client with no tables: {client_id}")
-                self.disconnect_client(client_id)
-                clients_removed += 1
+        with self._lock:
+            # Phase 1: Remove stale tables
+            for client_id, windows in list(self.client_states.items()):
+                for window_name, window_data in list(windows.items()):
+                    last_update_str = window_data.get('last_update')
+                    if not last_update_str:
+                        # No timestamp - shouldn't happen, but skip to be safe
+                        continue
+
+                    last_update = datetime.fromisoformat(last_update_str)
+
+                    if now - last_update > threshold:
+                        logger.info(
+                            f"🧹 Removing stale table: {client_id}/{window_name} "
+                            f"(last update: {last_update.strftime('%Y-%m-%d %H:%M:%S')})"
+                        )
+                        self.remove_client_window(client_id, window_name)
+                        tables_removed += 1
+
+                clients_to_check.append(client_id)
+
+            # Phase 2: Remove clients with no tables left
+            clients_removed = 0
+            for client_id in clients_to_check:
+                if client_id in self.client_states and len(self.client_states[client_id]) == 0:
+                    logger.info(f"🔌 Removing client with no tables: {client_id}")
+                    self.disconnect_client(client_id)
+                    clients_removed += 1
 
         return {
             'tables_removed': tables_removed,
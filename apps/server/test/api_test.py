@@ -0,0 +1,62 @@
+import unittest
+import zlib
+
+from apps.server import create_app
+from apps.shared.protocol.message_protocol import BatchUpdateMessage
+from apps.shared.protocol.wire_codec import DEFLATE_JSON_CONTENT_TYPE, MAX_DECODED_BYTES, encode_message
+from apps.server.test.server_game_state_test import removal, update
+
+
+def batch(updates, removals=()):
+    return BatchUpdateMessage(type='batch_update', client_id="c1", timestamp="2024-01-01T00:00:00",
+                              updates=list(updates), removals=list(removals)).to_dict()
+
+
+class ClientBatchApiTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.service = self.app.extensions["game_state_service"]
+
+    def windows(self):
+        return sorted(state['window_name'] for state in self.service.get_client_game_states("c1"))
+
+    def test_batch_updates_and_removes_tables(self):
+        self.client.post("/api/client/batch", json=batch([update("w1", {}), update("w2", {})]))
+
+        response = self.client.post("/api/client/batch", json=batch([update("w3", {})], [removal("w1")]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['status'], "success")
+        self.assertEqual(self.windows(), ["w2", "w3"])
+
+    def test_failed_batch_stores_nothing(self):
+        response = self.client.post("/api/client/batch",
+                                    json=batch([update("w1", {}), update("w2", {}), update("w3", [1, 2])]))
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.get_json()['status'], "error")
+        self.assertEqual(self.windows(), [])
+
+    def test_unmatched_delta_is_listed_for_resync(self):
+        response = self.client.post("/api/client/batch",
+                                    json=batch([update("w1", {}), update("w2", {}, version=3, base_version=2)]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['resync_windows'], ["w2"])
+        self.assertEqual(self.windows(), ["w1"])
+
+    def test_wire_body_inflating_past_limit_is_rejected(self):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+        bomb = compressor.compress(b' ' * (MAX_DECODED_BYTES + 1)) + compressor.flush()
+
+        response = self.client.post("/api/client/batch", data=encode_message({})[:4] + bomb,
+                                    content_type=DEFLATE_JSON_CONTENT_TYPE)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.windows(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
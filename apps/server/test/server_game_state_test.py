@@ -0,0 +1,92 @@
+import unittest
+
+from apps.server.services.server_game_state import ServerGameStateService
+from apps.shared.protocol.message_protocol import GameUpdateMessage, TableRemovalMessage
+
+
+def update(window_name, game_data, version=1, base_version=None, removed_keys=None, client_id="c1"):
+    return GameUpdateMessage(type='game_update', client_id=client_id, window_name=window_name,
+                             timestamp="2024-01-01T00:00:00", game_data=game_data, version=version,
+                             base_version=base_version, removed_keys=removed_keys or [])
+
+
+def removal(*window_names, client_id="c1"):
+    return TableRemovalMessage(type='table_removal', client_id=client_id, removed_windows=list(window_names),
+                               timestamp="2024-01-01T00:00:00")
+
+
+class ServerGameStateDeltaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = ServerGameStateService()
+        self.service.update_game_state(update("w1", {'street': 'flop', 'pot': 1, 'moves': ['bet']}, version=1))
+
+    def stored(self):
+        return self.service.get_client_game_states("c1")[0]
+
+    def test_delta_patches_the_stored_table(self):
+        before = self.stored()
+
+        self.assertTrue(self.service.update_game_state(
+            update("w1", {'pot': 3}, version=2, base_version=1, removed_keys=['moves'])))
+
+        stored = self.stored()
+        self.assertEqual((stored['street'], stored['pot'], stored['version']), ('flop', 3, 2))
+        self.assertNotIn('moves', stored)
+        # Readers holding the previous entry never see it change
+        self.assertEqual(before['pot'], 1)
+
+    def test_delta_needs_the_matching_base(self):
+        self.assertFalse(self.service.update_game_state(update("w1", {'pot': 3}, version=3, base_version=2)))
+        self.assertFalse(self.service.update_game_state(update("w2", {'pot': 3}, version=3, base_version=1)))
+
+        self.assertEqual((self.stored()['pot'], self.stored()['version']), (1, 1))
+        self.assertEqual(len(self.service.get_client_game_states("c1")), 1)
+
+
+class ServerGameStateBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = ServerGameStateService()
+
+    def tables(self, client_id="c1"):
+        return {state['window_name']: state for state in self.service.get_client_game_states(client_id)}
+
+    def test_batch_applies_updates_and_removals(self):
+        self.service.update_game_state(update("old", {'street': 'flop'}))
+
+        result = self.service.apply_batch([update("w1", {'street': 'preflop'}), update("w2", {'street': 'turn'})],
+                                          [removal("old", "never_sent")])
+
+        self.assertEqual(result, (2, 1, []))
+        self.assertEqual({name: state['street'] for name, state in self.tables().items()},
+                         {"w1": "preflop", "w2": "turn"})
+        self.assertEqual(self.tables()["w1"]['version'], 1)
+
+    def test_malformed_update_leaves_state_untouched(self):
+        self.service.update_game_state(update("old", {'street': 'flop'}))
+        before = self.tables()
+
+        with self.assertRaises(ValueError):
+            self.service.apply_batch([update("w1", {'street': 'preflop'}), update("w2", {'street': 'turn'}),
+                                      update("w3", "not a dict")], [removal("old")])
+
+        self.assertEqual(self.tables(), before)
+
+    def test_mismatched_delta_is_reported_and_the_rest_applied(self):
+        self.service.update_game_state(update("w1", {'street': 'flop', 'moves': []}, version=4))
+
+        result = self.service.apply_batch([
+            update("w1", {'street': 'turn'}, version=5, base_version=4, removed_keys=['moves']),
+            update("w2", {'street': 'river'}, version=9, base_version=8),
+        ], [])
+
+        self.assertEqual(result, (1, 0, ["w2"]))
+        tables = self.tables()
+        self.assertEqual((tables["w1"]['street'], tables["w1"]['version']), ("turn", 5))
+        self.assertNotIn('moves', tables["w1"])
+        self.assertNotIn("w2", tables)
+
+
+if __name__ == '__main__':
+    unittest.main()
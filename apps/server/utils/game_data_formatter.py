@@ -12,6 +12,7 @@ def format_game_data_for_web(game_data: Dict[str, Any]) -> Dict[str, Any]:
         'player_cards': _format_cards_for_web(game_data.get('player_cards', [])),
         'table_cards': _format_cards_for_web(game_data.get('table_cards', [])),
         'positions': _format_positions_for_web(game_data.get('positions', [])),
+        'bids': game_data.get('bids', []),
         'moves': game_data.get('moves', []),
         'street': game_data.get('street', 'unknown'),
         'solver_link': game_data.get('solver_link'),
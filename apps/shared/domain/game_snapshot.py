@@ -1,6 +1,7 @@
 from collections import defaultdict
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Optional, Tuple
 
+from shared.domain.detected_bid import DetectedBid
 from shared.domain.detection import Detection
 from shared.domain.moves import MoveType
 from shared.domain.position import Position
@@ -14,12 +15,13 @@ class GameSnapshot:
             player_cards: Optional[List[Detection]] = None,
             table_cards: Optional[List[Detection]] = None,
             positions: Optional[Dict[int, Detection]] = None,
-            bids: Optional[List[Any]] = None,
+            bids: Optional[Dict[int, DetectedBid]] = None,
             is_player_move: bool = False,
             actions: Optional[Dict[int, List[Detection]]] = None,
             moves: Optional[Dict[Street, List[Tuple[Position, MoveType]]]] = None,
             hero_position: Optional[str] = None,
-            rfi_action: Optional[str] = None
+            rfi_action: Optional[str] = None,
+            detector_timings: Optional[Dict[str, float]] = None
     ):
         self.player_cards = player_cards or []
         self.table_cards = table_cards or []
@@ -30,6 +32,7 @@ class GameSnapshot:
         self.moves = moves or defaultdict(list)
         self.hero_position = hero_position
         self.rfi_action = rfi_action
+        self.detector_timings = detector_timings or {}  # detector name -> ms, only detectors that ran
 
     @property
     def has_cards(self) -> bool:
@@ -103,6 +106,10 @@ class GameSnapshot:
                     {'player': i+1, 'player_label': f'Player {i+1}', 'name': p.template_name, 'is_main_player': i==0}
                     for i, p in enumerate(self.positions.values())
                 ],
+                'bids': [
+                    {'player': seat, 'amount': bid.amount, 'amount_text': bid.amount_text}
+                    for seat, bid in sorted(self.bids.items())
+                ],
                 'moves': self._format_moves_for_protocol(),
                 'street': self.get_street_display(),
                 'solver_link': FlopHeroLinkService.generate_link(self),
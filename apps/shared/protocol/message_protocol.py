@@ -1,7 +1,7 @@
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 
 from apps.shared.domain.detection import Detection
 
@@ -14,6 +14,9 @@ class GameUpdateMessage:
     timestamp: str
     game_data: Dict[str, Any]
     detection_interval: int = 3  # Default to 3 seconds matching client default
+    version: Optional[int] = None  # Table state version this message produces
+    base_version: Optional[int] = None  # Set on deltas: game_data only holds keys changed since this version
+    removed_keys: List[str] = field(default_factory=list)  # Delta only: keys dropped since base_version
 
     @classmethod
     def from_dict(cls, data: dict) -> 'GameUpdateMessage':
@@ -23,11 +26,18 @@ class GameUpdateMessage:
             window_name=data['window_name'],
             timestamp=data['timestamp'],
             game_data=data['game_data'],
-            detection_interval=data.get('detection_interval', 3)  # Default matching client default
+            detection_interval=data.get('detection_interval', 3),  # Default matching client default
+            version=data.get('version'),
+            base_version=data.get('base_version'),
+            removed_keys=data.get('removed_keys', [])
         )
 
+    @property
+    def is_delta(self) -> bool:
+        return self.base_version is not None
+
     def to_dict(self) -> dict:
-        return {
+        data = {
             'type': self.type,
             'client_id': self.client_id,
             'window_name': self.window_name,
@@ -35,6 +45,12 @@ class GameUpdateMessage:
             'game_data': self.game_data,
             'detection_interval': self.detection_interval
         }
+        if self.version is not None:
+            data['version'] = self.version
+        if self.is_delta:
+            data['base_version'] = self.base_version
+            data['removed_keys'] = self.removed_keys
+        return data
 
     def to_json(self) -> str:
         return json.dumps(self.to_dict())
@@ -68,25 +84,68 @@ class TableRemovalMessage:
         return json.dumps(self.to_dict())
 
 
+@dataclass
+class BatchUpdateMessage:
+    """Every game update and table removal of one client detection cycle, sent as one request."""
+    type: str  # "batch_update"
+    client_id: str
+    timestamp: str
+    updates: List[GameUpdateMessage] = field(default_factory=list)
+    removals: List[TableRemovalMessage] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BatchUpdateMessage':
+        return cls(
+            type=data['type'],
+            client_id=data['client_id'],
+            timestamp=data['timestamp'],
+            updates=[GameUpdateMessage.from_dict(update) for update in data.get('updates', [])],
+            removals=[TableRemovalMessage.from_dict(removal) for removal in data.get('removals', [])]
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'type': self.type,
+            'client_id': self.client_id,
+            'timestamp': self.timestamp,
+            'updates': [update.to_dict() for update in self.updates],
+            'removals': [removal.to_dict() for removal in self.removals]
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+
 @dataclass
 class ServerResponseMessage:
     type: str  # "response"
     status: str  # "success" or "error"
     message: str
     timestamp: str
+    resync_windows: List[str] = field(default_factory=list)  # Tables whose delta did not apply
 
     def to_dict(self) -> dict:
-        return {
+        data = {
             'type': self.type,
             'status': self.status,
             'message': self.message,
             'timestamp': self.timestamp
         }
+        if self.resync_windows:
+            data['resync_windows'] = self.resync_windows
+        return data
 
     def to_json(self) -> str:
         return json.dumps(self.to_dict())
 
 
+def diff_game_data(previous: Dict[str, Any], current: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """Top-level keys of current that differ from previous, and keys of previous that current dropped."""
+    changed = {key: value for key, value in current.items() if key not in previous or previous[key] != value}
+    removed_keys = [key for key in previous if key not in current]
+    return changed, removed_keys
+
+
 class GameDataSerializer:
     @staticmethod
     def serialize_detection(detection: Detection) -> dict:
@@ -124,25 +183,35 @@ class MessageParser:
     @staticmethod
     def parse_message(message_json: str) -> Optional[Any]:
         try:
-            data = json.loads(message_json)
+            return MessageParser.parse_data(json.loads(message_json))
+        except json.JSONDecodeError:
+            return None
+
+    @staticmethod
+    def parse_data(data: dict) -> Optional[Any]:
+        """Build a message from an already decoded dictionary (JSON or wire body)."""
+        try:
             message_type = data.get('type')
-            
+
             if message_type == 'game_update':
                 return GameUpdateMessage.from_dict(data)
             elif message_type == 'table_removal':
                 return TableRemovalMessage.from_dict(data)
+            elif message_type == 'batch_update':
+                return BatchUpdateMessage.from_dict(data)
             else:
                 return None
-        except (json.JSONDecodeError, KeyError) as e:
+        except (KeyError, TypeError, AttributeError):
             return None
 
     @staticmethod
-    def create_response(status: str, message: str) -> ServerResponseMessage:
+    def create_response(status: str, message: str, resync_windows: Optional[List[str]] = None) -> ServerResponseMessage:
         return ServerResponseMessage(
             type='response',
             status=status,
             message=message,
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            resync_windows=resync_windows or []
         )
 
 
@@ -0,0 +1,88 @@
+import json
+import zlib
+from typing import List, Optional
+
+# Content types offered for client -> server messages, preferred first
+DEFLATE_JSON_CONTENT_TYPE = "application/x-poker-json-deflate"
+JSON_CONTENT_TYPE = "application/json"
+SUPPORTED_CONTENT_TYPES = [DEFLATE_JSON_CONTENT_TYPE, JSON_CONTENT_TYPE]
+
+MAGIC = b"PW"
+WIRE_VERSION = 1
+FLAG_COMPRESSED = 0x01
+COMPRESS_LEVEL = 1
+_WBITS = -15  # Raw deflate, the frame header already identifies the body
+# Bodies arrive from untrusted clients, cap what a compressed body may inflate to
+MAX_DECODED_BYTES = 8 * 1024 * 1024
+
+# Field names and frequent values preloaded as the deflate dictionary, so each occurrence
+# costs a short back-reference instead of its text. There is no key table: an uncompressed
+# body still spells out every field name. Changing it needs a new WIRE_VERSION.
+PRESET_DICTIONARY_STRINGS = (
+    # Message fields and types
+    'type', 'client_id', 'window_name', 'timestamp', 'game_data', 'detection_interval',
+    'version', 'base_version', 'removed_keys', 'removed_windows', 'updates', 'removals',
+    'game_update', 'table_removal', 'batch_update',
+    # game_data fields
+    'player_cards_string', 'player_cards', 'table_cards_string', 'table_cards', 'positions',
+    'bids', 'moves', 'street', 'solver_link', 'hero_position', 'rfi_action',
+    'name', 'display', 'score', 'player', 'player_label', 'is_main_player', 'amount', 'amount_text',
+    'action',
+)
+_ZDICT = ''.join(f'"{text}":' for text in PRESET_DICTIONARY_STRINGS).encode('utf-8')
+
+
+class WireDecodeError(ValueError):
+    """A body is not a valid wire encoded message"""
+    pass
+
+
+def encode_message(data: dict, compress: bool = True) -> bytes:
+    """
+    Encode a message dictionary (as built by the protocol's to_dict) as framed, deflated compact JSON.
+
+    The body is compact UTF-8 JSON, deflated against the preset dictionary of field names when
+    compress is set. Both directions stay in C (json, zlib), unlike a hand-rolled tagged format.
+    Only the deflate step shrinks field names; without it the body is just JSON minus whitespace.
+    """
+    body = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    flags = 0
+    if compress:
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, _WBITS, zdict=_ZDICT)
+        body = compressor.compress(body) + compressor.flush()
+        flags |= FLAG_COMPRESSED
+
+    return MAGIC + bytes((WIRE_VERSION, flags)) + body
+
+
+def decode_message(payload: bytes) -> dict:
+    """Decode a framed wire body straight to the message dictionary (one parse)."""
+    if len(payload) < 4 or payload[:2] != MAGIC:
+        raise WireDecodeError("Not a wire encoded message")
+    if payload[2] != WIRE_VERSION:
+        raise WireDecodeError(f"Unsupported wire version {payload[2]}")
+
+    body = payload[4:]
+    try:
+        if payload[3] & FLAG_COMPRESSED:
+            decompressor = zlib.decompressobj(_WBITS, zdict=_ZDICT)
+            body = decompressor.decompress(body, MAX_DECODED_BYTES)
+            if decompressor.unconsumed_tail:
+                raise WireDecodeError(f"Body inflates past {MAX_DECODED_BYTES} bytes")
+            if not decompressor.eof:
+                raise WireDecodeError("Truncated compressed body")
+        data = json.loads(body)
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise WireDecodeError(f"Corrupt body: {e}")
+
+    if not isinstance(data, dict):
+        raise WireDecodeError("Body is not a message object")
+    return data
+
+
+def negotiate_content_type(offered: Optional[List[str]]) -> str:
+    """First of our supported content types that the server offers, JSON when it offers none we know."""
+    for content_type in SUPPORTED_CONTENT_TYPES:
+        if offered and content_type in offered:
+            return content_type
+    return JSON_CONTENT_TYPE
@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Health of one server: closed (sending), open (skipping) or half-open (one probe allowed).
+
+    `failure_threshold` consecutive failures open the circuit for `open_seconds`. When that
+    passes a single probe request is let through; its success closes the circuit, its failure
+    reopens it for twice as long, up to `max_open_seconds`.
+    """
+
+    def __init__(self, failure_threshold: int = 3, open_seconds: float = 2.0, max_open_seconds: float = 60.0,
+                 window: int = 50):
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._open_for = open_seconds
+        self._open_until = 0.0
+        self._probe_in_flight = False
+
+        self._outcomes = deque(maxlen=window)  # True for failures, for the recent error rate
+        self._latencies = deque(maxlen=window)
+        self._requests = 0
+        self._failures = 0
+        self._rejected = 0
+        self._opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def seconds_until_probe(self) -> float:
+        """0 when a request may go out now, otherwise how long the circuit stays open"""
+        with self._lock:
+            if self._state == OPEN:
+                return max(0.0, self._open_until - time.monotonic())
+            return 0.0
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.monotonic() >= self._open_until:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._record(latency, failed=False)
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._open_for = self.open_seconds
+            self._probe_in_flight = False
+
+    def record_failure(self, latency: float) -> None:
+        with self._lock:
+            self._record(latency, failed=True)
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN:
+                # Failed probe: back off exponentially before the next one
+                self._open_for = min(self._open_for * 2, self.max_open_seconds)
+                self._open()
+            elif self._state == CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._open()
+            self._probe_in_flight = False
+
+    def _record(self, latency: float, failed: bool):
+        self._requests += 1
+        self._failures += failed
+        self._outcomes.append(failed)
+        self._latencies.append(latency)
+
+    def _open(self):
+        self._state = OPEN
+        self._open_until = time.monotonic() + self._open_for
+        self._opened += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = len(self._outcomes)
+            return {
+                'state': self._state,
+                'requests': self._requests,
+                'failures': self._failures,
+                'rejected': self._rejected,
+                'opened': self._opened,
+                'consecutive_failures': self._consecutive_failures,
+                'error_rate': sum(self._outcomes) / recent if recent else 0.0,
+                'avg_latency_ms': 1000 * sum(self._latencies) / len(self._latencies) if self._latencies else None,
+                'last_latency_ms': 1000 * self._latencies[-1] if self._latencies else None,
+                'open_for_seconds': self._open_for if self._state != CLOSED else 0.0,
+            }
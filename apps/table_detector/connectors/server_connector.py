@@ -1,12 +1,25 @@
+import itertools
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 import requests
 from loguru import logger
 
-from shared.protocol.message_protocol import GameUpdateMessage
+from shared.protocol.message_protocol import GameUpdateMessage, BatchUpdateMessage, TableRemovalMessage, \
+    diff_game_data
+from shared.protocol.wire_codec import (
+    DEFLATE_JSON_CONTENT_TYPE,
+    JSON_CONTENT_TYPE,
+    encode_message,
+    negotiate_content_type
+)
+from table_detector.connectors.circuit_breaker import CircuitBreaker
+from table_detector.connectors.table_outbox import TableOutbox
+
+WIRE_FORMATS = ('auto', 'json', 'deflate')
 
 
 @dataclass
@@ -16,6 +29,9 @@ class ServerConfig:
     timeout: int = 10
     retry_attempts: int = 1
     enabled: bool = True
+    failure_threshold: int = 3  # Consecutive failures that open the circuit
+    open_seconds: float = 2.0  # First pause before probing an open circuit, doubled per failed probe
+    max_open_seconds: float = 60.0
     
     def __post_init__(self):
         """Validate configuration after initialization."""
@@ -23,6 +39,10 @@ class ServerConfig:
             raise ValueError("Timeout must be > 0")
         if self.retry_attempts < 0:
             raise ValueError("Retry attempts must be >= 0")
+        if self.failure_threshold < 1:
+            raise ValueError("Failure threshold must be >= 1")
+        if self.open_seconds <= 0 or self.max_open_seconds < self.open_seconds:
+            raise ValueError("Open seconds must be > 0 and <= max open seconds")
     
     @classmethod
     def from_url(cls, url: str, **kwargs) -> 'ServerConfig':
@@ -31,101 +51,321 @@ class ServerConfig:
 
 
 class SimpleHttpConnector:
-    """Simple HTTP client for sending data to poker servers with automatic registration."""
-    
-    def __init__(self, server_configs: List[ServerConfig]):
+    """Simple HTTP client for sending data to poker servers with automatic registration.
+
+    With delta updates on, batched game updates only carry the game_data keys that changed
+    since the last version sent to that server. A server that holds a different version
+    answers with resync_windows and gets the full table state back; a failed request makes
+    the next update of its tables full again.
+
+    Bodies go out as JSON or as deflated compact JSON (wire_codec). With wire_format 'auto' each
+    server is asked for its content types at startup; a server that cannot be reached yet is
+    sent JSON and asked again once it has answered a post.
+
+    Messages wait in a per-server TableOutbox that keeps only the newest pending update of
+    each table, drained by one sender thread per server. A slow server therefore gets the
+    freshest state of every table in its next batch rather than a backlog of stale ones.
+
+    Every server also has a CircuitBreaker fed by its posts. After repeated failures its sender
+    stops posting and probes again with exponential backoff. A batch that did not reach the
+    server goes back into the outbox unless something newer for its tables is pending, so the
+    newest state is kept; a dead server only ever holds its own sender thread, never the
+    healthy servers' ones.
+    """
+
+    def __init__(self, server_configs: List[ServerConfig], delta_updates: bool = True, wire_format: str = 'auto'):
         """Initialize with list of server configurations."""
         if not server_configs:
             raise ValueError("At least one server configuration is required")
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"wire_format must be one of {WIRE_FORMATS}")
         
         self.server_configs = [config for config in server_configs if config.enabled]
+        self.delta_updates = delta_updates
+        self.wire_format = wire_format
+        self._content_types: Dict[str, str] = {}  # Server URL -> negotiated content type
+        self._breakers: Dict[str, CircuitBreaker] = {
+            config.url: CircuitBreaker(config.failure_threshold, config.open_seconds, config.max_open_seconds)
+            for config in self.server_configs
+        }
+
+        # Per server URL: (client_id, window_name) -> (version, last full update) sent to it
+        self._sent_tables: Dict[str, Dict[Tuple[str, str], Tuple[int, GameUpdateMessage]]] = {}
+        self._versions = itertools.count(1)  # Never reused, so a stale server entry cannot match
+        self._delta_lock = threading.Lock()
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'User-Agent': 'OmahaPokerClient/1.0'
         })
 
-        # Thread pool for async HTTP requests
-        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="http-sender")
-        
         logger.info(f"🔗 HTTP connector initialized with {len(self.server_configs)} servers:")
         for config in self.server_configs:
             logger.info(f"   - {config.url} (timeout: {config.timeout}s, retries: {config.retry_attempts})")
 
+        if self.wire_format == 'auto':
+            self.negotiate_formats()
+
+        # One latest-wins outbox and sender thread per server, so requests to a server stay in order
+        self._outboxes: Dict[str, TableOutbox] = {config.url: TableOutbox() for config in self.server_configs}
+        self._senders = [
+            threading.Thread(target=self._drain_outbox, args=(config, self._outboxes[config.url]),
+                             name=f"http-sender-{index}", daemon=True)
+            for index, config in enumerate(self.server_configs)
+        ]
+        for sender in self._senders:
+            sender.start()
+
+    def negotiate_formats(self) -> Dict[str, str]:
+        """Ask every server which content types it accepts and pick ours for each."""
+        for config in self.server_configs:
+            self._negotiate_format(config)
+        return dict(self._content_types)
+
+    def _negotiate_format(self, config: ServerConfig) -> Optional[str]:
+        # Not counted by the circuit breaker: it only judges the posts, once per attempt
+        try:
+            endpoint = f"{config.url.rstrip('/')}/api/client/formats"
+            response = self.session.get(endpoint, timeout=config.timeout)
+            # Servers without the endpoint only take JSON
+            offered = response.json().get('content_types') if response.status_code == 200 else None
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.debug(f"Format negotiation with {config.url} failed, sending JSON for now: {str(e)}")
+            return None
+
+        content_type = negotiate_content_type(offered)
+        self._content_types[config.url] = content_type
+        logger.info(f"📦 {config.url} speaks {content_type}")
+        return content_type
+
+    def _content_type(self, config: ServerConfig) -> str:
+        if self.wire_format == 'json':
+            return JSON_CONTENT_TYPE
+        if self.wire_format == 'deflate':
+            return DEFLATE_JSON_CONTENT_TYPE
+        return self._content_types.get(config.url, JSON_CONTENT_TYPE)
+
     def send_game_update(self, game_update: GameUpdateMessage) -> bool:
-        """Send game update to all servers via HTTP POST (async fire-and-forget)."""
+        """Queue a game update for all servers, replacing any pending update of the same table."""
         if not self.server_configs:
             logger.debug("No servers configured - skipping game update")
             return False
 
-        # Submit async tasks for all servers
-        for config in self.server_configs:
-            self.executor.submit(self._send_game_update_async, game_update, config)
-        
-        logger.debug(f"📤 Game update submitted to {len(self.server_configs)} servers (async)")
-        return True
+        for outbox in self._outboxes.values():
+            outbox.put_update(game_update)
 
-    def _send_game_update_async(self, game_update: GameUpdateMessage, config: ServerConfig):
-        """Async worker method to send game update to a single server."""
-        try:
-            endpoint = f"{config.url.rstrip('/')}/api/client/update"
-            self._send_http_request(endpoint, game_update.to_dict(), config, "game update")
-        except Exception as e:
-            logger.debug(f"Game update failed for {config.url}: {str(e)}")
+        logger.debug(f"📤 Game update queued for {len(self.server_configs)} servers (async)")
+        return True
 
     def send_removal_message(self, removal_message) -> bool:
-        """Send table removal message to all servers via HTTP POST (async fire-and-forget)."""
+        """Queue table removals for all servers, dropping pending updates of those tables."""
         if not self.server_configs:
             logger.debug("No servers configured - skipping removal message")
             return False
 
-        # Submit async tasks for all servers
-        for config in self.server_configs:
-            self.executor.submit(self._send_removal_message_async, removal_message, config)
-        
-        logger.debug(f"📤 Removal message submitted to {len(self.server_configs)} servers (async)")
+        for outbox in self._outboxes.values():
+            for window_name in removal_message.removed_windows:
+                outbox.put_removal(removal_message.client_id, window_name)
+
+        logger.debug(f"📤 Removal message queued for {len(self.server_configs)} servers (async)")
         return True
 
-    def _send_removal_message_async(self, removal_message, config: ServerConfig):
-        """Async worker method to send removal message to a single server."""
+    def send_batch(self, batch: BatchUpdateMessage) -> bool:
+        """Queue one detection cycle's updates and removals for all servers (async)."""
+        if not self.server_configs:
+            logger.debug("No servers configured - skipping batch")
+            return False
+
+        for outbox in self._outboxes.values():
+            for update in batch.updates:
+                outbox.put_update(update)
+            for removal in batch.removals:
+                for window_name in removal.removed_windows:
+                    outbox.put_removal(removal.client_id, window_name)
+
+        logger.debug(f"📤 Batch of {len(batch.updates)} updates and {len(batch.removals)} removals "
+                     f"queued for {len(self.server_configs)} servers (async)")
+        return True
+
+    def get_outbox_stats(self) -> Dict[str, Dict[str, int]]:
+        """Pending depth and superseded/dropped counts of each server's outbox."""
+        return {url: outbox.get_stats() for url, outbox in self._outboxes.items()}
+
+    def get_server_health(self) -> Dict[str, Dict]:
+        """Circuit state, error rate and latency of each server."""
+        return {url: breaker.get_stats() for url, breaker in self._breakers.items()}
+
+    def _drain_outbox(self, config: ServerConfig, outbox: TableOutbox):
+        """Sender worker of one server: post everything pending as one batch per client."""
+        breaker = self._breakers[config.url]
+        while True:
+            # While the circuit is open, updates keep coalescing in the outbox
+            wait = breaker.seconds_until_probe()
+            if wait > 0:
+                if outbox.wait_closed(wait):
+                    break
+                continue
+
+            pending = outbox.take()
+            if pending is None:
+                break
+
+            updates, removals = pending
+            client_ids = dict.fromkeys([update.client_id for update in updates] +
+                                       [client_id for client_id, _ in removals])
+            for client_id in client_ids:
+                removed_windows = [window_name for removed_client, window_name in removals if removed_client == client_id]
+                batch = BatchUpdateMessage(
+                    type='batch_update',
+                    client_id=client_id,
+                    timestamp=datetime.now().isoformat(),
+                    updates=[update for update in updates if update.client_id == client_id],
+                    removals=[TableRemovalMessage(
+                        type='table_removal',
+                        client_id=client_id,
+                        removed_windows=removed_windows,
+                        timestamp=datetime.now().isoformat()
+                    )] if removed_windows else []
+                )
+                if not self._send_batch(self._encode_batch(batch, config), config):
+                    # Never reached the server: keep the tables for the next attempt instead of dropping them
+                    outbox.requeue(batch.updates, [(client_id, window_name) for window_name in removed_windows])
+
+    def _send_batch(self, batch: BatchUpdateMessage, config: ServerConfig) -> bool:
+        """Post a batch to a single server and follow up on failures and resync requests.
+
+        Returns:
+            False when the server could not be reached and the batch is worth another attempt;
+            a batch the server answered, even by rejecting it, is not sent again
+        """
+        window_names = [update.window_name for update in batch.updates]
         try:
-            endpoint = f"{config.url.rstrip('/')}/api/client/update"
-            self._send_http_request(endpoint, removal_message.to_dict(), config, "removal message")
+            endpoint = f"{config.url.rstrip('/')}/api/client/batch"
+            response_data = self._send_http_request(endpoint, batch.to_dict(), config, "batch")
         except Exception as e:
-            logger.debug(f"Removal message failed for {config.url}: {str(e)}")
+            logger.error(f"❌ Batch for {config.url} could not be sent: {str(e)}")
+            self._forget_tables(config, batch.client_id, window_names)
+            return True
+
+        # A server that was unreachable at startup is asked for its formats once it answers
+        if response_data is not None and self.wire_format == 'auto' and config.url not in self._content_types:
+            self._negotiate_format(config)
+
+        if response_data is None or response_data.get('status') not in ('success', 'resync'):
+            # The server may not hold what we sent, so the next update of these tables is full
+            self._forget_tables(config, batch.client_id, window_names)
+            return response_data is not None
+        if response_data.get('resync_windows'):
+            self._resync_tables(config, batch.client_id, response_data['resync_windows'])
+        return True
 
-    def _send_http_request(self, endpoint: str, data: dict, config: ServerConfig, operation: str) -> bool:
-        """Send HTTP request with simple retry logic."""
+    def _encode_batch(self, batch: BatchUpdateMessage, config: ServerConfig) -> BatchUpdateMessage:
+        """Version the batch's updates for one server, reducing each to a delta where that server has a base."""
+        if not self.delta_updates:
+            return batch
+
+        with self._delta_lock:
+            sent_tables = self._sent_tables.setdefault(config.url, {})
+            updates = []
+            for update in batch.updates:
+                key = (update.client_id, update.window_name)
+                version = next(self._versions)
+                sent = sent_tables.get(key)
+                sent_tables[key] = (version, update)
+                if sent is None:
+                    updates.append(replace(update, version=version))
+                    continue
+
+                base_version, base_update = sent
+                changed, removed_keys = diff_game_data(base_update.game_data, update.game_data)
+                updates.append(replace(update, game_data=changed, removed_keys=removed_keys,
+                                       base_version=base_version, version=version))
+
+            for removal in batch.removals:
+                for window_name in removal.removed_windows:
+                    sent_tables.pop((removal.client_id, window_name), None)
+
+        return replace(batch, updates=updates)
+
+    def _forget_tables(self, config: ServerConfig, client_id: str, window_names: List[str]) -> List[GameUpdateMessage]:
+        """Make the next update of these tables to this server a full one; returns their last full updates."""
+        with self._delta_lock:
+            sent_tables = self._sent_tables.get(config.url, {})
+            forgotten = [sent_tables.pop((client_id, window_name), None) for window_name in window_names]
+        return [sent[1] for sent in forgotten if sent is not None]
+
+    def _resync_tables(self, config: ServerConfig, client_id: str, window_names: List[str]):
+        """Queue the full last known state of tables whose delta the server could not apply."""
+        outbox = self._outboxes[config.url]
+        resent = [update for update in self._forget_tables(config, client_id, window_names)
+                  if outbox.put_update_if_absent(replace(update, timestamp=datetime.now().isoformat()))]
+        logger.debug(f"🔁 Resyncing {len(window_names)} tables with {config.url} ({len(resent)} queued)")
+
+    def _send_http_request(self, endpoint: str, data: dict, config: ServerConfig, operation: str) -> Optional[dict]:
+        """Send HTTP request with simple retry logic.
+
+        Returns:
+            The server's JSON answer ({} when it has no JSON body), or None when no attempt got
+            one: timeouts, connection errors, 5xx responses or an open circuit
+        """
+        if self._content_type(config) == DEFLATE_JSON_CONTENT_TYPE:
+            body = {'data': encode_message(data), 'headers': {'Content-Type': DEFLATE_JSON_CONTENT_TYPE}}
+        else:
+            body = {'json': data}
+
+        breaker = self._breakers[config.url]
         for attempt in range(1, config.retry_attempts + 1):
+            if not breaker.allow_request():
+                logger.debug(f"⛔ Circuit {breaker.state} for {config.url}, skipping {operation}")
+                return None
+
+            started = time.perf_counter()
+            recorded = False
             try:
                 response = self.session.post(
                     endpoint,
-                    json=data,
-                    timeout=config.timeout
+                    timeout=config.timeout,
+                    **body
                 )
+
+                # Server errors count against its health, any other answer shows it is up
+                if response.status_code >= 500:
+                    breaker.record_failure(time.perf_counter() - started)
+                else:
+                    breaker.record_success(time.perf_counter() - started)
+                recorded = True
                 
-                if response.status_code == 200:
-                    response_data = response.json()
-                    if response_data.get('status') == 'success':
+                if response.status_code < 500:
+                    try:
+                        response_data = response.json()
+                    except ValueError:
+                        response_data = {}
+                    # 409 is the server asking for a full resync of a delta update
+                    if response.status_code in (200, 409) and response_data.get('status') in ('success', 'resync'):
                         if attempt > 1:
                             logger.debug(f"✅ {operation} succeeded on attempt {attempt}")
-                        return True
                     else:
-                        logger.debug(f"Server rejected {operation}: {response_data.get('message', 'Unknown error')}")
-                        return False
+                        logger.debug(f"Server rejected {operation} (HTTP {response.status_code}): "
+                                     f"{response_data.get('message') or response_data.get('error', 'Unknown error')}")
+                    return response_data
                 else:
                     logger.debug(f"HTTP {response.status_code} for {operation}")
                     
             except requests.exceptions.Timeout:
+                breaker.record_failure(time.perf_counter() - started)
                 logger.debug(f"⏰ Timeout on attempt {attempt}/{config.retry_attempts} for {operation}")
                 
             except requests.exceptions.ConnectionError:
+                breaker.record_failure(time.perf_counter() - started)
                 logger.debug(f"🔌 Connection error on attempt {attempt}/{config.retry_attempts} for {operation}")
                 
             except requests.exceptions.RequestException as e:
+                breaker.record_failure(time.perf_counter() - started)
                 logger.debug(f"📡 Request error on attempt {attempt}/{config.retry_attempts} for {operation}: {str(e)}")
                 
             except Exception as e:
+                if not recorded:  # Always settle the attempt, a half-open probe must not stay in flight
+                    breaker.record_failure(time.perf_counter() - started)
                 logger.debug(f"❌ Unexpected error on attempt {attempt}/{config.retry_attempts} for {operation}: {str(e)}")
             
             # Simple backoff for retries
@@ -133,27 +373,41 @@ class SimpleHttpConnector:
                 delay = min(2 ** (attempt - 1), 5)  # Cap at 5 seconds
                 time.sleep(delay)
         
-        return False
+        return None
 
     def test_connectivity(self) -> dict:
-        """Test connectivity to all configured servers."""
+        """Test connectivity to all configured servers, with each server's health counters."""
         results = {}
         
         for config in self.server_configs:
+            breaker = self._breakers[config.url]
+            started = time.perf_counter()
             try:
                 endpoint = f"{config.url.rstrip('/')}/api/clients"
                 response = self.session.get(endpoint, timeout=config.timeout)
-                results[config.url] = response.status_code == 200
+                reachable = response.status_code == 200
             except Exception:
-                results[config.url] = False
+                reachable = False
+            latency = time.perf_counter() - started
+
+            # Only read the breaker: a diagnostic GET must not close, trip or re-probe the post circuit
+            results[config.url] = {
+                'reachable': reachable,
+                'latency_ms': round(1000 * latency, 1),
+                'health': breaker.get_stats(),
+                'outbox': self._outboxes[config.url].get_stats(),
+            }
         
         return results
 
     def close(self):
-        """Close the HTTP session and thread pool."""
-        if hasattr(self, 'executor') and self.executor:
-            self.executor.shutdown(wait=False)
-            logger.debug("⚡ Thread pool shutdown initiated")
+        """Close the HTTP session and the outbox sender threads."""
+        if hasattr(self, '_outboxes'):
+            for outbox in self._outboxes.values():
+                outbox.close()
+            for sender in self._senders:
+                sender.join(timeout=1.0)
+            logger.debug(f"⚡ Outbox senders stopped: {self.get_outbox_stats()}")
         
         if hasattr(self, 'session') and self.session:
             self.session.close()
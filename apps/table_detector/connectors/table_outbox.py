@@ -0,0 +1,114 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+TableKey = Tuple[str, str]  # (client_id, window_name)
+
+
+class TableOutbox:
+    """
+    Messages waiting to be sent to one server, holding only the newest per table.
+
+    A new update for a table replaces its pending one and a removal drops it, so a sender
+    that falls behind always takes the freshest state of every table in one go instead of
+    working through stale updates first.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._updates: Dict[TableKey, Any] = {}
+        self._removals: Dict[TableKey, None] = {}  # Ordered set
+        self._closed = False
+
+        self._enqueued = 0
+        self._superseded = 0
+        self._dropped = 0
+        self._taken = 0
+        self._requeued = 0
+
+    @staticmethod
+    def _key(update) -> TableKey:
+        return update.client_id, update.window_name
+
+    def put_update(self, update) -> None:
+        key = self._key(update)
+        with self._condition:
+            if key in self._updates:
+                self._superseded += 1
+            # A table that reappears before its removal went out is simply updated
+            self._removals.pop(key, None)
+            self._updates[key] = update
+            self._enqueued += 1
+            self._condition.notify()
+
+    def put_update_if_absent(self, update) -> bool:
+        """Queue an update unless a newer one for the table is already waiting"""
+        with self._condition:  # Re-entrant, put_update takes it again
+            if self._key(update) in self._updates:
+                return False
+            self.put_update(update)
+            return True
+
+    def put_removal(self, client_id: str, window_name: str) -> None:
+        key = (client_id, window_name)
+        with self._condition:
+            if self._updates.pop(key, None) is not None:
+                self._dropped += 1
+            self._removals[key] = None
+            self._enqueued += 1
+            self._condition.notify()
+
+    def requeue(self, updates: List[Any], removals: List[TableKey]) -> None:
+        """Put back messages that could not be sent, unless the table has something newer pending"""
+        with self._condition:
+            for update in updates:
+                key = self._key(update)
+                if key not in self._updates and key not in self._removals:
+                    self._updates[key] = update
+                    self._requeued += 1
+            for key in removals:
+                if key not in self._updates and key not in self._removals:
+                    self._removals[key] = None
+                    self._requeued += 1
+            self._condition.notify()
+
+    def take(self, timeout: Optional[float] = None) -> Optional[Tuple[List[Any], List[TableKey]]]:
+        """
+        Wait for pending messages and take all of them.
+
+        Returns:
+            (updates, removed table keys), or None once closed and empty or when timed out
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._updates or self._removals or self._closed, timeout)
+            if not self._updates and not self._removals:
+                return None
+            updates, removals = list(self._updates.values()), list(self._removals)
+            self._updates, self._removals = {}, {}
+            self._taken += len(updates) + len(removals)
+            return updates, removals
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def wait_closed(self, timeout: float) -> bool:
+        """Sleep up to timeout, returning early (True) when the outbox is closed"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._closed, timeout)
+
+    @property
+    def depth(self) -> int:
+        with self._condition:
+            return len(self._updates) + len(self._removals)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {
+                'pending': len(self._updates) + len(self._removals),
+                'enqueued': self._enqueued,
+                'superseded': self._superseded,
+                'dropped': self._dropped,
+                'taken': self._taken,
+                'requeued': self._requeued,
+            }
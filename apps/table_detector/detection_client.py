@@ -1,17 +1,24 @@
+import math
 import os
+import threading
+import time
 import traceback
 import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
+from typing import Dict, Optional
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from loguru import logger
 
+from table_detector.services.bid_detection_service import shutdown_ocr_pool
 from table_detector.services.image_capture_service import ImageCaptureService
 from table_detector.services.poker_game_processor import PokerGameProcessor
+from table_detector.services.template_matcher_service import TemplateMatchService
 from table_detector.utils.fs_utils import create_timestamp_folder, create_window_folder
 from table_detector.utils.log_accumulator import LogAccumulator
 from table_detector.utils.windows_utils import initialize_platform
-from shared.protocol.message_protocol import GameUpdateMessage, TableRemovalMessage
+from shared.protocol.message_protocol import GameUpdateMessage, TableRemovalMessage, BatchUpdateMessage
 
 
 class DetectionClient:
@@ -26,6 +33,16 @@ class DetectionClient:
         self.image_capture_service = ImageCaptureService()
         self.poker_game_processor = PokerGameProcessor()
         self.debug_mode = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
+
+        # Changed tables are processed concurrently; 1 worker = one after another
+        self.table_workers = max(1, int(os.getenv('TABLE_WORKERS', str(min(4, os.cpu_count() or 1)))))
+        self.table_time_budget = float(os.getenv('TABLE_TIME_BUDGET', str(detection_interval)))
+        self._table_pool: Optional[ThreadPoolExecutor] = None
+        self._table_started: Dict[str, float] = {}
+        self._tables_in_flight = set()
+        self._tables_lock = threading.Lock()
+        self.last_table_timings: Dict[str, float] = {}
+
         self.scheduler = BackgroundScheduler()
         self._setup_scheduler()
 
@@ -59,6 +76,15 @@ class DetectionClient:
         else:
             logger.info("⚠️ Detection is not running")
 
+        # Release the table, detector, bid, shared matching and OCR workers once no detection job can use them
+        if self._table_pool is not None:
+            self._table_pool.shutdown(wait=True, cancel_futures=True)
+            self._table_pool = None
+        PokerGameProcessor.shutdown_detector_pool()
+        PokerGameProcessor.shutdown_bid_pool()
+        TemplateMatchService.shutdown_pool()
+        shutdown_ocr_pool()
+
     def is_detection_running(self) -> bool:
         return self.scheduler.running
 
@@ -108,32 +134,133 @@ class DetectionClient:
                 log_accumulator.stop_capture()
 
     def _handle_changed_windows(self, captured_windows, base_timestamp_folder):
-        """Process changed windows using existing poker game processor and return list of changed game states."""
-        changed_games = []
+        """Process changed windows and return list of changed game states, in window order."""
+        cycle_start = time.perf_counter()
+        self.last_table_timings = {}
+
+        with self._tables_lock:
+            # A table still running from a previous cycle (over budget) is not started twice
+            busy = [w for w in captured_windows if w.window_name in self._tables_in_flight]
+            captured_windows = [w for w in captured_windows if w.window_name not in self._tables_in_flight]
+            self._tables_in_flight.update(w.window_name for w in captured_windows)
+        for captured_image in busy:
+            logger.warning(f"⏳ {captured_image.window_name} is still processing, skipping this cycle")
+            captured_image.close()
+            # Its newest frame was not processed, so it must not count as already seen
+            self.image_capture_service.invalidate(captured_image.window_name)
+
+        # Bids of every table are read in one batch on the bid worker while the tables are processed
+        self.poker_game_processor.submit_bids(captured_windows)
+
+        # Even a single table runs on the pool, so its budget can cut it off instead of stalling the cycle
+        snapshots = self._process_tables_concurrently(captured_windows, base_timestamp_folder)
 
-        for i, captured_image in enumerate(captured_windows):
-            try:
-                logger.info(f"\n📷 Processing image {i + 1}: {captured_image.window_name}")
-                logger.info("-" * 40)
+        changed_games = []
+        for captured_image in captured_windows:
+            game_snapshot = snapshots.get(captured_image.window_name)
+            if game_snapshot:
+                # Store tuple of (game_snapshot, window_name) for later processing
+                changed_games.append((game_snapshot, captured_image.window_name))
+            # A bid read that missed this snapshot is sent with the next cycle, even on a static table
+            if self.poker_game_processor.has_pending_bids(captured_image.window_name):
+                self.image_capture_service.invalidate(captured_image.window_name)
+
+        if captured_windows:
+            timings = ", ".join(f"{w.window_name}={self.last_table_timings.get(w.window_name, float('nan')):.0f}ms"
+                                for w in captured_windows)
+            logger.info(f"⏱️ {len(captured_windows)} tables in {(time.perf_counter() - cycle_start) * 1000:.0f}ms "
+                        f"({self.table_workers} workers): {timings}")
 
-                # Create window-specific folder
-                window_folder = create_window_folder(base_timestamp_folder, captured_image.window_name)
+        return changed_games
 
-                # Process and get GameSnapshot
-                game_snapshot = self.poker_game_processor.process_window(captured_image, window_folder)
+    def _process_tables_concurrently(self, captured_windows, base_timestamp_folder):
+        if not captured_windows:
+            return {}
+        if self._table_pool is None:
+            self._table_pool = ThreadPoolExecutor(max_workers=self.table_workers, thread_name_prefix="table")
+
+        timings = self.last_table_timings
+        pending = {
+            self._table_pool.submit(self._process_table, captured_image, base_timestamp_folder, timings):
+                captured_image
+            for captured_image in captured_windows
+        }
+
+        # Every wave of tables gets one table budget, so tables stuck in the queue cannot hold the cycle either
+        waves = math.ceil(len(captured_windows) / self.table_workers)
+        cycle_deadline = time.perf_counter() + waves * self.table_time_budget
+
+        snapshots = {}
+        while pending:
+            done, _ = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            for future in done:
+                snapshots[pending.pop(future).window_name] = future.result()
+
+            # A table's budget counts from the moment a worker picked it up, not from queueing
+            now = time.perf_counter()
+            for future, captured_image in list(pending.items()):
+                window_name = captured_image.window_name
+                started = self._table_started.get(window_name)
+                if started is not None and now - started > self.table_time_budget:
+                    logger.error(f"⏰ {window_name} exceeded its {self.table_time_budget:.1f}s budget, "
+                                 f"dropping its update this cycle")
+                elif now > cycle_deadline:
+                    logger.error(f"⏰ {window_name} did not finish within the cycle's "
+                                 f"{waves * self.table_time_budget:.1f}s, dropping its update this cycle")
+                else:
+                    continue
+                del pending[future]
+                self._drop_table(future, captured_image)
+
+        return snapshots
+
+    def _drop_table(self, future, captured_image):
+        """Give up on a table's update this cycle without losing it."""
+        if future.cancel():
+            # Never started, so _process_table will not release it
+            captured_image.close()
+            with self._tables_lock:
+                self._tables_in_flight.discard(captured_image.window_name)
+        # Its frame was already marked as seen; without this a static table would never be sent again
+        self.image_capture_service.invalidate(captured_image.window_name)
+
+    def _process_table(self, captured_image, base_timestamp_folder, timings: Optional[Dict[str, float]] = None):
+        """Process one changed window; never raises, returns None on failure.
+
+        Its time goes to the given cycle's timings, so a table finishing after its cycle was
+        given up never writes into the next cycle's.
+        """
+        window_name = captured_image.window_name
+        if timings is None:
+            timings = self.last_table_timings
+        started = time.perf_counter()
+        with self._tables_lock:
+            self._table_started[window_name] = started
+        try:
+            logger.info(f"\n📷 Processing image: {window_name}")
+            logger.info("-" * 40)
 
-                if game_snapshot:
-                    # Store tuple of (game_snapshot, window_name) for later processing
-                    changed_games.append((game_snapshot, captured_image.window_name))
-                    logger.debug(f"✅ Captured changes for {captured_image.window_name}")
-            except Exception as e:
-                logger.error(f"Error in detection cycle: {str(e)}\n{traceback.format_exc()}")
-                logger.error(f"❌ Error processing {captured_image.window_name}: {str(e)}")
-            finally:
-                # Clean up the image immediately after processing to prevent memory leaks
-                captured_image.close()
+            # Create window-specific folder
+            window_folder = create_window_folder(base_timestamp_folder, window_name)
 
-        return changed_games
+            # Process and get GameSnapshot
+            game_snapshot = self.poker_game_processor.process_window(captured_image, window_folder)
+            logger.debug(f"✅ Captured changes for {window_name}")
+            return game_snapshot
+        except Exception as e:
+            logger.error(f"Error in detection cycle: {str(e)}\n{traceback.format_exc()}")
+            logger.error(f"❌ Error processing {window_name}: {str(e)}")
+            return None
+        finally:
+            # Clean up the image immediately after processing to prevent memory leaks
+            captured_image.close()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            timings[window_name] = elapsed_ms
+            if elapsed_ms > self.table_time_budget * 1000:
+                logger.warning(f"⏰ {window_name} took {elapsed_ms:.0f}ms, over its budget")
+            with self._tables_lock:
+                self._tables_in_flight.discard(window_name)
+                self._table_started.pop(window_name, None)
 
     def _handle_removed_windows(self, removed_window_names):
         """Handle removed windows and return removal message data for transmission."""
@@ -142,6 +269,7 @@ class DetectionClient:
         removal_messages = []
         for window_name in removed_window_names:
             logger.info(f"    Removing: {window_name}")
+            self.poker_game_processor.forget_window(window_name)
 
             # Create removal message data structure
             removal_data = {
@@ -155,7 +283,7 @@ class DetectionClient:
         return removal_messages
 
     def _send_updates_to_server(self, changed_games=None, removal_messages=None):
-        """Send specific changed game states and removal messages to servers via HTTP requests.
+        """Send the changed game states and removal messages of one cycle to servers as a single batch.
 
         Args:
             changed_games: List of (game_snapshot, window_name) tuples to send.
@@ -166,58 +294,51 @@ class DetectionClient:
             return
 
         try:
-            # Send changed games (if any)
-            if changed_games:
-                logger.debug(f"Sending {len(changed_games)} changed game states to server")
-                for game_snapshot, window_name in changed_games:
-                    self._send_game_update(game_snapshot, window_name)
-
-            # Send removal messages (if any)
-            if removal_messages:
-                logger.debug(f"Sending {len(removal_messages)} removal messages to server")
-                for removal_data in removal_messages:
-                    self._send_removal_update(removal_data)
+            updates = [update for update in (self._build_game_update(game_snapshot, window_name)
+                                             for game_snapshot, window_name in changed_games or [])
+                       if update is not None]
+
+            # All windows closed this cycle go in one removal message
+            removed_windows = [removal_data.get('window_name') for removal_data in removal_messages or []]
+            removals = [TableRemovalMessage(
+                type='table_removal',
+                client_id=self.client_id,
+                removed_windows=removed_windows,
+                timestamp=datetime.now().isoformat()
+            )] if removed_windows else []
 
             # Log if nothing to send
-            if not changed_games and not removal_messages:
+            if not updates and not removals:
                 logger.debug("No game data or removal messages to send to server")
+                return
 
-        except Exception as e:
-            logger.debug(f"Error sending updates to server: {str(e)}")
-            # Continue detection regardless of server errors
-
-    def _send_game_update(self, game_snapshot, window_name: str):
-        """Send individual game update via HTTP."""
-        try:
-            # Convert GameSnapshot directly to GameUpdateMessage
-            game_update = game_snapshot.to_game_update_message(
+            logger.debug(f"Sending batch of {len(updates)} game states and {len(removed_windows)} removals to server")
+            batch = BatchUpdateMessage(
+                type='batch_update',
                 client_id=self.client_id,
-                window_name=window_name,
-                detection_interval=self.detection_interval
+                timestamp=datetime.now().isoformat(),
+                updates=updates,
+                removals=removals
             )
 
             # Simple HTTP request - fire and forget
-            self.http_connector.send_game_update(game_update)
+            self.http_connector.send_batch(batch)
 
         except Exception as e:
-            logger.debug(f"Failed to send game update for {window_name}: {str(e)}")
+            logger.debug(f"Error sending updates to server: {str(e)}")
+            # Continue detection regardless of server errors
 
-    def _send_removal_update(self, removal_data: dict):
-        """Send individual removal message via HTTP."""
+    def _build_game_update(self, game_snapshot, window_name: str) -> Optional[GameUpdateMessage]:
+        """Convert a GameSnapshot to its GameUpdateMessage, or None if it cannot be converted."""
         try:
-            # Convert removal data to message protocol
-            removal_message = TableRemovalMessage(
-                type=removal_data.get('type', 'table_removal'),
-                client_id=removal_data.get('client_id'),
-                removed_windows=[removal_data.get('window_name')],  # Convert single window to list
-                timestamp=removal_data.get('timestamp')
+            return game_snapshot.to_game_update_message(
+                client_id=self.client_id,
+                window_name=window_name,
+                detection_interval=self.detection_interval
             )
-
-            # Simple HTTP request - fire and forget
-            self.http_connector.send_removal_message(removal_message)
-
         except Exception as e:
-            logger.debug(f"Failed to send removal update for {removal_data.get('window_name', 'unknown')}: {str(e)}")
+            logger.debug(f"Failed to build game update for {window_name}: {str(e)}")
+            return None
 
     def get_client_id(self) -> str:
         """Get the client ID."""
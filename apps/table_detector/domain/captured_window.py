@@ -1,10 +1,10 @@
-import hashlib
 from typing import Optional
 
 import numpy as np
 from PIL import Image
 from loguru import logger
 
+from table_detector.utils.cache_utils import sample_frame, frame_signature
 from table_detector.utils.opencv_utils import pil_to_cv2
 
 
@@ -31,17 +31,19 @@ class CapturedWindow:
         except Exception as e:
             raise Exception(f"❌ Error converting image {self.window_name}: {str(e)}")
 
+    def get_frame_array(self) -> np.ndarray:
+        """RGB pixels of the capture as a NumPy array (no colour conversion)"""
+        if self._is_closed:
+            raise Exception(f"❌ Cannot read closed image {self.window_name}")
+        return np.asarray(self.image)
+
     def calculate_hash(self) -> str:
         if self._is_closed:
             return self._image_hash or ""
             
         if self._image_hash is None:
             try:
-                resized_image = self.image.resize((100, 100))
-                image_bytes = resized_image.tobytes()
-                self._image_hash = hashlib.sha256(image_bytes).hexdigest()[:16]
-                # Clean up the resized image immediately
-                resized_image.close()
+                self._image_hash = f"{frame_signature(sample_frame(self.get_frame_array())):08x}"
             except Exception as e:
                 logger.error(f"❌ Error calculating image hash: {str(e)}")
                 self._image_hash = ""
@@ -1,10 +1,12 @@
-from typing import Dict, List, Tuple
+import os
+from typing import Dict, List, Optional, Tuple
 
 from loguru import logger
 from pokerkit import Automation, PotLimitOmahaHoldem
 from shared.domain.moves import MoveType
 from shared.domain.position import Position
 from shared.domain.street import Street
+from table_detector.domain.plo_betting_state import PloBettingState
 
 
 class OmahaEngineException(Exception):
@@ -60,7 +62,10 @@ class OmahaEngine:
         Automation.HOLE_DEALING
     )
 
-    def __init__(self, player_count):
+    # Full pokerkit state instead of the native betting state
+    STRICT = os.getenv('OMAHA_ENGINE_STRICT', 'false').lower() == 'true'
+
+    def __init__(self, player_count, strict: Optional[bool] = None):
         if player_count < 2:
             raise WrongPlayerAmount("Need at least 2 players to start game")
 
@@ -74,18 +79,23 @@ class OmahaEngine:
             Street.RIVER: []
         }
 
-        starting_stacks = [100] * player_count  # Default stack size
-        blinds = (0.5, 1)  # Default blinds (SB, BB)
-
-        self.poker_state = PotLimitOmahaHoldem.create_state(
-            self.AUTOMATIONS,
-            True,  # Uniform antes?
-            0,  # Antes
-            blinds,  # Blinds (SB, BB)
-            1,  # Min-bet
-            starting_stacks,  # Starting stacks
-            player_count,  # Number of players
-        )
+        self.strict = self.STRICT if strict is None else strict
+        if self.strict:
+            starting_stacks = [100] * player_count  # Default stack size
+            blinds = (0.5, 1)  # Default blinds (SB, BB)
+
+            self.poker_state = PotLimitOmahaHoldem.create_state(
+                self.AUTOMATIONS,
+                True,  # Uniform antes?
+                0,  # Antes
+                blinds,  # Blinds (SB, BB)
+                1,  # Min-bet
+                starting_stacks,  # Starting stacks
+                player_count,  # Number of players
+            )
+        else:
+            # Same stacks, blinds and min-bet, counted in half big blinds
+            self.poker_state = PloBettingState(player_count)
 
         self.seat_mapping = self._get_seat_to_position_mapping()
 
@@ -0,0 +1,81 @@
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from loguru import logger
+
+from shared.domain.moves import MoveType
+from shared.domain.position import Position
+from shared.domain.street import Street
+from table_detector.domain.omaha_engine import OmahaEngine, InvalidPositionSequenceError
+
+
+class OmahaEngineSession:
+    """
+    One table's OmahaEngine, kept alive across the frames of a hand.
+
+    Each frame passes the full detected move history per position; only moves that
+    were not applied before are fed to the engine. The engine is rebuilt when the
+    hand changes (different hand key or seated positions) or when the history no
+    longer extends what was applied (a new hand or a corrected detection).
+    """
+
+    def __init__(self):
+        self.engine: Optional[OmahaEngine] = None
+        self._hand_key: Optional[Hashable] = None
+        self._applied: Dict[Position, List[MoveType]] = {}
+        self.rebuilds = 0
+
+    def apply(self, position_actions: Dict[Position, List[MoveType]],
+              hand_key: Optional[Hashable] = None) -> Dict[Street, List[Tuple[Position, MoveType]]]:
+        """
+        Bring the engine up to date with position_actions and return the moves by street.
+
+        Raises the same OmahaEngine errors a full replay of position_actions would.
+        """
+        if self._needs_rebuild(position_actions, hand_key):
+            self._rebuild(len(position_actions), hand_key)
+
+        pending = {
+            position: list(moves[len(self._applied.get(position, [])):])
+            for position, moves in position_actions.items()
+        }
+        try:
+            self.engine.simulate_all_moves(pending)
+        except InvalidPositionSequenceError:
+            # Stopped before the next actor's move - everything applied so far stays valid
+            self._record_applied(position_actions, pending)
+            raise
+        except Exception:
+            # The failing move was consumed without being applied; replay from scratch next time
+            self.reset()
+            raise
+        self._record_applied(position_actions, pending)
+
+        # Copy the street lists, the engine keeps appending to its own
+        return {street: list(moves) for street, moves in self.engine.get_moves_by_street().items()}
+
+    def reset(self):
+        self.engine = None
+        self._hand_key = None
+        self._applied = {}
+
+    def _record_applied(self, position_actions: Dict[Position, List[MoveType]],
+                        pending: Dict[Position, List[MoveType]]):
+        # simulate_all_moves pops moves from pending as it applies them
+        for position, moves in position_actions.items():
+            self._applied[position] = list(moves[:len(moves) - len(pending[position])])
+
+    def _needs_rebuild(self, position_actions: Dict[Position, List[MoveType]], hand_key: Optional[Hashable]) -> bool:
+        if self.engine is None or hand_key != self._hand_key:
+            return True
+        if set(position_actions) != set(self._applied):
+            return True
+        # Every applied move must still be at the start of its position's history
+        return any(moves[:len(self._applied[position])] != self._applied[position]
+                   for position, moves in position_actions.items())
+
+    def _rebuild(self, player_count: int, hand_key: Optional[Hashable]):
+        self.reset()
+        self.engine = OmahaEngine(player_count)
+        self._hand_key = hand_key
+        self.rebuilds += 1
+        logger.debug(f"🔄 Omaha engine rebuilt for {player_count} players")
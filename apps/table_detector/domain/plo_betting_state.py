@@ -0,0 +1,201 @@
+from collections import deque
+from typing import List, Optional
+
+
+class PloBettingState:
+    """
+    Betting-only stand-in for pokerkit's PotLimitOmahaHoldem state.
+
+    Tracks exactly what OmahaEngine asks of pokerkit - actor, street, blinds,
+    stacks, fold/check/call legality and min-raise sizing - with pokerkit's
+    tournament-mode rules (no folding when checking is free, short all-ins do not
+    reopen raising). No cards, pots or showdown. Amounts are integer half big
+    blinds: blinds 1/2, min bet 2 and 100bb stacks are 200.
+
+    Attribute and method names mirror pokerkit so OmahaEngine drives either state.
+    """
+
+    STREET_COUNT = 4
+
+    def __init__(self, player_count: int, starting_stack: int = 200,
+                 blinds: tuple = (1, 2), min_bet: int = 2):
+        self.player_count = player_count
+        self.player_indices = range(player_count)
+        self.min_bet = min_bet
+        self.stacks: List[int] = [starting_stack] * player_count
+        self.bets: List[int] = [0] * player_count
+        self.statuses: List[bool] = [True] * player_count
+        self.street_index: Optional[int] = 0
+        self.opener_index: Optional[int] = None
+        self.actor_indices: deque = deque()
+        self.acted_player_indices = set()
+        self.completion_betting_or_raising_amount = 0
+        self.consecutive_short_all_in_amounts: List[int] = []
+
+        # Heads-up the big blind is posted by seat 0 and the small blind by seat 1
+        blind_amounts = list(blinds) + [0] * (player_count - len(blinds))
+        if player_count == 2:
+            blind_amounts = blind_amounts[::-1]
+        self._posts_blind = [amount > 0 for amount in blind_amounts]
+        for i, amount in enumerate(blind_amounts):
+            posted = min(self.stacks[i], amount)
+            self.bets[i] += posted
+            self.stacks[i] -= posted
+
+        self._begin_betting()
+
+    # ── pokerkit-compatible queries ───────────────────────────────────
+
+    @property
+    def actor_index(self) -> Optional[int]:
+        return self.actor_indices[0] if self.actor_indices else None
+
+    @property
+    def checking_or_calling_amount(self) -> Optional[int]:
+        player_index = self.actor_index
+        if player_index is None:
+            return None
+        return min(self.stacks[player_index], max(self.bets) - self.bets[player_index])
+
+    @property
+    def min_completion_betting_or_raising_to_amount(self) -> Optional[int]:
+        if not self._can_complete_bet_or_raise():
+            return None
+        player_index = self.actor_index
+        amount = max(self.completion_betting_or_raising_amount, self.min_bet) + max(self.bets)
+        return min(self.stacks[player_index] + self.bets[player_index], amount)
+
+    def can_fold(self) -> bool:
+        player_index = self.actor_index
+        # Tournament mode: folding when checking is free is rejected
+        return player_index is not None and self.bets[player_index] < max(self.bets)
+
+    def can_check_or_call(self) -> bool:
+        return self.actor_index is not None
+
+    def can_complete_bet_or_raise_to(self) -> bool:
+        # OmahaEngine always raises to the minimum, which never exceeds the pot limit
+        return self._can_complete_bet_or_raise()
+
+    # ── pokerkit-compatible operations ────────────────────────────────
+
+    def fold(self):
+        if not self.can_fold():
+            raise ValueError("There is no reason for this player to fold.")
+        player_index = self._pop_actor_index()
+        self.statuses[player_index] = False
+        self._update_betting()
+
+    def check_or_call(self):
+        amount = self.checking_or_calling_amount
+        if amount is None:
+            raise ValueError("There is no player to act.")
+        player_index = self._pop_actor_index()
+        self.bets[player_index] += amount
+        self.stacks[player_index] -= amount
+        self._update_betting()
+
+    def complete_bet_or_raise_to(self, amount: Optional[int] = None):
+        minimum = self.min_completion_betting_or_raising_to_amount
+        if minimum is None:
+            raise ValueError("Completion, betting, or raising is not permitted.")
+        amount = minimum if amount is None else amount
+        if amount < minimum:
+            raise ValueError(f"The amount {amount} is below the minimum allowed {minimum}.")
+
+        player_index = self._pop_actor_index()
+        raise_amount = amount - max(self.bets)
+        self.stacks[player_index] -= amount - self.bets[player_index]
+        self.bets[player_index] = amount
+
+        # Everyone else still holding chips acts again, starting left of the raiser
+        self.actor_indices = deque(
+            (player_index + offset) % self.player_count for offset in range(1, self.player_count)
+        )
+        for i in self.player_indices:
+            if (not self.statuses[i] or not self.stacks[i]) and i in self.actor_indices:
+                self.actor_indices.remove(i)
+        self.opener_index = player_index
+
+        if raise_amount >= self.completion_betting_or_raising_amount:
+            self.acted_player_indices = {player_index}
+        self.completion_betting_or_raising_amount = max(self.completion_betting_or_raising_amount, raise_amount)
+
+        if self.stacks[player_index]:
+            self.consecutive_short_all_in_amounts.clear()
+        else:
+            self.consecutive_short_all_in_amounts.append(raise_amount)
+        if sum(self.consecutive_short_all_in_amounts) >= self.completion_betting_or_raising_amount:
+            self.consecutive_short_all_in_amounts.clear()
+
+        self._update_betting()
+
+    # ── betting rounds ────────────────────────────────────────────────
+
+    def _can_complete_bet_or_raise(self) -> bool:
+        player_index = self.actor_index
+        if player_index is None:
+            return False
+        to_call = max(self.bets) - self.bets[player_index]
+        if min(self.stacks[player_index], to_call) < self.completion_betting_or_raising_amount:
+            return False  # short all-in cannot be raised
+        if (self.consecutive_short_all_in_amounts
+                and sum(self.consecutive_short_all_in_amounts) < self.completion_betting_or_raising_amount
+                and player_index in self.acted_player_indices):
+            return False  # already acted, facing a non-full all-in raise
+        if self.stacks[player_index] <= to_call:
+            return False  # covered: can only call
+        # Someone else must be able to respond
+        return any(i != player_index and self.statuses[i] and self.stacks[i] + self.bets[i] > max(self.bets)
+                   for i in self.player_indices)
+
+    def _effective_stack(self, player_index: int) -> int:
+        if not self.statuses[player_index]:
+            return 0
+        totals = sorted(self.bets[i] + self.stacks[i] for i in self.player_indices if self.statuses[i])
+        return min(self.stacks[player_index], max(0, totals[-2] - self.bets[player_index]))
+
+    def _begin_betting(self):
+        # Left of the highest blind preflop; seat 0 (first after the button) afterwards
+        self.opener_index = (max(
+            self.player_indices,
+            key=lambda i: (self.bets[i] * self._posts_blind[i], i)
+        ) + 1) % self.player_count
+
+        self.actor_indices = deque(
+            (self.opener_index + offset) % self.player_count for offset in range(self.player_count)
+        )
+        for i in self.player_indices:
+            if not self.statuses[i] or not self.stacks[i] or not self._effective_stack(i):
+                self.actor_indices.remove(i)
+
+        self.completion_betting_or_raising_amount = 0
+        self.acted_player_indices.clear()
+        self.consecutive_short_all_in_amounts.clear()
+        self._update_betting(
+            status=len(self.actor_indices) == 1 and self.bets[self.actor_indices[0]] >= max(self.bets)
+        )
+
+    def _update_betting(self, status: bool = False):
+        if not self.actor_indices or sum(self.statuses) <= 1 or status:
+            self._end_betting()
+
+    def _end_betting(self):
+        self.actor_indices.clear()
+        all_in = sum(self.statuses) > 1 and sum(
+            1 for i in self.player_indices if self.statuses[i] and self.stacks[i]
+        ) <= 1
+        self.bets = [0] * self.player_count
+
+        if sum(self.statuses) <= 1 or all_in or self.street_index == self.STREET_COUNT - 1:
+            # Hand won uncontested, run out all-in, or river closed: nothing left to act on
+            self.street_index = None
+            return
+
+        self.street_index += 1
+        self._begin_betting()
+
+    def _pop_actor_index(self) -> int:
+        player_index = self.actor_indices.popleft()
+        self.acted_player_indices.add(player_index)
+        return player_index
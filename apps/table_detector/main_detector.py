@@ -63,6 +63,8 @@ DETECTION_INTERVAL = int(os.getenv('DETECTION_INTERVAL', '3'))
 CONNECTION_TIMEOUT = int(os.getenv('CONNECTION_TIMEOUT', '10'))
 RETRY_ATTEMPTS = int(os.getenv('RETRY_ATTEMPTS', '1'))
 DEBUG_MODE = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
+DELTA_UPDATES = os.getenv('DELTA_UPDATES', 'true').lower() == 'true'  # Send only changed game_data keys
+WIRE_FORMAT = os.getenv('WIRE_FORMAT', 'auto').lower()  # 'auto' (negotiate), 'json' or 'deflate'
 
 
 def main():
@@ -82,7 +84,8 @@ def main():
             ServerConfig(url=url, timeout=CONNECTION_TIMEOUT, retry_attempts=RETRY_ATTEMPTS)
             for url in SERVER_URLS
         ]
-        http_connector = SimpleHttpConnector(server_configs)
+        http_connector = SimpleHttpConnector(server_configs, delta_updates=DELTA_UPDATES,
+                                             wire_format=WIRE_FORMAT)
 
         # Initialize detection client
         detection_client = DetectionClient(
@@ -1,4 +1,6 @@
-from typing import Dict, Tuple, List
+import os
+import threading
+from typing import Any, Collection, Dict, Hashable, Optional, Tuple, List
 
 import cv2
 import numpy as np
@@ -6,6 +8,9 @@ import pytesseract
 from loguru import logger
 
 from shared.domain.detected_bid import DetectedBid
+from table_detector.services.digit_glyph_service import DigitGlyphService, DIGIT_MATCH_THRESHOLD
+from table_detector.services.ocr_worker_pool import OcrWorkerPool
+from table_detector.utils.cache_utils import LRUCache, image_digest
 
 # Player position coordinates (position_id: (x, y, width, height))
 PLAYER_BID_POSITIONS = {
@@ -33,92 +38,246 @@ TESSERACT_CONFIG = (
     "-c load_system_dawg=0 -c load_freq_dawg=0"
 )
 
+# A mosaic holds one bid region per text line, so tesseract segments it as a block
+MOSAIC_TESSERACT_CONFIG = TESSERACT_CONFIG.replace("--psm 7", "--psm 6")
+MOSAIC_SPACER = 64  # background pixels around each region in the mosaic, about one upscaled text height
 
-def detect_bids(cv2_image: np.ndarray, debug = False) -> Dict[int, DetectedBid]:
+# Mosaic reads whose weakest word is below this confidence are used but not cached, so they are read again
+OCR_MIN_CONFIDENCE = 60
+
+# Valid OCR bid reads by preprocessed region digest -> (combined text, confidence)
+_ocr_cache = LRUCache(
+    max_entries=int(os.getenv('BID_OCR_CACHE_SIZE', '256')),
+    ttl_seconds=float(os.getenv('BID_OCR_CACHE_TTL', '300'))
+)
+_MISS = object()
+
+# OCR_WORKERS > 0 runs tesseract on long-lived worker processes instead of a new binary per call
+_ocr_pool: Optional[OcrWorkerPool] = None
+_ocr_pool_size = int(os.getenv('OCR_WORKERS', '0'))
+_ocr_pool_timeout = float(os.getenv('OCR_TIMEOUT', '5'))
+_ocr_pool_lock = threading.Lock()
+
+
+def get_ocr_pool() -> Optional[OcrWorkerPool]:
+    global _ocr_pool
+    if _ocr_pool_size <= 0:
+        return None
+    if _ocr_pool is None or _ocr_pool.is_shutdown:
+        with _ocr_pool_lock:
+            if _ocr_pool is None or _ocr_pool.is_shutdown:
+                _ocr_pool = OcrWorkerPool(max_workers=_ocr_pool_size, timeout=_ocr_pool_timeout)
+    return _ocr_pool
+
+
+def shutdown_ocr_pool():
+    global _ocr_pool
+    with _ocr_pool_lock:
+        pool, _ocr_pool = _ocr_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def get_ocr_cache_stats() -> Dict[str, Any]:
+    return _ocr_cache.get_stats()
+
+
+def clear_ocr_cache():
+    _ocr_cache.clear()
+
+
+def detect_bids(cv2_image: np.ndarray, debug = False, seats: Optional[Collection[int]] = None) -> Dict[int, DetectedBid]:
     """
     Detect bid amounts for all player positions
 
+    Regions are read with the digit glyph templates first; only regions the glyph
+    reader cannot read confidently go through tesseract.
+
     Args:
         cv2_image: Full poker table screenshot
+        seats: Only read these positions (default: all of PLAYER_BID_POSITIONS)
 
     Returns:
         Dictionary mapping position number to DetectedBid object
     """
-    detected_bids = {}
+    return detect_bids_batch({0: cv2_image}, debug, seats).get(0, {})
+
+
+def detect_bids_batch(cv2_images: Dict[Hashable, np.ndarray], debug = False,
+                      seats: Optional[Collection[int]] = None,
+                      table_seats: Optional[Dict[Hashable, Collection[int]]] = None
+                      ) -> Dict[Hashable, Dict[int, DetectedBid]]:
+    """
+    Detect bid amounts for several tables with at most one tesseract call
+
+    Every bid region the glyph reader cannot read confidently, from all tables,
+    is stacked into one mosaic image and OCR'd together. Regions whose binarised
+    pixels were OCR'd before are answered from the OCR cache instead.
+
+    Args:
+        cv2_images: Full poker table screenshots keyed by table (e.g. window name)
+        seats: Only read these positions of every table (default: all)
+        table_seats: Positions to read per table, overriding seats for the tables it lists
+
+    Returns:
+        Dictionary mapping table key to its position -> DetectedBid dictionary
+    """
+    detected_bids = {table: {} for table in cv2_images}
 
     try:
-        # First extract all regions
+        # First read every region from glyphs, keeping the unclear ones for OCR
         processed_regions = {}
-        for position, bounds in PLAYER_BID_POSITIONS.items():
-            x, y, w, h = bounds
-            region = cv2_image[y:y + h, x:x + w]
-            processed_regions[position] = _preprocess_bid_region(region)
-
-        # Visualize all processed regions on single plot
+        digests = {}
+        for table, cv2_image in cv2_images.items():
+            read_seats = table_seats[table] if table_seats and table in table_seats else seats
+            for position, bounds in PLAYER_BID_POSITIONS.items():
+                if read_seats is not None and position not in read_seats:
+                    continue
+                x, y, w, h = bounds
+                region = cv2_image[y:y + h, x:x + w]
+
+                glyph_read = DigitGlyphService.read_amount(region)
+                if glyph_read is None:
+                    continue  # nothing drawn, no bid
+
+                bid_text, confidence = glyph_read
+                if confidence >= DIGIT_MATCH_THRESHOLD and _is_valid_bid_text(bid_text):
+                    detected_bids[table][position] = _create_detected_bid(position, bid_text, bounds)
+                    logger.info(f"Position {position}: ${bid_text}")
+                    continue
+
+                processed_region = _preprocess_bid_region(region)
+                digest = image_digest(processed_region)
+                cached = _ocr_cache.get(digest, _MISS)
+                if cached is not _MISS:
+                    bid_text, _ = cached
+                    detected_bids[table][position] = _create_detected_bid(position, bid_text, bounds)
+                    continue
+
+                processed_regions[(table, position)] = processed_region
+                digests[(table, position)] = digest
+
+        if not processed_regions:
+            return detected_bids
+
+        mosaic, bands = _build_bid_mosaic(processed_regions)
+
+        # Visualize the regions sent to OCR
         if debug:
             import matplotlib.pyplot as plt
-            fig, axes = plt.subplots(2, 3, figsize=(12, 8))
-            axes = axes.ravel()
-            for idx, (position, processed_region) in enumerate(processed_regions.items()):
-                axes[idx].imshow(processed_region, cmap='gray')
-                axes[idx].set_title(f'Position {position}')
+            plt.figure(figsize=(6, 12))
+            plt.imshow(mosaic, cmap='gray')
+            plt.title(', '.join(f'{table}/P{position}' for (table, position), _, _ in bands))
             plt.tight_layout()
             plt.show()
 
-        # Process each region for bids
-        for position, processed_region in processed_regions.items():
-            bounds = PLAYER_BID_POSITIONS[position]
-            bid_text = _extract_bid_text(processed_region, bounds)
-
+        bid_texts = _extract_mosaic_bid_texts(mosaic, bands)
+        for (table, position), (bid_text, confidence) in bid_texts.items():
+            # Empty or garbled reads are retried next frame rather than remembered for the TTL
             if bid_text and _is_valid_bid_text(bid_text):
-                detected_bid = _create_detected_bid(position, bid_text, bounds)
-                detected_bids[position] = detected_bid
+                # A weak read is still this frame's bid, but is not trusted for the whole TTL
+                if confidence >= OCR_MIN_CONFIDENCE:
+                    _ocr_cache.put(digests[(table, position)], (bid_text, confidence))
+                detected_bids[table][position] = _create_detected_bid(position, bid_text, PLAYER_BID_POSITIONS[position])
                 logger.info(f"Position {position}: ${bid_text}")
 
         return detected_bids
 
     except Exception as e:
         logger.error(f"❌ Error detecting bids: {str(e)}")
-        return {}
+        return {table: {} for table in cv2_images}
+
 
+def _build_bid_mosaic(processed_regions: Dict[Hashable, np.ndarray]
+                      ) -> Tuple[np.ndarray, List[Tuple[Hashable, int, int]]]:
+    """
+    Stack preprocessed bid regions into one image, one text line per region
+
+    Regions are separated and framed by MOSAIC_SPACER rows/columns of background
+    so tesseract never joins words of neighbouring regions.
 
-def _extract_bid_text(processed_region, bounds: Tuple[int, int, int, int]) -> str:
-    """Extract bid text from specific image region using OCR"""
+    Returns:
+        (mosaic, bands) where each band is (region key, top row, bottom row)
+    """
+    spacer = MOSAIC_SPACER
+    width = max(region.shape[1] for region in processed_regions.values()) + 2 * spacer
+    height = sum(region.shape[0] + spacer for region in processed_regions.values()) + spacer
+
+    # Preprocessed regions are dark text on a white background
+    mosaic = np.full((height, width), 255, dtype=np.uint8)
+    bands = []
+    top = spacer
+    for key, region in processed_regions.items():
+        region_h, region_w = region.shape[:2]
+        mosaic[top:top + region_h, spacer:spacer + region_w] = region
+        bands.append((key, top, top + region_h))
+        top += region_h + spacer
+
+    return mosaic, bands
+
+
+def _extract_mosaic_bid_texts(mosaic: np.ndarray, bands: List[Tuple[Hashable, int, int]]
+                              ) -> Dict[Hashable, Tuple[str, int]]:
+    """Extract (bid text, confidence) of every mosaic band with a single OCR call"""
     try:
-        # Get detailed OCR data with confidence scores and positions
-        data = pytesseract.image_to_data(processed_region, config=TESSERACT_CONFIG, output_type=pytesseract.Output.DICT)
-
-        # Filter for high-confidence text detections
-        valid_texts = []
-        for i in range(len(data['text'])):
-            text = data['text'][i].strip()
-            conf = int(data['conf'][i])
-
-            # Only consider non-empty text with decent confidence
-            if text and conf > 40:
-                valid_texts.append({
+        data = _image_to_data(mosaic, MOSAIC_TESSERACT_CONFIG)
+    except Exception as e:
+        logger.error(f"❌ Error extracting bid text from mosaic of {len(bands)} regions: {str(e)}")
+        return {}
+
+    words_by_region = _assign_words_to_bands(data, bands)
+    return {key: _combine_with_confidence(words_by_region.get(key, [])) for key, _, _ in bands}
+
+
+def _combine_with_confidence(detections: List[Dict]) -> Tuple[str, int]:
+    """Combined bid text of OCR detections and the lowest confidence among them"""
+    if not detections:
+        return "", 0
+
+    # Sort by confidence (highest first)
+    detections = sorted(detections, key=lambda x: x['conf'], reverse=True)
+    return _combine_bid_detections(detections), detections[-1]['conf']
+
+
+def _assign_words_to_bands(data: Dict[str, List], bands: List[Tuple[Hashable, int, int]],
+                           spacer: int = MOSAIC_SPACER) -> Dict[Hashable, List[Dict]]:
+    """
+    Map tesseract word boxes back to the region they were read from
+
+    A word belongs to the band holding its vertical centre; its coordinates are
+    made relative to that region so spatial combining works as for a single region.
+    """
+    words_by_region = {}
+    for i in range(len(data['text'])):
+        text = data['text'][i].strip()
+        conf = int(float(data['conf'][i]))
+
+        # Only consider non-empty text with decent confidence
+        if not text or conf <= 40:
+            continue
+
+        center_y = data['top'][i] + data['height'][i] // 2
+        for key, top, bottom in bands:
+            if top <= center_y < bottom:
+                words_by_region.setdefault(key, []).append({
                     'text': text,
                     'conf': conf,
-                    'left': data['left'][i],
-                    'top': data['top'][i],
+                    'left': data['left'][i] - spacer,
+                    'top': data['top'][i] - top,
                     'width': data['width'][i],
                     'height': data['height'][i]
                 })
+                break
 
-        if not valid_texts:
-            return ""
-
-        # Sort by confidence (highest first)
-        valid_texts.sort(key=lambda x: x['conf'], reverse=True)
-
-        # Try to combine separate detections into a single bid amount
-        combined_text = _combine_bid_detections(valid_texts)
+    return words_by_region
 
-        return combined_text
 
-    except Exception as e:
-        logger.error(f"❌ Error extracting bid text at {bounds}: {str(e)}")
-        return ""
+def _image_to_data(image: np.ndarray, config: str) -> Dict[str, List]:
+    """Word boxes of one image, from the OCR worker pool when enabled"""
+    pool = get_ocr_pool()
+    if pool is not None:
+        return pool.image_to_data(image, config)
+    return pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
 
 
 def _combine_bid_detections(detections: List[Dict]) -> str:
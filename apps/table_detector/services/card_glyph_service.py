@@ -0,0 +1,284 @@
+import os
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from loguru import logger
+
+from shared.domain.detection import Detection
+from table_detector.services.template_bank import TemplateBank
+from table_detector.services.template_matcher_service import (
+    TemplateMatchService,
+    BOARD_CARD_SLOTS,
+    BOARD_IMAGE_SIZE,
+    VALID_BOARD_CARD_COUNTS
+)
+from table_detector.utils.cache_utils import LRUCache, image_digest
+from table_detector.utils.opencv_utils import glyph_channel, extract_corner_glyphs, is_card_slot_occupied
+
+# Hero hole card slots (x, y, w, h) in the 784x584 Jurojin layout, left to right
+HERO_CARD_SLOTS = [
+    (343, 353, 21, 37),
+    (369, 353, 21, 37),
+    (394, 353, 21, 37),
+    (420, 353, 21, 37),
+]
+RANK_SEARCH_PADDING = 4  # card corners drift by a pixel or two between slots
+SUIT_SEARCH_PADDING = 2
+GLYPH_MATCH_THRESHOLD = 0.8
+GLYPH_EMPTY_THRESHOLD = 0.5  # best rank score below this means there is no card in the slot
+
+_MISS = object()
+
+
+@dataclass
+class CardGlyphBank:
+    """
+    Rank and suit glyphs cut out of one card template category.
+
+    Offsets are kept per glyph: rank offsets locate the rank inside the card
+    template, suit offsets locate the suit relative to the rank glyph.
+    """
+    category: str
+    ranks: TemplateBank
+    suits: TemplateBank
+    rank_offsets: Dict[str, Tuple[int, int]]
+    suit_offsets: Dict[str, Tuple[int, int]]
+    card_names: Dict[str, str]  # upper-cased card -> template name, e.g. 'JH' -> 'Jh'
+    card_sizes: Dict[str, Tuple[int, int]]  # template name -> (w, h)
+
+    @classmethod
+    def from_templates(cls, category: str, templates: Dict[str, np.ndarray]) -> 'CardGlyphBank':
+        rank_samples = defaultdict(list)
+        suit_samples = defaultdict(list)
+        card_names = {}
+        card_sizes = {}
+
+        for name in sorted(templates):
+            template = templates[name]
+            card_names[name.upper()] = name
+            card_sizes[name] = (template.shape[1], template.shape[0])
+
+            glyphs = extract_corner_glyphs(template)
+            if glyphs is None:
+                logger.warning(f"⚠️ No corner glyphs found in {category}/{name}")
+                continue
+
+            channel = glyph_channel(template)
+            (rx, ry, rw, rh), (sx, sy, sw, sh) = glyphs
+            rank, suit = name[0].upper(), name[1].upper()
+            rank_samples[rank].append((channel[ry:ry + rh, rx:rx + rw], (rx, ry)))
+            suit_samples[suit].append((channel[sy:sy + sh, sx:sx + sw], (sx - rx, sy - ry)))
+
+        ranks, rank_offsets = cls._pick_representatives(rank_samples)
+        suits, suit_offsets = cls._pick_representatives(suit_samples)
+
+        return cls(
+            category=category,
+            ranks=TemplateBank.compile(f"{category}_ranks", ranks),
+            suits=TemplateBank.compile(f"{category}_suits", suits),
+            rank_offsets=rank_offsets,
+            suit_offsets=suit_offsets,
+            card_names=card_names,
+            card_sizes=card_sizes
+        )
+
+    @staticmethod
+    def _pick_representatives(samples):
+        # Template crops differ by a pixel here and there, the most common glyph shape is the clean one
+        glyphs, offsets = {}, {}
+        for key, entries in samples.items():
+            common_shape = Counter(glyph.shape for glyph, _ in entries).most_common(1)[0][0]
+            glyph, offset = next(entry for entry in entries if entry[0].shape == common_shape)
+            glyphs[key] = np.ascontiguousarray(glyph)
+            offsets[key] = offset
+        return glyphs, offsets
+
+    @property
+    def template_count(self) -> int:
+        return len(self.ranks) + len(self.suits)
+
+
+class CardGlyphService:
+    """
+    Two step card recogniser: find the rank glyph at each card corner, then the suit under it.
+
+    Costs 13 rank + 4 suit glyph matches on tiny windows per card instead of 52 full
+    card templates per search region. Returns None whenever the layout or a slot is
+    not recognised so callers can fall back to full template matching.
+
+    Cards are drawn pixel-identically, so every recognised slot crop is remembered
+    in a bounded LRU cache and a repeated crop skips glyph matching entirely.
+    """
+
+    _banks: Dict[str, CardGlyphBank] = {}
+    _banks_lock = threading.Lock()
+    _crop_cache = LRUCache(max_entries=int(os.getenv('CARD_CACHE_SIZE', '512')))
+
+    @classmethod
+    def get_bank(cls, category: str) -> CardGlyphBank:
+        bank = cls._banks.get(category)
+        if bank is None:
+            with cls._banks_lock:
+                bank = cls._banks.get(category)
+                if bank is None:
+                    registry = TemplateMatchService.TEMPLATE_REGISTRY
+                    templates = getattr(registry, registry.BANK_CATEGORIES[category])
+                    bank = CardGlyphBank.from_templates(category, templates)
+                    cls._banks[category] = bank
+        return bank
+
+    @classmethod
+    def get_cache_stats(cls) -> Dict:
+        return cls._crop_cache.get_stats()
+
+    @classmethod
+    def clear_cache(cls):
+        cls._crop_cache.clear()
+
+    @staticmethod
+    def find_player_cards(image: np.ndarray) -> Optional[List[Detection]]:
+        height, width = image.shape[:2]
+        if (width, height) != BOARD_IMAGE_SIZE:
+            return None
+
+        bank = CardGlyphService.get_bank("player_cards")
+
+        detections = []
+        for slot in HERO_CARD_SLOTS:
+            recognised, detection = CardGlyphService._read_slot(image, bank, slot, check_occupancy=False)
+            if not recognised:
+                return None
+            if detection is not None:
+                detections.append(detection)
+
+        return detections
+
+    @staticmethod
+    def find_table_cards(image: np.ndarray) -> Optional[List[Detection]]:
+        height, width = image.shape[:2]
+        if (width, height) != BOARD_IMAGE_SIZE:
+            return None
+
+        bank = CardGlyphService.get_bank("table_cards")
+
+        detections = []
+        for slot in BOARD_CARD_SLOTS:
+            recognised, detection = CardGlyphService._read_slot(image, bank, slot, check_occupancy=True)
+            if not recognised:
+                return None
+            detections.append(detection)
+
+        occupied = [detection is not None for detection in detections]
+        if sum(occupied) not in VALID_BOARD_CARD_COUNTS or occupied != sorted(occupied, reverse=True):
+            return None
+
+        return [detection for detection in detections if detection is not None]
+
+    @classmethod
+    def _read_slot(cls, image: np.ndarray, bank: CardGlyphBank,
+                   slot: Tuple[int, int, int, int], check_occupancy: bool) -> Tuple[bool, Optional[Detection]]:
+        """
+        Recognise the card in one slot, answering repeated crops from the cache.
+
+        Returns (recognised, detection); a recognised slot without detection is empty.
+        """
+        x, y, w, h = slot
+        padding = RANK_SEARCH_PADDING
+        crop = image[max(0, y - padding):y + h + padding, max(0, x - padding):x + w + padding]
+        key = (bank.category, image_digest(crop))
+
+        cached = cls._crop_cache.get(key, _MISS)
+        if cached is not _MISS:
+            if cached is None:
+                return True, None
+            name, match_score, (dx, dy, card_w, card_h) = cached
+            return True, CardGlyphService._to_detection(name, match_score, (x + dx, y + dy, card_w, card_h))
+
+        # Board slots have a cheap occupancy test, hero slots are empty when no rank glyph shows up
+        if check_occupancy and not is_card_slot_occupied(image, slot):
+            cls._crop_cache.put(key, None)
+            return True, None
+
+        rank, rank_score, rank_location = CardGlyphService._match_rank(image, bank, (x, y))
+        if not check_occupancy and rank_score < GLYPH_EMPTY_THRESHOLD:
+            cls._crop_cache.put(key, None)
+            return True, None
+
+        detection = CardGlyphService._classify_corner(image, bank, rank, rank_score, rank_location)
+        if detection is None:
+            return False, None
+
+        card_x, card_y, card_w, card_h = detection.bounding_rect
+        cls._crop_cache.put(key, (detection.name, detection.match_score, (card_x - x, card_y - y, card_w, card_h)))
+        return True, detection
+
+    @staticmethod
+    def _match_rank(image: np.ndarray, bank: CardGlyphBank,
+                    corner: Tuple[int, int]) -> Tuple[str, float, Tuple[int, int]]:
+        """Best rank glyph around a card corner: (rank, score, glyph top-left)"""
+        best = ("", 0.0, corner)
+        for compiled in bank.ranks:
+            offset_x, offset_y = bank.rank_offsets[compiled.name]
+            score, location = CardGlyphService._match_glyph(
+                image, compiled.scaled[1.0],
+                corner[0] + offset_x, corner[1] + offset_y, RANK_SEARCH_PADDING
+            )
+            if score > best[1]:
+                best = (compiled.name, score, location)
+        return best
+
+    @staticmethod
+    def _classify_corner(image: np.ndarray, bank: CardGlyphBank, rank: str, rank_score: float,
+                         rank_location: Tuple[int, int]) -> Optional[Detection]:
+        if rank_score < GLYPH_MATCH_THRESHOLD:
+            return None
+
+        suit, suit_score = "", 0.0
+        for compiled in bank.suits:
+            offset_x, offset_y = bank.suit_offsets[compiled.name]
+            score, _ = CardGlyphService._match_glyph(
+                image, compiled.scaled[1.0],
+                rank_location[0] + offset_x, rank_location[1] + offset_y, SUIT_SEARCH_PADDING
+            )
+            if score > suit_score:
+                suit, suit_score = compiled.name, score
+
+        card_name = bank.card_names.get(rank + suit)
+        if suit_score < GLYPH_MATCH_THRESHOLD or card_name is None:
+            return None
+
+        offset_x, offset_y = bank.rank_offsets[rank]
+        w, h = bank.card_sizes[card_name]
+        rect = (rank_location[0] - offset_x, rank_location[1] - offset_y, w, h)
+        return CardGlyphService._to_detection(card_name, min(rank_score, suit_score), rect)
+
+    @staticmethod
+    def _to_detection(name: str, match_score: float, rect: Tuple[int, int, int, int]) -> Detection:
+        x, y, w, h = rect
+        return Detection(
+            name=name,
+            center=(x + w // 2, y + h // 2),
+            bounding_rect=rect,
+            match_score=match_score,
+            scale=1.0
+        )
+
+    @staticmethod
+    def _match_glyph(image: np.ndarray, glyph: np.ndarray, x: int, y: int,
+                     padding: int) -> Tuple[float, Tuple[int, int]]:
+        """Match one glyph in a small window around its expected top-left (x, y)"""
+        glyph_h, glyph_w = glyph.shape
+        left, top = max(0, x - padding), max(0, y - padding)
+        window = glyph_channel(image[top:y + glyph_h + padding, left:x + glyph_w + padding])
+        if window.shape[0] < glyph_h or window.shape[1] < glyph_w:
+            return 0.0, (x, y)
+
+        result = cv2.matchTemplate(window, glyph, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if not np.isfinite(max_val):
+            return 0.0, (x, y)
+        return float(max_val), (left + max_loc[0], top + max_loc[1])
@@ -0,0 +1,123 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from table_detector.services.template_bank import TemplateBank
+from table_detector.services.template_matcher_service import TemplateMatchService
+from table_detector.utils.opencv_utils import count_holes, glyph_channel, segment_glyphs
+
+DIGIT_BRIGHT_LEVEL = 130  # bid text is white on the dark felt or a red chip label
+DIGIT_MATCH_THRESHOLD = 0.85
+DIGIT_MATCH_MARGIN = 0.04  # best digit must beat the runner-up digit by this much
+DIGIT_SEARCH_PADDING = 2
+DIGIT_HEIGHT_RANGE = (6, 10)
+DIGIT_MAX_WIDTH = 10
+DECIMAL_POINT_MAX_SIZE = (3, 2)  # (w, h)
+
+
+class DigitGlyphService:
+    """
+    Reads bid amounts (digits and a decimal point) from a bid region at native resolution.
+
+    The binarised region is split into glyphs by connected components; the decimal
+    point is told apart by its size and every other glyph is matched against the
+    bid_digits templates in a small window around it. A handful of 10x5 pixel
+    matches replaces an upscale plus a tesseract process per region.
+
+    There are no templates for 2, 6 and 9, and a 6 or 9 correlates well with 5 or 3.
+    A match therefore also needs the glyph's hole count to equal its template's
+    (6 and 9 have one, 5 and 3 none) and a clear margin over the next digit;
+    anything else reads with confidence 0.0 and is left to OCR.
+    """
+
+    _bank: Optional[TemplateBank] = None
+    _template_holes: Dict[str, int] = {}
+    _bank_lock = threading.Lock()
+
+    @classmethod
+    def get_bank(cls) -> TemplateBank:
+        if cls._bank is None:
+            with cls._bank_lock:
+                if cls._bank is None:
+                    templates = TemplateMatchService.TEMPLATE_REGISTRY.bid_digit_templates
+                    channels = {name: glyph_channel(template) for name, template in templates.items()}
+                    cls._template_holes = {
+                        name: count_holes(channel > DIGIT_BRIGHT_LEVEL) for name, channel in channels.items()
+                    }
+                    cls._bank = TemplateBank.compile("bid_digits", channels)
+        return cls._bank
+
+    @staticmethod
+    def read_amount(region: np.ndarray) -> Optional[Tuple[str, float]]:
+        """
+        Read the amount drawn in a bid region.
+
+        Returns:
+            None when the region holds no bright glyphs at all, otherwise (text, confidence)
+            where confidence is the worst digit match score - 0.0 when a glyph is not a
+            digit or a decimal point, or the glyphs do not form an amount
+        """
+        channel = glyph_channel(region)
+        # Pieces cut by the left edge belong to neighbouring chip graphics
+        glyphs = [glyph for glyph in segment_glyphs(channel > DIGIT_BRIGHT_LEVEL) if glyph[0] > 0]
+        if not glyphs:
+            return None
+
+        baseline = max(y + h for _, y, _, h in glyphs)
+        text, confidence = "", 1.0
+        for x, y, w, h in glyphs:
+            if w <= DECIMAL_POINT_MAX_SIZE[0] and h <= DECIMAL_POINT_MAX_SIZE[1] and y + h >= baseline - 1:
+                text += "."
+                continue
+            if (not DIGIT_HEIGHT_RANGE[0] <= h <= DIGIT_HEIGHT_RANGE[1] or w > DIGIT_MAX_WIDTH
+                    or x + w >= channel.shape[1]):
+                return text, 0.0
+
+            digit, score = DigitGlyphService._match_digit(channel, (x, y, w, h))
+            text += digit
+            confidence = min(confidence, score)
+
+        if not DigitGlyphService._is_amount(text):
+            return text, 0.0
+        return text, confidence
+
+    @staticmethod
+    def _match_digit(channel: np.ndarray, glyph: Tuple[int, int, int, int]) -> Tuple[str, float]:
+        """
+        Best digit template in a small window around one glyph: (digit, score).
+
+        The score is 0.0 when the glyph's holes differ from the template's or the
+        runner-up digit scores within DIGIT_MATCH_MARGIN - likely a digit without a template.
+        """
+        x, y, w, h = glyph
+        padding = DIGIT_SEARCH_PADDING
+        window = channel[max(0, y - padding):y + h + padding, max(0, x - padding):x + w + padding]
+
+        bank = DigitGlyphService.get_bank()
+        scores: Dict[str, Tuple[float, str]] = {}
+        for compiled in bank:
+            template = compiled.scaled[1.0]
+            if window.shape[0] < template.shape[0] or window.shape[1] < template.shape[1]:
+                continue
+            _, max_val, _, _ = cv2.minMaxLoc(cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED))
+            # Template names are the digit, optionally followed by a weight suffix: '3', '3_bold'
+            digit = compiled.name[0]
+            if np.isfinite(max_val) and max_val > scores.get(digit, (0.0, ""))[0]:
+                scores[digit] = (float(max_val), compiled.name)
+        if not scores:
+            return "", 0.0
+
+        ranked = sorted(scores.items(), key=lambda item: item[1][0], reverse=True)
+        digit, (score, name) = ranked[0]
+        runner_up = ranked[1][1][0] if len(ranked) > 1 else 0.0
+        holes = count_holes(channel[y:y + h, x:x + w] > DIGIT_BRIGHT_LEVEL)
+        if holes != DigitGlyphService._template_holes[name] or score - runner_up < DIGIT_MATCH_MARGIN:
+            return digit, 0.0
+        return digit, score
+
+    @staticmethod
+    def _is_amount(text: str) -> bool:
+        parts: List[str] = text.split(".")
+        return len(parts) <= 2 and all(part.isdigit() for part in parts)
@@ -0,0 +1,102 @@
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from table_detector.utils.cache_utils import sample_frame, frame_signature
+
+
+class FrameChangeDetector:
+    """
+    Decides per window whether a new frame differs from the last kept one.
+
+    Works on a strided sample of the frame. Rectangles in `masks` (x, y, w, h in
+    frame pixels) are ignored, so timers, chat or HUD counters never count as a
+    change. With `tolerance` set, a frame only counts as changed when the mean
+    absolute difference to the last kept frame exceeds it; otherwise any sampled
+    pixel change does.
+
+    The sample misses a change that falls entirely between sampled rows or columns,
+    i.e. anything narrower than `stride` pixels. Rectangles in `full_regions` are
+    hashed at full resolution on top of the sample, so a single changed pixel there
+    (a bid digit, an action label) always counts, whatever the tolerance.
+    """
+
+    def __init__(self, stride: int = 4, tolerance: Optional[float] = None,
+                 masks: Optional[List[Tuple[int, int, int, int]]] = None,
+                 full_regions: Optional[List[Tuple[int, int, int, int]]] = None):
+        self.stride = max(1, stride)
+        self.tolerance = tolerance
+        self.masks = list(masks or [])
+        self.full_regions = list(full_regions or [])
+        self._signatures: Dict[str, Optional[int]] = {}
+        self._region_signatures: Dict[str, int] = {}
+        self._kept_samples: Dict[str, np.ndarray] = {}
+        self._keep_masks: Dict[Tuple[int, ...], Optional[np.ndarray]] = {}
+
+    @property
+    def window_names(self) -> List[str]:
+        return list(self._signatures)
+
+    def has_changed(self, window_name: str, frame: np.ndarray) -> bool:
+        sample = self._masked_sample(frame)
+        signature = frame_signature(sample)
+        region_signature = self._full_region_signature(frame)
+
+        previous_signature = self._signatures.get(window_name)
+        regions_changed = region_signature != self._region_signatures.get(window_name, region_signature)
+        if previous_signature == signature and not regions_changed:
+            return False
+
+        if self.tolerance is not None and previous_signature is not None and not regions_changed:
+            kept = self._kept_samples.get(window_name)
+            if kept is not None and kept.shape == sample.shape:
+                mean_abs_diff = np.abs(sample.astype(np.int16) - kept).mean()
+                if mean_abs_diff <= self.tolerance:
+                    return False
+
+        self._signatures[window_name] = signature
+        self._region_signatures[window_name] = region_signature
+        if self.tolerance is not None:
+            self._kept_samples[window_name] = sample.astype(np.int16)
+        return True
+
+    def invalidate(self, window_name: str):
+        """Report the next frame of a still open window as changed, whatever its pixels"""
+        if window_name in self._signatures:
+            self._signatures[window_name] = None
+            self._kept_samples.pop(window_name, None)
+
+    def forget(self, window_name: str):
+        self._signatures.pop(window_name, None)
+        self._region_signatures.pop(window_name, None)
+        self._kept_samples.pop(window_name, None)
+
+    def _full_region_signature(self, frame: np.ndarray) -> int:
+        signature = 0
+        for x, y, w, h in self.full_regions:
+            signature = zlib.crc32(np.ascontiguousarray(frame[y:y + h, x:x + w]).data, signature)
+        return signature
+
+    def _masked_sample(self, frame: np.ndarray) -> np.ndarray:
+        sample = sample_frame(frame, self.stride)
+        keep_mask = self._get_keep_mask(sample.shape)
+        if keep_mask is None:
+            return sample
+        # Zero out masked pixels so neither the signature nor the difference sees them
+        return np.where(keep_mask, sample, 0).astype(sample.dtype, copy=False)
+
+    def _get_keep_mask(self, sample_shape: Tuple[int, ...]) -> Optional[np.ndarray]:
+        if not self.masks:
+            return None
+        if sample_shape not in self._keep_masks:
+            keep = np.ones(sample_shape[:2], dtype=bool)
+            for x, y, w, h in self.masks:
+                # Sample row i is frame row i * stride
+                top, bottom = -(-y // self.stride), -(-(y + h) // self.stride)
+                left, right = -(-x // self.stride), -(-(x + w) // self.stride)
+                keep[max(0, top):bottom, max(0, left):right] = False
+            if len(sample_shape) == 3:
+                keep = keep[:, :, None]
+            self._keep_masks[sample_shape] = keep
+        return self._keep_masks[sample_shape]
@@ -1,11 +1,21 @@
 import os
-from typing import List, Dict, NamedTuple
+from typing import List, NamedTuple, Optional, Tuple
 
 from loguru import logger
 
 from table_detector.domain.captured_window import CapturedWindow
+from table_detector.services.frame_change_detector import FrameChangeDetector
+from table_detector.services.roi_change_tracker import ACTION_REGIONS, BID_REGIONS, DETECTION_REGIONS
 from table_detector.services.window_capture_service import capture_and_save_windows
 
+# Screen areas ignored by change detection, (x, y, w, h) in table pixels
+VOLATILE_REGIONS: List[Tuple[int, int, int, int]] = []
+
+# Bid amounts and action labels change by a few pixels, too little for the strided sample
+FULL_RESOLUTION_REGIONS: List[Tuple[int, int, int, int]] = [
+    rect for name, rect in DETECTION_REGIONS.items() if name in BID_REGIONS or name in ACTION_REGIONS
+]
+
 
 class WindowChanges(NamedTuple):
     changed_images: List[CapturedWindow]
@@ -13,9 +23,15 @@ class WindowChanges(NamedTuple):
 
 
 class ImageCaptureService:
-    def __init__(self):
+    def __init__(self, change_detector: Optional[FrameChangeDetector] = None):
         self.debug_mode = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
-        self._window_hashes: Dict[str, str] = {}
+        tolerance = float(os.getenv('FRAME_CHANGE_TOLERANCE', '0'))  # mean abs pixel diff, 0 = exact
+        self._change_detector = change_detector or FrameChangeDetector(
+            stride=int(os.getenv('FRAME_SAMPLE_STRIDE', '4')),
+            tolerance=tolerance if tolerance > 0 else None,
+            masks=VOLATILE_REGIONS,
+            full_regions=FULL_RESOLUTION_REGIONS
+        )
 
     def get_changed_images(self, base_timestamp_folder) -> WindowChanges:
         captured_windows = capture_and_save_windows(
@@ -26,22 +42,20 @@ class ImageCaptureService:
 
         if not captured_windows:
             logger.warning("🚫 No poker tables detected")
-            removed_windows = list(self._window_hashes.keys())
-            self._window_hashes.clear()
+            removed_windows = self._change_detector.window_names
+            for window_name in removed_windows:
+                self._change_detector.forget(window_name)
             return WindowChanges(changed_images=[], removed_windows=removed_windows)
 
         changed_images = []
         unchanged_windows = []
-        current_hashes = {}
         current_window_names = set()
 
         for captured_window in captured_windows:
             window_name = captured_window.window_name
             current_window_names.add(window_name)
-            current_hash = captured_window.calculate_hash()
-            current_hashes[window_name] = current_hash
 
-            if self._window_hashes.get(window_name) != current_hash:
+            if self._change_detector.has_changed(window_name, captured_window.get_frame_array()):
                 changed_images.append(captured_window)
             else:
                 unchanged_windows.append(captured_window)
@@ -50,10 +64,9 @@ class ImageCaptureService:
         for unchanged_window in unchanged_windows:
             unchanged_window.close()
 
-        previous_window_names = set(self._window_hashes.keys())
-        removed_windows = list(previous_window_names - current_window_names)
-
-        self._window_hashes = current_hashes
+        removed_windows = [name for name in self._change_detector.window_names if name not in current_window_names]
+        for window_name in removed_windows:
+            self._change_detector.forget(window_name)
 
         if changed_images:
             logger.info(f"🔍 Processing {len(changed_images)} changed/new images out of {len(captured_windows)} total")
@@ -65,3 +78,7 @@ class ImageCaptureService:
             logger.info("📊 All windows unchanged")
 
         return WindowChanges(changed_images=changed_images, removed_windows=removed_windows)
+
+    def invalidate(self, window_name: str):
+        """Hand the window to detection again next cycle even if its frame did not change"""
+        self._change_detector.invalidate(window_name)
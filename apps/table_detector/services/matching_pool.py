@@ -0,0 +1,93 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, Any
+
+from loguru import logger
+
+
+class MatchingPool:
+    """Long-lived, sized thread pool shared by all template matching calls (or by the per-frame detectors).
+
+    Keeps counters for queue depth (submitted but not yet started tasks) and
+    utilisation (busy worker time over wall time * workers since start).
+    """
+
+    def __init__(self, max_workers: int = 0, thread_name_prefix: str = "matcher"):
+        if max_workers <= 0:
+            max_workers = min(8, multiprocessing.cpu_count())
+
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._thread_name_prefix = thread_name_prefix
+        self._lock = threading.Lock()
+        self._started_at = time.perf_counter()
+        self._submitted = 0
+        self._running = 0
+        self._completed = 0
+        self._busy_time = 0.0
+        self._is_shutdown = False
+
+        logger.info(f"🧵 {thread_name_prefix.capitalize()} pool started with {max_workers} workers")
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            # Checked and submitted under the lock, so shutdown() can never slip in between
+            if not self._is_shutdown:
+                self._submitted += 1
+                return self._executor.submit(self._run_tracked, fn, *args, **kwargs)
+
+        # Shut down by another thread after the caller got hold of this pool: run the task here
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _run_tracked(self, fn: Callable, *args, **kwargs):
+        start = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._busy_time += elapsed
+
+    def is_worker_thread(self) -> bool:
+        """True when called from one of this pool's workers (used to avoid nested waits)."""
+        return threading.current_thread().name.startswith(self._thread_name_prefix + "_")
+
+    @property
+    def is_shutdown(self) -> bool:
+        return self._is_shutdown
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            wall_time = time.perf_counter() - self._started_at
+            capacity = wall_time * self.max_workers
+            return {
+                'max_workers': self.max_workers,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'running': self._running,
+                'queue_depth': self._submitted - self._completed - self._running,
+                'busy_time': round(self._busy_time, 4),
+                'utilisation': round(self._busy_time / capacity, 4) if capacity > 0 else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work; tasks already queued still run, their callers may be waiting on them"""
+        with self._lock:
+            if self._is_shutdown:
+                return
+            self._is_shutdown = True
+            self._executor.shutdown(wait=False)
+        if wait:
+            self._executor.shutdown(wait=True)
+        logger.info(f"🧹 {self._thread_name_prefix.capitalize()} pool shut down: {self.get_stats()}")
@@ -0,0 +1,331 @@
+import itertools
+import multiprocessing
+import queue
+import shlex
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pytesseract
+from loguru import logger
+
+DATA_FIELDS = ('text', 'conf', 'left', 'top', 'width', 'height')
+
+# Workers are started and restarted from busy threads; a forked child could inherit a lock
+# (loguru's, for one) held by another thread at that moment and deadlock on its first log call
+START_METHOD = "spawn"
+
+
+class OcrTimeoutError(Exception):
+    """An OCR request did not finish within its timeout (the worker is restarted)"""
+    pass
+
+
+class OcrWorkerError(Exception):
+    """An OCR worker crashed or its engine raised while handling a request"""
+    pass
+
+
+def parse_tesseract_config(config: str) -> Tuple[Optional[int], Dict[str, str]]:
+    """Page segmentation mode and -c variables of a tesseract command line config"""
+    psm, variables = None, {}
+    args = shlex.split(config)
+    for flag, value in zip(args, args[1:]):
+        if flag == '--psm':
+            psm = int(value)
+        elif flag == '-c' and '=' in value:
+            key, _, setting = value.partition('=')
+            variables[key] = setting
+    return psm, variables
+
+
+class PytesseractEngine:
+    """Engine that shells out to the tesseract binary through pytesseract on every call"""
+
+    name = "pytesseract"
+
+    def image_to_data(self, image: np.ndarray, config: str) -> Dict[str, List]:
+        return pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+
+    def image_to_string(self, image: np.ndarray, config: str) -> str:
+        return pytesseract.image_to_string(image, config=config)
+
+
+class TesserocrEngine:
+    """
+    Engine holding initialised tesseract APIs (tesserocr) for the life of the worker.
+
+    Settings stick to an API, so each distinct config string gets its own API, created
+    with that config's page segmentation mode and variables on first use. A call then
+    never inherits another config's settings, as with a fresh tesseract binary, and
+    init-only variables (dawgs) take effect too. Word output mirrors pytesseract's
+    image_to_data dictionary.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self):
+        import tesserocr
+        self._tesserocr = tesserocr
+        # The default API fails here rather than on the first request when tesseract is unusable
+        self._apis = {"": tesserocr.PyTessBaseAPI()}
+
+    def _api_for(self, config: str):
+        api = self._apis.get(config)
+        if api is None:
+            psm, variables = parse_tesseract_config(config)
+            options = {'variables': variables}
+            if psm is not None:
+                options['psm'] = psm
+            api = self._apis[config] = self._tesserocr.PyTessBaseAPI(**options)
+        return api
+
+    def _recognise(self, image: np.ndarray, config: str):
+        from PIL import Image
+
+        api = self._api_for(config)
+        api.SetImage(Image.fromarray(image))
+        api.Recognize()
+        return api
+
+    def image_to_data(self, image: np.ndarray, config: str) -> Dict[str, List]:
+        api = self._recognise(image, config)
+        data = {field: [] for field in DATA_FIELDS}
+        level = self._tesserocr.RIL.WORD
+        for word in self._tesserocr.iterate_level(api.GetIterator(), level):
+            box = word.BoundingBox(level)
+            if box is None:
+                continue
+            left, top, right, bottom = box
+            data['text'].append(word.GetUTF8Text(level) or "")
+            data['conf'].append(word.Confidence(level))
+            data['left'].append(left)
+            data['top'].append(top)
+            data['width'].append(right - left)
+            data['height'].append(bottom - top)
+        return data
+
+    def image_to_string(self, image: np.ndarray, config: str) -> str:
+        return self._recognise(image, config).GetUTF8Text()
+
+
+def create_ocr_engine():
+    """Persistent tesserocr engine when installed and usable, pytesseract otherwise"""
+    try:
+        return TesserocrEngine()
+    except ImportError:
+        logger.warning("⚠️ tesserocr not installed, OCR workers fall back to pytesseract")
+    except Exception as e:
+        # Installed but unable to start, e.g. no tessdata where it looks for it
+        logger.warning(f"⚠️ tesserocr failed to initialise ({e}), OCR workers fall back to pytesseract")
+    return PytesseractEngine()
+
+
+def _worker_main(connection, engine_factory: Callable):
+    """Worker process loop: build the engine once, then answer (request_id, operation, images, config)"""
+    try:
+        engine, engine_error = engine_factory(), None
+    except Exception as e:
+        # Stay up and answer with the error; dying would only have the pool restart us in a loop
+        engine, engine_error = None, f"OCR engine failed to start: {type(e).__name__}: {e}"
+
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        request_id, operation, images, config = message
+        if engine_error is not None:
+            connection.send((request_id, None, engine_error))
+            continue
+        try:
+            results = [getattr(engine, operation)(image, config) for image in images]
+            connection.send((request_id, results, None))
+        except Exception as e:
+            connection.send((request_id, None, f"{type(e).__name__}: {e}"))
+
+
+class _OcrWorker:
+    """One worker process and the parent end of its pipe"""
+
+    def __init__(self, index: int, engine_factory: Callable, context):
+        self.index = index
+        self._engine_factory = engine_factory
+        self._context = context
+        self.process = None
+        self.connection = None
+        self.start()
+
+    def start(self):
+        parent, child = self._context.Pipe()
+        self.process = self._context.Process(
+            target=_worker_main, args=(child, self._engine_factory), name=f"ocr_{self.index}", daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.connection = parent
+
+    def stop(self, graceful: bool = True):
+        if graceful and self.process.is_alive():
+            try:
+                self.connection.send(None)
+                self.process.join(timeout=1.0)
+            except (OSError, ValueError):
+                pass
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1.0)
+        self.connection.close()
+
+    def restart(self):
+        self.stop(graceful=False)
+        self.start()
+
+
+class OcrWorkerPool:
+    """
+    Long-lived OCR worker processes, each holding an initialised engine.
+
+    A call hands its images to as many idle workers as it can get, one batched
+    request per worker over a pipe, and collects the results in order. A request
+    that misses its timeout or whose worker died raises and the worker is restarted,
+    so one stuck tesseract never blocks later calls.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 5.0, engine_factory: Callable = create_ocr_engine):
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        context = multiprocessing.get_context(START_METHOD)
+        self._workers = [_OcrWorker(index, engine_factory, context) for index in range(self.max_workers)]
+        self._idle: queue.Queue = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+        self._request_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._images = 0
+        self._timeouts = 0
+        self._errors = 0
+        self._restarts = 0
+        self._is_shutdown = False
+
+        logger.info(f"🔤 OCR pool started with {self.max_workers} workers")
+
+    def image_to_data(self, image: np.ndarray, config: str, timeout: Optional[float] = None) -> Dict[str, List]:
+        return self._run("image_to_data", [image], config, timeout)[0]
+
+    def image_to_data_batch(self, images: List[np.ndarray], config: str,
+                            timeout: Optional[float] = None) -> List[Dict[str, List]]:
+        return self._run("image_to_data", images, config, timeout)
+
+    def image_to_string(self, image: np.ndarray, config: str, timeout: Optional[float] = None) -> str:
+        return self._run("image_to_string", [image], config, timeout)[0]
+
+    def _run(self, operation: str, images: List[np.ndarray], config: str, timeout: Optional[float]) -> List[Any]:
+        if self._is_shutdown:
+            raise OcrWorkerError("OCR pool is shut down")
+        if not images:
+            return []
+
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        try:
+            workers = [self._idle.get(timeout=timeout)]
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise OcrTimeoutError(f"No OCR worker free within {timeout}s")
+        while len(workers) < len(images):
+            try:
+                workers.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        with self._lock:
+            self._requests += 1
+            self._images += len(images)
+
+        # Contiguous chunks keep the results in input order
+        bounds = np.linspace(0, len(images), len(workers) + 1).astype(int)
+        chunks = [images[start:end] for start, end in zip(bounds, bounds[1:])]
+
+        sent = []
+        for worker, chunk in zip(workers, chunks):
+            request_id = next(self._request_ids)
+            try:
+                if not worker.process.is_alive():
+                    self._restart(worker)
+                worker.connection.send((request_id, operation, chunk, config))
+                sent.append((worker, request_id, None))
+            except (OSError, ValueError) as e:
+                self._restart(worker)
+                sent.append((worker, request_id, OcrWorkerError(f"OCR worker {worker.index} unreachable: {e}")))
+
+        results, error = [], None
+        for worker, request_id, send_error in sent:
+            try:
+                if send_error is not None:
+                    raise send_error
+                results.extend(self._receive(worker, request_id, deadline, timeout))
+            except (OcrTimeoutError, OcrWorkerError) as e:
+                error = error or e
+            finally:
+                self._idle.put(worker)
+
+        if error is not None:
+            raise error
+        return results
+
+    def _receive(self, worker: _OcrWorker, request_id: int, deadline: float, timeout: float) -> List[Any]:
+        try:
+            if not worker.connection.poll(max(0.0, deadline - time.monotonic())):
+                with self._lock:
+                    self._timeouts += 1
+                self._restart(worker)
+                raise OcrTimeoutError(f"OCR worker {worker.index} did not answer within {timeout}s")
+            response_id, results, error = worker.connection.recv()
+        except (EOFError, OSError) as e:
+            self._restart(worker)
+            raise OcrWorkerError(f"OCR worker {worker.index} crashed: {e}")
+
+        if error is not None or response_id != request_id:
+            with self._lock:
+                self._errors += 1
+            raise OcrWorkerError(error or f"OCR worker {worker.index} answered request {response_id}")
+        return results
+
+    def _restart(self, worker: _OcrWorker):
+        logger.warning(f"♻️ Restarting OCR worker {worker.index}")
+        worker.restart()
+        with self._lock:
+            self._restarts += 1
+
+    @property
+    def is_shutdown(self) -> bool:
+        return self._is_shutdown
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'idle': self._idle.qsize(),
+                'requests': self._requests,
+                'images': self._images,
+                'timeouts': self._timeouts,
+                'errors': self._errors,
+                'restarts': self._restarts,
+            }
+
+    def shutdown(self):
+        if self._is_shutdown:
+            return
+        self._is_shutdown = True
+        for worker in self._workers:
+            worker.stop()
+        logger.info(f"🧹 OCR pool shut down: {self.get_stats()}")
@@ -1,19 +1,50 @@
 import os
+import threading
+import time
+from concurrent.futures import Future, wait, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
 
 from loguru import logger
 
+from shared.domain.detected_bid import DetectedBid
+from shared.domain.detection import Detection
 from shared.domain.game_snapshot import GameSnapshot
 from table_detector.domain.captured_window import CapturedWindow
 from table_detector.domain.omaha_engine import OmahaEngine, OmahaEngineException
+from table_detector.domain.omaha_engine_session import OmahaEngineSession
+from table_detector.services.bid_detection_service import detect_bids_batch, PLAYER_BID_POSITIONS
+from table_detector.services.matching_pool import MatchingPool
+from table_detector.services.position_cache import PositionCache, hand_key
 from table_detector.services.position_service import PositionService
-from table_detector.utils.detect_utils import DetectUtils
+from table_detector.services.roi_change_tracker import (
+    RoiChangeTracker,
+    DETECTION_REGIONS,
+    HERO_CARDS_REGION,
+    BOARD_REGION,
+    BID_REGIONS,
+    POSITION_REGIONS,
+    actions_region,
+    bid_region
+)
+from table_detector.utils.detect_utils import DetectUtils, ACTION_POSITIONS
 from table_detector.utils.drawing_utils import save_detection_result
 from table_detector.services.rfi_range_service import RfiRangeService
 
+PLAYER_CARDS_DETECTOR = "player_cards"
+TABLE_CARDS_DETECTOR = "table_cards"
+POSITIONS_DETECTOR = "positions"
+ACTIONS_DETECTOR = "actions"
+BIDS_DETECTOR = "bids"
+
 
 class PokerGameProcessor:
 
     _rfi_service = None
+    _detector_pool: Optional[MatchingPool] = None
+    _detector_pool_size: int = int(os.getenv('DETECTOR_WORKERS', '4'))  # one per detector
+    _detector_pool_lock = threading.Lock()
+    _bid_pool: Optional[MatchingPool] = None
+    _bid_pool_lock = threading.Lock()
 
     @classmethod
     def _get_rfi_service(cls):
@@ -22,8 +53,54 @@ class PokerGameProcessor:
             cls._rfi_service = RfiRangeService(resources_dir)
         return cls._rfi_service
 
+    @classmethod
+    def get_detector_pool(cls) -> MatchingPool:
+        """Pool the per-frame detectors fan out on; separate from the matching pool they submit to."""
+        if cls._detector_pool is None or cls._detector_pool.is_shutdown:
+            with cls._detector_pool_lock:
+                if cls._detector_pool is None or cls._detector_pool.is_shutdown:
+                    cls._detector_pool = MatchingPool(max_workers=cls._detector_pool_size,
+                                                      thread_name_prefix="detector")
+        return cls._detector_pool
+
+    @classmethod
+    def shutdown_detector_pool(cls, wait: bool = True):
+        with cls._detector_pool_lock:
+            pool, cls._detector_pool = cls._detector_pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    @classmethod
+    def get_bid_pool(cls) -> MatchingPool:
+        """Single worker bid reading runs on, off the frame's detector fan-out."""
+        if cls._bid_pool is None or cls._bid_pool.is_shutdown:
+            with cls._bid_pool_lock:
+                if cls._bid_pool is None or cls._bid_pool.is_shutdown:
+                    cls._bid_pool = MatchingPool(max_workers=1, thread_name_prefix="bids")
+        return cls._bid_pool
+
+    @classmethod
+    def shutdown_bid_pool(cls, wait: bool = True):
+        with cls._bid_pool_lock:
+            pool, cls._bid_pool = cls._bid_pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
     def __init__(self):
         self.debug_mode = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
+        # Bid regions are tracked on their own, they are read per cycle across tables by submit_bids
+        self._roi_tracker = RoiChangeTracker(
+            {name: rect for name, rect in DETECTION_REGIONS.items() if name not in BID_REGIONS})
+        self._bid_tracker = RoiChangeTracker({name: DETECTION_REGIONS[name] for name in BID_REGIONS})
+        self._last_snapshots: Dict[str, GameSnapshot] = {}
+        self._position_cache = PositionCache()
+        self._engine_sessions: Dict[str, OmahaEngineSession] = {}
+        self.position_cache_enabled = os.getenv('POSITION_CACHE', 'true').lower() == 'true'
+        self.bid_detection_enabled = os.getenv('BID_DETECTION', 'true').lower() == 'true'
+        self.bid_wait = float(os.getenv('BID_WAIT_MS', '200')) / 1000
+        self._bid_jobs: Dict[str, Tuple[Future, Set[int]]] = {}
+        self._stale_bid_seats: Dict[str, Set[int]] = {}
+        self._bids_submitted: Set[str] = set()
 
     def process_window(self, captured_image: CapturedWindow, timestamp_folder) -> GameSnapshot:
         """Process captured image and return GameSnapshot."""
@@ -31,12 +108,150 @@ class PokerGameProcessor:
 
         self.validate_image(captured_image)
 
-        game_snapshot = PokerGameProcessor.create_game_snapshot(captured_image.get_cv2_image())
+        # Frames of a detection cycle had their bids submitted together beforehand
+        if window_name not in self._bids_submitted:
+            self.submit_bids([captured_image])
+        self._bids_submitted.discard(window_name)
+
+        cv2_image = captured_image.get_cv2_image()
+        changed_regions, digests = self._roi_tracker.diff(window_name, cv2_image)
+        previous = self._last_snapshots.get(window_name)
+        game_snapshot = PokerGameProcessor.create_game_snapshot(
+            cv2_image,
+            previous=previous,
+            changed_regions=changed_regions,
+            cached_positions=self._lookup_positions(window_name, previous, changed_regions),
+            engine_session=self._engine_sessions.setdefault(window_name, OmahaEngineSession())
+        )
+        # Only now: had a detector raised, its regions must still count as changed next frame
+        self._roi_tracker.commit(window_name, digests)
+        if self.bid_detection_enabled:
+            game_snapshot.bids = self._collect_bids(window_name, previous, game_snapshot.detector_timings)
+        self._last_snapshots[window_name] = game_snapshot
+
+        if self.position_cache_enabled and POSITIONS_DETECTOR in game_snapshot.detector_timings:
+            self._position_cache.put(window_name, game_snapshot.player_cards,
+                                     game_snapshot.table_cards, game_snapshot.positions)
+
         if self.debug_mode:
             save_detection_result(timestamp_folder, captured_image, game_snapshot)
 
         return game_snapshot
 
+    def forget_window(self, window_name: str):
+        """Drop carried-over state of a closed table"""
+        self._roi_tracker.forget(window_name)
+        self._bid_tracker.forget(window_name)
+        self._last_snapshots.pop(window_name, None)
+        self._position_cache.forget(window_name)
+        self._engine_sessions.pop(window_name, None)
+        self._bid_jobs.pop(window_name, None)
+        self._stale_bid_seats.pop(window_name, None)
+        self._bids_submitted.discard(window_name)
+
+    def has_pending_bids(self, window_name: str) -> bool:
+        """Whether the table has a bid read or changed seats its last snapshot does not reflect yet"""
+        return window_name in self._bid_jobs or bool(self._stale_bid_seats.get(window_name))
+
+    def refresh_positions(self, window_name: Optional[str] = None):
+        """Drop cached positions so the next frame of the table (default: every table) re-detects them"""
+        self._position_cache.invalidate(window_name)
+
+    def get_position_cache_stats(self) -> Dict[str, Any]:
+        return self._position_cache.get_stats()
+
+    def _lookup_positions(self, window_name: str, previous: Optional[GameSnapshot],
+                          changed_regions: Set[str]) -> Optional[Dict[int, Detection]]:
+        """
+        Positions of the current hand when badge regions changed but the hand did not.
+
+        The lookup is keyed on the previous frame's cards, so it is only made while the
+        hero's cards are unchanged and the board cannot have been reset (it was empty
+        or did not change). Otherwise positions are re-detected and cached afresh.
+        """
+        if not self.position_cache_enabled or previous is None or not (changed_regions & POSITION_REGIONS):
+            return None
+        if HERO_CARDS_REGION in changed_regions:
+            return None
+        if BOARD_REGION in changed_regions and previous.table_cards:
+            return None
+        return self._position_cache.get(window_name, previous.player_cards, previous.table_cards)
+
+    def submit_bids(self, captured_windows: Iterable[CapturedWindow]):
+        """
+        Start one bid read on the bid worker for the changed bid regions of all given tables.
+
+        The changed seats of every table go through a single detect_bids_batch call, so
+        OCR runs once per detection cycle instead of once per table; process_window
+        collects each table's share. A table whose previous read is still running keeps
+        its changed seats stale until that read is collected.
+        """
+        if not self.bid_detection_enabled:
+            return
+
+        cv2_images: Dict[str, Any] = {}
+        table_seats: Dict[str, Set[int]] = {}
+        for captured_image in captured_windows:
+            window_name = captured_image.window_name
+            try:
+                self.validate_image(captured_image)
+            except ValueError:
+                continue  # process_window reports it
+            self._bids_submitted.add(window_name)
+            changed_regions = self._bid_tracker.update(window_name, captured_image.get_frame_array())
+            stale = self._stale_bid_seats.setdefault(window_name, set())
+            stale.update(seat for seat in PLAYER_BID_POSITIONS if bid_region(seat) in changed_regions)
+
+            if not stale or window_name in self._bid_jobs:
+                continue
+            cv2_images[window_name] = captured_image.get_cv2_image()
+            table_seats[window_name] = set(stale)
+            stale.clear()
+
+        if not cv2_images:
+            return
+
+        def timed_detect_bids():
+            started = time.perf_counter()
+            detected = detect_bids_batch(cv2_images, table_seats=table_seats)
+            return detected, round((time.perf_counter() - started) * 1000, 1)
+
+        future = PokerGameProcessor.get_bid_pool().submit(timed_detect_bids)
+        for window_name, seats in table_seats.items():
+            self._bid_jobs[window_name] = (future, seats)
+
+    def _collect_bids(self, window_name: str, previous: Optional[GameSnapshot],
+                      detector_timings: Dict[str, float]) -> Dict[int, DetectedBid]:
+        """
+        Previous frame's bids updated with the table's bid read, if it finishes within bid_wait.
+
+        A read still running is picked up by a later frame; the snapshot never waits longer.
+        has_pending_bids tells the caller to process the table again even if its frame stays
+        the same, so a late read still reaches a snapshot.
+        """
+        bids = dict(previous.bids) if previous is not None else {}
+        job = self._bid_jobs.get(window_name)
+        if job is None:
+            return bids
+
+        future, seats = job
+        try:
+            detected_by_table, elapsed_ms = future.result(timeout=self.bid_wait)
+        except FutureTimeoutError:
+            return bids
+        except Exception as e:
+            logger.error(f"❌ Bid detection failed for {window_name}: {e}")
+            self._bid_jobs.pop(window_name, None)
+            self._stale_bid_seats.setdefault(window_name, set()).update(seats)
+            return bids
+
+        self._bid_jobs.pop(window_name, None)
+        for seat in seats:
+            bids.pop(seat, None)
+        bids.update(detected_by_table.get(window_name, {}))
+        detector_timings[BIDS_DETECTOR] = elapsed_ms
+        return bids
+
     def validate_image(self, captured_image: CapturedWindow):
         # Add size validation
         image_width, image_height = captured_image.get_size()
@@ -45,19 +260,61 @@ class PokerGameProcessor:
                 f"Неправильный размер картинки для окна {captured_image.window_name}. Ожидаеться: 784x584, Реальный размер: {image_width}x{image_height}. Скорее всего нужно поменять Jurojin Layout, размер окна в Jurojin должен быть: 770x577")
 
     @staticmethod
-    def create_game_snapshot(cv2_image):
-        player_cards_detections = DetectUtils.detect_player_cards(cv2_image)
-        table_cards_detections = DetectUtils.detect_table_cards(cv2_image)
-        position_detections = DetectUtils.detect_positions(cv2_image)
-        action_detections = DetectUtils.get_player_actions_detection(cv2_image)
+    def create_game_snapshot(cv2_image, previous: Optional[GameSnapshot] = None,
+                             changed_regions: Optional[Set[str]] = None,
+                             cached_positions: Optional[Dict[int, Detection]] = None,
+                             engine_session: Optional[OmahaEngineSession] = None):
+        """
+        Detect everything on one table frame.
+
+        With a previous snapshot and the set of changed regions, detectors whose
+        regions did not change are skipped and their results carried over.
+        cached_positions (positions still valid for this hand) replace position
+        detection on such incremental frames. An engine_session carried across frames
+        only replays moves that are new since its last frame.
+        """
+        if previous is None or changed_regions is None:
+            detectors = {
+                PLAYER_CARDS_DETECTOR: lambda: DetectUtils.detect_player_cards(cv2_image),
+                TABLE_CARDS_DETECTOR: lambda: DetectUtils.detect_table_cards(cv2_image),
+                POSITIONS_DETECTOR: lambda: DetectUtils.detect_positions(cv2_image),
+                ACTIONS_DETECTOR: lambda: DetectUtils.get_player_actions_detection(cv2_image),
+            }
+            detected, detector_timings = PokerGameProcessor.run_detectors(detectors)
+            player_cards_detections = detected[PLAYER_CARDS_DETECTOR]
+            table_cards_detections = detected[TABLE_CARDS_DETECTOR]
+            position_detections = detected[POSITIONS_DETECTOR]
+            action_detections = detected[ACTIONS_DETECTOR]
+        else:
+            changed_seats = {seat for seat in ACTION_POSITIONS if actions_region(seat) in changed_regions}
+            detectors = {}
+            if HERO_CARDS_REGION in changed_regions:
+                detectors[PLAYER_CARDS_DETECTOR] = lambda: DetectUtils.detect_player_cards(cv2_image)
+            if BOARD_REGION in changed_regions:
+                detectors[TABLE_CARDS_DETECTOR] = lambda: DetectUtils.detect_table_cards(cv2_image)
+            if changed_regions & POSITION_REGIONS and cached_positions is None:
+                detectors[POSITIONS_DETECTOR] = lambda: DetectUtils.detect_positions(cv2_image)
+            if changed_seats:
+                detectors[ACTIONS_DETECTOR] = lambda: DetectUtils.get_player_actions_detection(
+                    cv2_image, seats=changed_seats
+                )
+            logger.debug(f"♻️ Re-detecting {len(changed_regions)} changed regions: {sorted(changed_regions)}")
+
+            detected, detector_timings = PokerGameProcessor.run_detectors(detectors)
+            player_cards_detections = detected.get(PLAYER_CARDS_DETECTOR, previous.player_cards)
+            table_cards_detections = detected.get(TABLE_CARDS_DETECTOR, previous.table_cards)
+            position_detections = detected.get(
+                POSITIONS_DETECTOR, cached_positions if cached_positions is not None else previous.positions
+            )
+            action_detections = dict(previous.actions)
+            action_detections.update(detected.get(ACTIONS_DETECTOR, {}))
 
         moves_data = None
         try:
             recovered_positions = PositionService.get_positions(position_detections)
             position_actions = OmahaEngine.convert_to_position_actions(action_detections, recovered_positions)
-            game = OmahaEngine(len(position_actions))
-            game.simulate_all_moves(position_actions)
-            moves_data = game.get_moves_by_street()
+            session = engine_session if engine_session is not None else OmahaEngineSession()
+            moves_data = session.apply(position_actions, hand_key=hand_key(player_cards_detections))
             logger.info(moves_data)
         except Exception as e:
             logger.debug(f"Expected exception: {e}")
@@ -86,5 +343,32 @@ class PokerGameProcessor:
             actions=action_detections,
             moves=moves_data,
             hero_position=hero_position,
-            rfi_action=rfi_action
+            rfi_action=rfi_action,
+            detector_timings=detector_timings
         )
+
+    @staticmethod
+    def run_detectors(detectors: Dict[str, Callable]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Run independent detectors side by side on the detector pool.
+
+        Every detector is awaited before results are read, then results are read in
+        the given order, so the first failing detector in that order raises - the same
+        exception a sequential run would have raised. Returns (results, timings in ms).
+        """
+        timings: Dict[str, float] = {}
+
+        def timed(name: str, detector: Callable):
+            started = time.perf_counter()
+            try:
+                return detector()
+            finally:
+                timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+        pool = PokerGameProcessor.get_detector_pool()
+        if len(detectors) <= 1 or pool.max_workers <= 1 or pool.is_worker_thread():
+            return {name: timed(name, detector) for name, detector in detectors.items()}, timings
+
+        futures = {name: pool.submit(timed, name, detector) for name, detector in detectors.items()}
+        wait(futures.values())
+        return {name: future.result() for name, future in futures.items()}, timings
@@ -0,0 +1,84 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared.domain.detection import Detection
+
+HERO_CARD_COUNT = 4
+
+
+def hand_key(player_cards: Optional[List[Detection]]) -> Optional[Tuple[str, ...]]:
+    """Identity of the current hand: the hero's four hole cards, None while not dealt in"""
+    if not player_cards or len(player_cards) != HERO_CARD_COUNT:
+        return None
+    return tuple(card.name for card in player_cards)
+
+
+class PositionCache:
+    """
+    Per table seat -> position map, reused while a hand lasts.
+
+    The button does not move during a hand, so a resolved map stays valid until
+    the hero's hole cards change or the board shrinks (a new hand was dealt).
+    Unresolved maps (hero position "NO") are never stored.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Tuple[str, ...], int, Dict[int, Detection]]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, window_name: str, player_cards: Optional[List[Detection]],
+            table_cards: Optional[List[Detection]]) -> Optional[Dict[int, Detection]]:
+        key = hand_key(player_cards)
+        with self._lock:
+            entry = self._entries.get(window_name)
+            if entry is None or key is None:
+                self._misses += 1
+                return None
+
+            cached_key, board_count, positions = entry
+            if cached_key != key or len(table_cards or []) < board_count:
+                # New hole cards or a board reset - the button has moved
+                del self._entries[window_name]
+                self._invalidations += 1
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            return positions
+
+    def put(self, window_name: str, player_cards: Optional[List[Detection]],
+            table_cards: Optional[List[Detection]], positions: Dict[int, Detection]):
+        key = hand_key(player_cards)
+        hero = positions.get(1) if positions else None
+        with self._lock:
+            if key is None or hero is None or hero.name == "NO":
+                self._entries.pop(window_name, None)
+                return
+            self._entries[window_name] = (key, len(table_cards or []), positions)
+
+    def invalidate(self, window_name: Optional[str] = None):
+        """Force the next frame of one table (or of every table) to re-detect positions"""
+        with self._lock:
+            if window_name is None:
+                self._invalidations += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(window_name, None) is not None:
+                self._invalidations += 1
+
+    def forget(self, window_name: str):
+        with self._lock:
+            self._entries.pop(window_name, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses,
+                'invalidations': self._invalidations,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,108 @@
+from typing import Dict, Set, Tuple, Optional
+
+import numpy as np
+
+from table_detector.services.bid_detection_service import PLAYER_BID_POSITIONS
+from table_detector.services.card_glyph_service import HERO_CARD_SLOTS, RANK_SEARCH_PADDING
+from table_detector.services.template_matcher_service import BOARD_CARD_SLOTS, BOARD_SLOT_PADDING
+from table_detector.utils.cache_utils import image_digest
+from table_detector.utils.detect_utils import ACTION_POSITIONS, JUROJIN_POSITION_REGIONS, PLAYER_POSITIONS
+
+HERO_CARDS_REGION = "hero_cards"
+BOARD_REGION = "board"
+
+
+def badge_region(seat: int) -> str:
+    return f"badge_{seat}"
+
+
+def seat_region(seat: int) -> str:
+    return f"seat_{seat}"
+
+
+def actions_region(seat: int) -> str:
+    return f"actions_{seat}"
+
+
+def bid_region(seat: int) -> str:
+    return f"bid_{seat}"
+
+
+def _bounding_rect(rects, padding: int = 0) -> Tuple[int, int, int, int]:
+    left = min(x for x, _, _, _ in rects) - padding
+    top = min(y for _, y, _, _ in rects) - padding
+    right = max(x + w for x, _, w, _ in rects) + padding
+    bottom = max(y + h for _, y, _, h in rects) + padding
+    return left, top, right - left, bottom - top
+
+
+def build_detection_regions() -> Dict[str, Tuple[int, int, int, int]]:
+    """Every region a sub-detector reads, as (x, y, w, h) in the 784x584 layout"""
+    regions = {
+        HERO_CARDS_REGION: _bounding_rect(HERO_CARD_SLOTS, RANK_SEARCH_PADDING),
+        # Board slots are matched with BOARD_SLOT_PADDING around them, and read by glyphs with RANK_SEARCH_PADDING
+        BOARD_REGION: _bounding_rect(BOARD_CARD_SLOTS, max(BOARD_SLOT_PADDING, RANK_SEARCH_PADDING)),
+    }
+    for seat, coords in JUROJIN_POSITION_REGIONS.items():
+        regions[badge_region(seat)] = (coords['x'], coords['y'], coords['w'], coords['h'])
+    for seat, coords in PLAYER_POSITIONS.items():
+        regions[seat_region(seat)] = (coords['x'], coords['y'], coords['w'], coords['h'])
+    for seat, (x, y, w, h) in ACTION_POSITIONS.items():
+        regions[actions_region(seat)] = (x, y, w, h)
+    for seat, (x, y, w, h) in PLAYER_BID_POSITIONS.items():
+        regions[bid_region(seat)] = (x, y, w, h)
+    return regions
+
+
+DETECTION_REGIONS = build_detection_regions()
+
+# Position detection votes across every badge, so any of these regions invalidates all positions
+POSITION_REGIONS = frozenset(
+    [badge_region(seat) for seat in JUROJIN_POSITION_REGIONS] +
+    [seat_region(seat) for seat in PLAYER_POSITIONS]
+)
+
+BID_REGIONS = frozenset(bid_region(seat) for seat in PLAYER_BID_POSITIONS)
+
+ACTION_REGIONS = frozenset(actions_region(seat) for seat in ACTION_POSITIONS)
+
+
+class RoiChangeTracker:
+    """
+    Per table map of region digests, used to re-run only detectors whose pixels changed.
+
+    The first frame of a table reports every region as changed. Callers that may fail
+    to act on the changes use diff() and commit() only once the regions were re-read,
+    so a failed frame is reported as changed again next time.
+    """
+
+    def __init__(self, regions: Optional[Dict[str, Tuple[int, int, int, int]]] = None):
+        self.regions = regions or DETECTION_REGIONS
+        self._digests: Dict[str, Dict[str, bytes]] = {}
+
+    def update(self, window_name: str, cv2_image: np.ndarray) -> Set[str]:
+        """Store the digests of this frame and return the names of the regions that changed"""
+        changed, digests = self.diff(window_name, cv2_image)
+        self.commit(window_name, digests)
+        return changed
+
+    def diff(self, window_name: str, cv2_image: np.ndarray) -> Tuple[Set[str], Dict[str, bytes]]:
+        """Names of the regions that changed since the last committed frame, and this frame's digests"""
+        previous = self._digests.get(window_name, {})
+        current = {}
+        changed = set()
+
+        for name, (x, y, w, h) in self.regions.items():
+            digest = image_digest(cv2_image[max(0, y):y + h, max(0, x):x + w])
+            current[name] = digest
+            if previous.get(name) != digest:
+                changed.add(name)
+
+        return changed, current
+
+    def commit(self, window_name: str, digests: Dict[str, bytes]):
+        """Make the digests from diff() the base the next frame is compared to"""
+        self._digests[window_name] = digests
+
+    def forget(self, window_name: str):
+        self._digests.pop(window_name, None)
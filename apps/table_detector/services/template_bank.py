@@ -0,0 +1,75 @@
+from typing import Dict, List, Iterable, Tuple
+
+import cv2
+import numpy as np
+from loguru import logger
+
+from table_detector.utils.template_matching_utils import CompiledTemplate
+
+
+class TemplateBank:
+    """
+    Templates of one category compiled once for a fixed set of scale factors.
+
+    Every scaled template is a C-contiguous view into a single backing buffer,
+    so matching never has to resize or copy a template again.
+    """
+
+    def __init__(self, category: str, entries: List[CompiledTemplate],
+                 scale_factors: Tuple[float, ...], buffer: np.ndarray):
+        self.category = category
+        self.entries = entries
+        self.scale_factors = scale_factors
+        self._buffer = buffer
+
+    @classmethod
+    def compile(cls, category: str, templates: Dict[str, np.ndarray],
+                scale_factors: Iterable[float] = (1.0,)) -> 'TemplateBank':
+        scale_factors = tuple(scale_factors)
+
+        scaled_images = []
+        for name, template in templates.items():
+            template_h, template_w = template.shape[:2]
+            for scale in scale_factors:
+                scaled_w = int(template_w * scale)
+                scaled_h = int(template_h * scale)
+                if (scaled_w, scaled_h) == (template_w, template_h):
+                    scaled_images.append((name, scale, template))
+                else:
+                    scaled_images.append((name, scale, cv2.resize(template, (scaled_w, scaled_h))))
+
+        buffer = np.empty(sum(image.nbytes for _, _, image in scaled_images), dtype=np.uint8)
+
+        entries: Dict[str, CompiledTemplate] = {}
+        offset = 0
+        for name, scale, image in scaled_images:
+            view = buffer[offset:offset + image.nbytes].view(image.dtype).reshape(image.shape)
+            view[...] = image
+            offset += image.nbytes
+
+            if name not in entries:
+                template_h, template_w = templates[name].shape[:2]
+                entries[name] = CompiledTemplate(name, template_w, template_h, {})
+            entries[name].scaled[scale] = view
+
+        logger.debug(f"🧱 Compiled {category} bank: {len(entries)} templates x {len(scale_factors)} scales "
+                     f"({buffer.nbytes / 1024:.0f} KB)")
+
+        return cls(category, list(entries.values()), scale_factors, buffer)
+
+    @property
+    def names(self) -> List[str]:
+        return [entry.name for entry in self.entries]
+
+    @property
+    def nbytes(self) -> int:
+        return self._buffer.nbytes
+
+    def supports(self, scale_factors: Iterable[float]) -> bool:
+        return all(scale in self.scale_factors for scale in scale_factors)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
@@ -1,19 +1,36 @@
-import multiprocessing
-from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple, Union
 
 import cv2
 import numpy as np
 
+from loguru import logger
+
 from shared.domain.detection import Detection
+from table_detector.services.matching_pool import MatchingPool
+from table_detector.services.template_bank import TemplateBank
 from table_detector.services.template_registry import TemplateRegistry
 from table_detector.utils.template_matching_utils import (
-    find_single_template_matches,
-    filter_overlapping_detections,
-    sort_detections_by_position
+    find_compiled_template_matches,
+    non_max_suppression,
+    sort_match_indices
 )
+from table_detector.utils.opencv_utils import MATCH_SCORE, is_card_slot_occupied, coords_to_search_region
+
+# Board card slots (x, y, w, h) in the 784x584 Jurojin layout, left to right
+BOARD_CARD_SLOTS = [
+    (253, 234, 46, 61),
+    (310, 234, 46, 61),
+    (368, 234, 46, 61),
+    (425, 234, 46, 61),
+    (482, 234, 46, 61),
+]
+BOARD_SLOT_PADDING = 6
+BOARD_IMAGE_SIZE = (784, 584)
+VALID_BOARD_CARD_COUNTS = {0, 3, 4, 5}
 
 
 @dataclass
@@ -24,14 +41,13 @@ class MatchConfig:
     min_size: int = 20
     scale_factors: List[float] = None
     sort_by: str = 'x'  # 'x', 'y', 'score'
-    max_workers: int = 4
     match_method: int = cv2.TM_CCORR_NORMED
+    peak_distance: int = 2  # min distance between hits of one template, 0 = every pixel over threshold
+    max_hits_per_template: Optional[int] = None
 
     def __post_init__(self):
         if self.scale_factors is None:
             self.scale_factors = [1.0]
-        if self.max_workers <= 0:
-            self.max_workers = min(4, multiprocessing.cpu_count())
 
 
 class TemplateMatchService:
@@ -39,54 +55,136 @@ class TemplateMatchService:
     project_root = current_file.parent.parent.parent.parent
     TEMPLATE_REGISTRY = TemplateRegistry("canada", project_root)
 
+    _pool: Optional[MatchingPool] = None
+    _pool_size: int = int(os.getenv('MATCH_WORKERS', '0'))  # 0 = derive from cpu count
+    _pool_lock = threading.Lock()
+
+    @classmethod
+    def get_pool(cls) -> MatchingPool:
+        """Return the process-wide matching pool, creating it on first use (or after shutdown)."""
+        if cls._pool is None or cls._pool.is_shutdown:
+            with cls._pool_lock:
+                if cls._pool is None or cls._pool.is_shutdown:
+                    cls._pool = MatchingPool(max_workers=cls._pool_size)
+        return cls._pool
+
+    @classmethod
+    def configure_pool(cls, max_workers: int):
+        """Set the matching pool size. An already running pool is replaced."""
+        with cls._pool_lock:
+            cls._pool_size = max_workers
+            old_pool, cls._pool = cls._pool, None
+        if old_pool is not None:
+            old_pool.shutdown(wait=True)
+
+    @classmethod
+    def shutdown_pool(cls, wait: bool = True):
+        with cls._pool_lock:
+            pool, cls._pool = cls._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    @classmethod
+    def get_pool_stats(cls) -> Dict:
+        if cls._pool is None:
+            return {}
+        return cls._pool.get_stats()
+
     @staticmethod
-    def find_matches(image: np.ndarray, templates: Dict[str, np.ndarray],
+    def find_matches(image: np.ndarray, templates: Union[TemplateBank, Dict[str, np.ndarray]],
                      config: MatchConfig = None) -> List[Detection]:
         if config is None:
             config = MatchConfig()
+        region_results = TemplateMatchService._match_regions(image, templates, [config.search_region], config)
+        return region_results[0]()
 
+    @staticmethod
+    def find_matches_in_regions(image: np.ndarray, templates: Union[TemplateBank, Dict[str, np.ndarray]],
+                                search_regions: List[Optional[Tuple[float, float, float, float]]],
+                                config: MatchConfig = None) -> List[Optional[List[Detection]]]:
+        """
+        Match one template set in several regions with a single scheduling round.
+
+        All (region, template) pairs go to the shared pool together; the results per
+        region are the same as calling find_matches with that search_region. A region
+        whose matching fails is logged and comes back as None, the other regions are kept.
+        config.search_region is ignored in favour of search_regions.
+        """
+        if config is None:
+            config = MatchConfig()
+
+        detections = []
+        for search_region, region_result in zip(
+                search_regions, TemplateMatchService._match_regions(image, templates, search_regions, config)):
+            try:
+                detections.append(region_result())
+            except Exception as e:
+                logger.error(f"❌ Template matching error in region {search_region}: {e}")
+                detections.append(None)
+        return detections
+
+    @staticmethod
+    def _match_regions(image: np.ndarray, templates: Union[TemplateBank, Dict[str, np.ndarray]],
+                       search_regions: List[Optional[Tuple[float, float, float, float]]],
+                       config: MatchConfig) -> List[Callable[[], List[Detection]]]:
+        """Schedule every (region, template) pair; each region's callable collects its detections or raises"""
         if not templates:
-            return []
+            return [list for _ in search_regions]
 
-        # Find all template matches in parallel
-        all_detections = []
-
-        with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
-            futures = []
-            for template_name, template in templates.items():
-                future = executor.submit(
-                    find_single_template_matches,
-                    image, template, template_name,
-                    config.search_region, config.scale_factors,
-                    config.threshold, config.min_size,
-                    config.match_method
-                )
-                futures.append(future)
-
-            for future in futures:
-                detections = future.result()
-                all_detections.extend(detections)
-
-        # Filter overlapping detections
-        filtered = filter_overlapping_detections(all_detections, config.overlap_threshold)
-
-        # Sort detections
-        if config.sort_by == 'score':
-            sorted_detections = sorted(filtered, key=lambda d: d['match_score'], reverse=True)
+        # Plain template dicts are compiled on the fly; registry banks are compiled once
+        if not isinstance(templates, TemplateBank):
+            templates = TemplateBank.compile("adhoc", templates, config.scale_factors)
+        elif not templates.supports(config.scale_factors):
+            raise ValueError(f"Template bank {templates.category} was not compiled for scales {config.scale_factors}")
+
+        def match_args(search_region):
+            return (search_region, config.scale_factors, config.threshold,
+                    config.min_size, config.match_method, config.peak_distance,
+                    config.max_hits_per_template)
+
+        # Find all template matches in parallel on the shared pool
+        pool = TemplateMatchService.get_pool()
+        if pool.is_worker_thread():
+            # Already on a matcher thread - waiting on the same pool could deadlock
+            def region_result(search_region):
+                return lambda: TemplateMatchService._select_detections(templates, [
+                    find_compiled_template_matches(image, compiled, *match_args(search_region))
+                    for compiled in templates], config)
         else:
-            sorted_detections = sort_detections_by_position(filtered, config.sort_by)
+            def region_result(search_region):
+                futures = [pool.submit(find_compiled_template_matches, image, compiled, *match_args(search_region))
+                           for compiled in templates]
+                return lambda: TemplateMatchService._select_detections(
+                    templates, [future.result() for future in futures], config)
 
-        # Convert to Detection objects
-        return [TemplateMatchService._dict_to_detection(d) for d in sorted_detections]
+        return [region_result(search_region) for search_region in search_regions]
 
     @staticmethod
-    def _dict_to_detection(detection_dict: Dict) -> Detection:
+    def _select_detections(templates: TemplateBank, per_template: List[np.ndarray],
+                           config: MatchConfig) -> List[Detection]:
+        matches = np.concatenate(per_template)
+        if len(matches) == 0:
+            return []
+        template_ids = np.repeat(np.arange(len(per_template)), [len(m) for m in per_template])
+
+        # Filter overlapping detections, then sort survivors
+        keep = non_max_suppression(matches[:, :4], matches[:, MATCH_SCORE], config.overlap_threshold)
+        keep = sort_match_indices(matches, keep, config.sort_by)
+
+        # Convert only the survivors to Detection objects
+        names = templates.names
+        return [TemplateMatchService._match_to_detection(names[template_ids[i]], matches[i]) for i in keep]
+
+    @staticmethod
+    def _match_to_detection(template_name: str, match: np.ndarray) -> Detection:
+        x, y, w, h, match_score, scale = match.tolist()
+        x, y, w, h = int(x), int(y), int(w), int(h)
         return Detection(
-            name=detection_dict['template_name'],
-            center=detection_dict['center'],
-            bounding_rect=detection_dict['bounding_rect'],
-            match_score=detection_dict['match_score'],
-            scale=detection_dict.get('scale', 1.0)
+            name=template_name,
+            center=(x + w // 2, y + h // 2),
+            bounding_rect=(x, y, w, h),
+            match_score=match_score,
+            scale=scale
         )
 
     # Convenience methods for specific use cases
@@ -97,28 +195,86 @@ class TemplateMatchService:
             threshold=0.955,
             sort_by='x'
         )
-        return TemplateMatchService.find_matches(image, TemplateMatchService.TEMPLATE_REGISTRY.player_templates, config)
+        bank = TemplateMatchService.TEMPLATE_REGISTRY.get_bank("player_cards", config.scale_factors)
+        return TemplateMatchService.find_matches(image, bank, config)
 
     @staticmethod
-    def find_table_cards(image: np.ndarray) -> List[Detection]:
+    def find_table_cards(image: np.ndarray, use_slots: bool = True) -> List[Detection]:
+        """Recognise board cards from the five fixed slots, falling back to a full image search"""
+        if use_slots:
+            detections = TemplateMatchService.find_table_cards_in_slots(image)
+            if detections is not None:
+                return detections
+            logger.debug("Board slots inconclusive, falling back to full image table card search")
+
         config = MatchConfig(
             search_region=None,  # Search entire image
             threshold=0.955,
             sort_by='x'
         )
-        return TemplateMatchService.find_matches(image, TemplateMatchService.TEMPLATE_REGISTRY.table_templates, config)
+        bank = TemplateMatchService.TEMPLATE_REGISTRY.get_bank("table_cards", config.scale_factors)
+        return TemplateMatchService.find_matches(image, bank, config)
 
     @staticmethod
-    def find_positions(image: np.ndarray, search_region: Tuple[float, float, float, float] = None) -> List[Detection]:
-        config = MatchConfig(
+    def find_table_cards_in_slots(image: np.ndarray) -> Optional[List[Detection]]:
+        """
+        Classify only the occupied board slots.
+
+        Returns None when the result is not trustworthy (unexpected layout, an occupied
+        slot without a match, or an impossible board) so the caller can fall back.
+        """
+        height, width = image.shape[:2]
+        if (width, height) != BOARD_IMAGE_SIZE:
+            return None
+
+        occupied = [is_card_slot_occupied(image, slot) for slot in BOARD_CARD_SLOTS]
+        card_count = sum(occupied)
+        if card_count not in VALID_BOARD_CARD_COUNTS or occupied != sorted(occupied, reverse=True):
+            return None
+
+        config = MatchConfig(threshold=0.955, sort_by='score')
+        bank = TemplateMatchService.TEMPLATE_REGISTRY.get_bank("table_cards", config.scale_factors)
+
+        detections = []
+        for (x, y, w, h), is_occupied in zip(BOARD_CARD_SLOTS, occupied):
+            if not is_occupied:
+                continue
+            config.search_region = coords_to_search_region(
+                x - BOARD_SLOT_PADDING, y - BOARD_SLOT_PADDING,
+                w + 2 * BOARD_SLOT_PADDING, h + 2 * BOARD_SLOT_PADDING,
+                image_width=width, image_height=height
+            )
+            matches = TemplateMatchService.find_matches(image, bank, config)
+            if not matches:
+                return None
+            detections.append(matches[0])
+
+        return detections
+
+    @staticmethod
+    def _positions_config(search_region: Tuple[float, float, float, float] = None) -> MatchConfig:
+        return MatchConfig(
             search_region=search_region,
             threshold=0.85,
             min_size=10,
             sort_by='score',
             match_method=cv2.TM_CCOEFF_NORMED
         )
-        return TemplateMatchService.find_matches(image, TemplateMatchService.TEMPLATE_REGISTRY.jurojin_position_templates,
-                                                 config)
+
+    @staticmethod
+    def find_positions(image: np.ndarray, search_region: Tuple[float, float, float, float] = None) -> List[Detection]:
+        config = TemplateMatchService._positions_config(search_region)
+        bank = TemplateMatchService.TEMPLATE_REGISTRY.get_bank("jurojin_positions", config.scale_factors)
+        return TemplateMatchService.find_matches(image, bank, config)
+
+    @staticmethod
+    def find_positions_in_regions(image: np.ndarray,
+                                  search_regions: List[Tuple[float, float, float, float]]
+                                  ) -> List[Optional[List[Detection]]]:
+        """Position badges per region (best first), all regions matched in one pool round; None where matching failed"""
+        config = TemplateMatchService._positions_config()
+        bank = TemplateMatchService.TEMPLATE_REGISTRY.get_bank("jurojin_positions", config.scale_factors)
+        return TemplateMatchService.find_matches_in_regions(image, bank, search_regions, config)
 
     @staticmethod
     def find_actions(image: np.ndarray) -> List[Detection]:
@@ -128,7 +284,8 @@ class TemplateMatchService:
             min_size=20,
             sort_by='x'
         )
-        return TemplateMatchService.find_matches(image, TemplateMatchService.TEMPLATE_REGISTRY.action_templates, config)
+        bank = TemplateMatchService.TEMPLATE_REGISTRY.get_bank("actions", config.scale_factors)
+        return TemplateMatchService.find_matches(image, bank, config)
 
     @staticmethod
     def find_jurojin_actions(image: np.ndarray, search_region: Tuple[float, float, float, float]) -> List[Detection]:
@@ -138,4 +295,5 @@ class TemplateMatchService:
             min_size=20,
             sort_by='x'
         )
-        return TemplateMatchService.find_matches(image, TemplateMatchService.TEMPLATE_REGISTRY.jurojin_action_templates, config)
\ No newline at end of file
+        bank = TemplateMatchService.TEMPLATE_REGISTRY.get_bank("moves", config.scale_factors)
+        return TemplateMatchService.find_matches(image, bank, config)
\ No newline at end of file
@@ -1,13 +1,25 @@
+import threading
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Iterable, Tuple
 
 import numpy as np
 from loguru import logger
 
+from table_detector.services.template_bank import TemplateBank
 from table_detector.utils.opencv_utils import read_cv2_image
 
 
 class TemplateRegistry:
+    # Bank category -> template property backing it
+    BANK_CATEGORIES = {
+        "player_cards": "player_templates",
+        "table_cards": "table_templates",
+        "jurojin_positions": "jurojin_position_templates",
+        "moves": "jurojin_action_templates",
+        "actions": "action_templates",
+        "bid_digits": "bid_digit_templates",
+    }
+
     def __init__(self, country: str, project_root: str):
         self.country = country
         self.project_root = project_root
@@ -19,6 +31,9 @@ class TemplateRegistry:
         self._jurojin_action_templates: Optional[Dict[str, np.ndarray]] = None
         self._jurojin_position_templates: Optional[Dict[str, np.ndarray]] = None
         self._jurojin_inner_templates: Optional[Dict[str, np.ndarray]] = None
+        self._bid_digit_templates: Optional[Dict[str, np.ndarray]] = None
+        self._banks: Dict[Tuple[str, Tuple[float, ...]], TemplateBank] = {}
+        self._banks_lock = threading.Lock()
 
         self._templates_dir = Path(project_root) / "apps" / "table_detector" / "resources" / "templates" / country
 
@@ -95,5 +110,27 @@ class TemplateRegistry:
             self._jurojin_inner_templates = self._load_template_category("jurojin_inner")
         return self._jurojin_inner_templates
 
+    @property
+    def bid_digit_templates(self) -> Dict[str, np.ndarray]:
+        if self._bid_digit_templates is None:
+            self._bid_digit_templates = self._load_template_category("bid_digits")
+        return self._bid_digit_templates
+
+    def get_bank(self, category: str, scale_factors: Iterable[float] = (1.0,)) -> TemplateBank:
+        """Return the compiled bank for a category, building it once per set of scale factors."""
+        if category not in self.BANK_CATEGORIES:
+            raise ValueError(f"Unknown template bank category: {category}")
+
+        key = (category, tuple(scale_factors))
+        bank = self._banks.get(key)
+        if bank is None:
+            with self._banks_lock:
+                bank = self._banks.get(key)
+                if bank is None:
+                    templates = getattr(self, self.BANK_CATEGORIES[category])
+                    bank = TemplateBank.compile(category, templates, key[1])
+                    self._banks[key] = bank
+        return bank
+
     def has_position_templates(self) -> bool:
         return bool(self.position_templates)
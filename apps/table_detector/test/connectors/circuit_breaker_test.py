@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import patch
+
+from table_detector.connectors.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        patcher = patch('table_detector.connectors.circuit_breaker.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(failure_threshold=3, open_seconds=2.0, max_open_seconds=5.0)
+
+    def fail(self, times=1):
+        for _ in range(times):
+            self.breaker.record_failure(0.5)
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail(2)
+        self.breaker.record_success(0.1)
+        self.fail(2)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        self.fail()
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow_request())
+        self.assertEqual(self.breaker.seconds_until_probe(), 2.0)
+
+    def test_half_open_allows_a_single_probe(self):
+        self.fail(3)
+        self.now += 2.0
+
+        self.assertTrue(self.breaker.allow_request())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+        self.breaker.record_success(0.1)
+
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_failed_probes_back_off_exponentially(self):
+        self.fail(3)
+        waits = []
+        for _ in range(3):
+            self.now += self.breaker.seconds_until_probe()
+            self.assertTrue(self.breaker.allow_request())
+            self.fail()
+            waits.append(self.breaker.seconds_until_probe())
+
+        self.assertEqual(waits, [4.0, 5.0, 5.0])
+
+    def test_stats(self):
+        self.breaker.record_success(0.1)
+        self.fail(3)
+        self.breaker.allow_request()
+
+        stats = self.breaker.get_stats()
+
+        self.assertEqual((stats['state'], stats['requests'], stats['failures'], stats['rejected'], stats['opened']),
+                         (OPEN, 4, 3, 1, 1))
+        self.assertEqual(stats['error_rate'], 0.75)
+        self.assertAlmostEqual(stats['avg_latency_ms'], 400.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import patch
+from urllib.parse import urlsplit
+
+from apps.server import create_app
+from shared.protocol.message_protocol import BatchUpdateMessage, GameUpdateMessage, TableRemovalMessage
+from table_detector.connectors.server_connector import ServerConfig, SimpleHttpConnector
+
+URL = "http://server"
+
+
+class FlaskResponse:
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self._data = response.get_json()
+
+    def json(self):
+        return self._data
+
+
+class FlaskSession:
+    """Stands in for requests.Session, posting to a Flask app's test client"""
+
+    def __init__(self):
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.posted = []
+
+    def post(self, url, timeout=None, json=None, **kwargs):
+        self.posted.append(json)
+        return FlaskResponse(self.client.post(urlsplit(url).path, json=json))
+
+    def tables(self):
+        states = self.app.extensions["game_state_service"].get_client_game_states("c1")
+        return {state['window_name']: state for state in states}
+
+
+def batch(updates=(), removed_windows=()):
+    return BatchUpdateMessage(
+        type='batch_update', client_id="c1", timestamp="t",
+        updates=[GameUpdateMessage(type='game_update', client_id="c1", window_name=window_name, timestamp="t",
+                                   game_data=game_data) for window_name, game_data in updates],
+        removals=[TableRemovalMessage(type='table_removal', client_id="c1", removed_windows=list(removed_windows),
+                                      timestamp="t")] if removed_windows else []
+    )
+
+
+class DeltaSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        # Drain the outbox on this thread instead of the connector's sender
+        with patch.object(SimpleHttpConnector, '_drain_outbox'):
+            self.connector = SimpleHttpConnector([ServerConfig(URL)], wire_format='json')
+        self.config = self.connector.server_configs[0]
+        self.outbox = self.connector._outboxes[URL]
+        self.outbox.close()
+        self.restart_server()
+
+    def restart_server(self):
+        self.server = FlaskSession()
+        self.connector.session = self.server
+
+    def cycle(self, message):
+        self.server.posted.clear()
+        self.connector.send_batch(message)
+        self.connector._drain_outbox(self.config, self.outbox)
+        return [update for body in self.server.posted for update in body['updates']]
+
+    def test_full_delta_restart_resync_removal_and_readd(self):
+        first = self.cycle(batch([("w1", {'street': 'preflop', 'pot': 1, 'moves': ['raise']})]))
+        self.assertNotIn('base_version', first[0])
+
+        delta = self.cycle(batch([("w1", {'street': 'flop', 'pot': 1})]))
+        self.assertEqual((delta[0]['game_data'], delta[0]['removed_keys'], delta[0]['base_version']),
+                         ({'street': 'flop'}, ['moves'], first[0]['version']))
+        self.assertEqual(self.server.tables()["w1"]['street'], 'flop')
+        self.assertNotIn('moves', self.server.tables()["w1"])
+
+        # A restarted server has no base for the next delta and asks for the full state
+        self.restart_server()
+        resync = self.cycle(batch([("w1", {'street': 'turn', 'pot': 1})]))
+        self.assertEqual([('base_version' in update, update['game_data']) for update in resync],
+                         [(True, {'street': 'turn'}), (False, {'street': 'turn', 'pot': 1})])
+        self.assertEqual((self.server.tables()["w1"]['street'], self.server.tables()["w1"]['pot']), ('turn', 1))
+
+        self.cycle(batch(removed_windows=["w1"]))
+        self.assertEqual(self.server.tables(), {})
+        self.assertEqual(self.connector._sent_tables[URL], {})
+
+        readded = self.cycle(batch([("w1", {'street': 'preflop', 'pot': 2})]))
+        self.assertNotIn('base_version', readded[0])
+        self.assertEqual(self.server.tables()["w1"]['pot'], 2)
+
+    def test_failed_post_makes_the_next_update_full(self):
+        self.cycle(batch([("w1", {'street': 'preflop'})]))
+        self.assertEqual(self.connector._forget_tables(self.config, "c1", ["w1", "unknown"])[0].game_data,
+                         {'street': 'preflop'})
+
+        after = self.cycle(batch([("w1", {'street': 'flop'})]))
+
+        self.assertNotIn('base_version', after[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
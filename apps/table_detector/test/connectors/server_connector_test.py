@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+
+from shared.protocol.message_protocol import BatchUpdateMessage, GameUpdateMessage
+from table_detector.connectors.circuit_breaker import CLOSED, OPEN
+from table_detector.connectors.server_connector import ServerConfig, SimpleHttpConnector
+
+URL = "http://server"
+
+
+def response(status_code, data):
+    answer = Mock(status_code=status_code)
+    answer.json.return_value = data
+    return answer
+
+
+def batch(*window_names):
+    return BatchUpdateMessage(type='batch_update', client_id="c1", timestamp="t", updates=[
+        GameUpdateMessage(type='game_update', client_id="c1", window_name=window_name, timestamp="t",
+                          game_data={'street': 'flop'}) for window_name in window_names])
+
+
+class ConnectorFailureTest(unittest.TestCase):
+
+    def connect(self, post, get=None, wire_format='auto'):
+        session = Mock()
+        session.post.side_effect = post
+        session.get.side_effect = get or requests.exceptions.ConnectionError("refused")
+        # Drain the outbox on this thread instead of the connector's sender
+        with patch('table_detector.connectors.server_connector.requests.Session', return_value=session), \
+                patch.object(SimpleHttpConnector, '_drain_outbox'):
+            self.connector = SimpleHttpConnector([ServerConfig(URL, failure_threshold=3)], wire_format=wire_format)
+        self.outbox = self.connector._outboxes[URL]
+        self.outbox.close()
+        return session
+
+    def cycle(self, message):
+        self.connector.send_batch(message)
+        self.connector._drain_outbox(self.connector.server_configs[0], self.outbox)
+
+    def health(self):
+        return self.connector.get_server_health()[URL]
+
+    def test_failure_below_threshold_keeps_the_batch(self):
+        session = self.connect([requests.exceptions.Timeout("slow"), response(200, {'status': 'success'})],
+                               wire_format='json')
+
+        self.cycle(batch("w1", "w2"))
+
+        self.assertEqual(session.post.call_count, 2)
+        resent = session.post.call_args.kwargs['json']
+        self.assertEqual([update['window_name'] for update in resent['updates']], ["w1", "w2"])
+        self.assertNotIn('base_version', resent['updates'][0])
+        self.assertEqual((self.health()['state'], self.health()['failures']), (CLOSED, 1))
+
+    def test_dead_server_counts_one_failure_per_attempt(self):
+        session = self.connect(requests.exceptions.ConnectionError("refused"))
+
+        self.cycle(batch("w1"))
+
+        # The circuit opens after exactly failure_threshold posts; negotiation is not counted
+        self.assertEqual(session.post.call_count, 3)
+        self.assertEqual((self.health()['state'], self.health()['requests'], self.health()['failures']),
+                         (OPEN, 3, 3))
+        self.assertEqual(session.get.call_count, 1)  # only at startup
+        self.assertEqual(self.outbox.get_stats()['pending'], 1)
+
+    def test_formats_are_negotiated_once_the_server_answers(self):
+        session = self.connect([response(200, {'status': 'success'})] * 2,
+                               get=[requests.exceptions.ConnectionError("starting"),
+                                    response(200, {'content_types': ['application/json']})])
+
+        self.cycle(batch("w1"))
+        self.cycle(batch("w1"))
+
+        self.assertEqual(session.get.call_count, 2)
+        self.assertEqual(self.connector._content_types, {URL: 'application/json'})
+        self.assertEqual(self.health()['requests'], 2)
+
+    def test_rejected_batch_is_not_sent_again(self):
+        session = self.connect([response(400, {'error': "JSON data required"})], wire_format='json')
+
+        self.cycle(batch("w1"))
+
+        self.assertEqual(session.post.call_count, 1)
+        self.assertEqual(self.outbox.get_stats()['pending'], 0)
+        self.assertEqual(self.connector._sent_tables[URL], {})
+
+    def test_connectivity_check_leaves_the_circuit_alone(self):
+        session = self.connect(requests.exceptions.ConnectionError("refused"), wire_format='json')
+        self.cycle(batch("w1"))
+        session.get.side_effect = None
+        session.get.return_value = response(200, {'connected_clients': []})
+
+        result = self.connector.test_connectivity()[URL]
+
+        self.assertTrue(result['reachable'])
+        self.assertEqual((result['health']['state'], result['health']['requests']), (OPEN, 3))
+        self.assertEqual(self.health()['state'], OPEN)
+
+
+if __name__ == '__main__':
+    unittest.main()
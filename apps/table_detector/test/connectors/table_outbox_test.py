@@ -0,0 +1,73 @@
+import threading
+import unittest
+from collections import namedtuple
+
+from table_detector.connectors.table_outbox import TableOutbox
+
+Update = namedtuple('Update', ['client_id', 'window_name', 'value'])
+
+
+class TableOutboxTest(unittest.TestCase):
+
+    def setUp(self):
+        self.outbox = TableOutbox()
+
+    def test_newest_update_per_table_wins(self):
+        for value in range(3):
+            self.outbox.put_update(Update('c1', 'a', value))
+        self.outbox.put_update(Update('c1', 'b', 0))
+        self.outbox.put_update(Update('c2', 'a', 0))
+
+        updates, removals = self.outbox.take()
+
+        self.assertEqual(updates, [Update('c1', 'a', 2), Update('c1', 'b', 0), Update('c2', 'a', 0)])
+        self.assertEqual(removals, [])
+        stats = self.outbox.get_stats()
+        self.assertEqual((stats['pending'], stats['superseded'], stats['taken']), (0, 2, 3))
+
+    def test_removal_drops_pending_update(self):
+        self.outbox.put_update(Update('c1', 'a', 0))
+        self.outbox.put_removal('c1', 'a')
+
+        self.assertEqual(self.outbox.take(), ([], [('c1', 'a')]))
+        self.assertEqual(self.outbox.get_stats()['dropped'], 1)
+
+    def test_update_after_removal_cancels_it(self):
+        self.outbox.put_removal('c1', 'a')
+        self.outbox.put_update(Update('c1', 'a', 1))
+
+        self.assertEqual(self.outbox.take(), ([Update('c1', 'a', 1)], []))
+
+    def test_resync_never_replaces_newer_update(self):
+        self.outbox.put_update(Update('c1', 'a', 2))
+
+        self.assertFalse(self.outbox.put_update_if_absent(Update('c1', 'a', 1)))
+        self.assertTrue(self.outbox.put_update_if_absent(Update('c1', 'b', 1)))
+        self.assertEqual(self.outbox.take()[0], [Update('c1', 'a', 2), Update('c1', 'b', 1)])
+
+    def test_requeue_keeps_newer_pending_messages(self):
+        self.outbox.put_update(Update('c1', 'a', 2))
+        self.outbox.put_removal('c1', 'b')
+
+        self.outbox.requeue([Update('c1', 'a', 1), Update('c1', 'b', 1), Update('c1', 'c', 1)], [('c1', 'd')])
+
+        self.assertEqual(self.outbox.take(), ([Update('c1', 'a', 2), Update('c1', 'c', 1)],
+                                              [('c1', 'b'), ('c1', 'd')]))
+        self.assertEqual(self.outbox.get_stats()['requeued'], 2)
+
+    def test_take_waits_for_messages_and_ends_on_close(self):
+        self.assertIsNone(self.outbox.take(timeout=0.01))
+
+        taken = []
+        sender = threading.Thread(target=lambda: taken.extend([self.outbox.take(), self.outbox.take()]))
+        sender.start()
+        self.outbox.put_update(Update('c1', 'a', 0))
+        self.outbox.close()
+        sender.join(timeout=2.0)
+
+        self.assertFalse(sender.is_alive())
+        self.assertEqual(taken, [([Update('c1', 'a', 0)], []), None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+from shared.domain.moves import MoveType
+from shared.domain.position import Position
+from table_detector.domain.omaha_engine import OmahaEngine, InvalidPositionSequenceError, InvalidActionError
+from table_detector.domain.omaha_engine_session import OmahaEngineSession
+
+EP, MP, CO = Position.EARLY_POSITION, Position.MIDDLE_POSITION, Position.CUTOFF
+BTN, SB, BB = Position.BUTTON, Position.SMALL_BLIND, Position.BIG_BLIND
+
+
+def history(**moves):
+    positions = {'EP': EP, 'MP': MP, 'CO': CO, 'BTN': BTN, 'SB': SB, 'BB': BB}
+    result = {position: [] for position in positions.values()}
+    for name, position_moves in moves.items():
+        result[positions[name]] = list(position_moves)
+    return result
+
+
+def full_replay(position_actions):
+    game = OmahaEngine(len(position_actions))
+    game.simulate_all_moves({position: list(moves) for position, moves in position_actions.items()})
+    return game.get_moves_by_street()
+
+
+class TestOmahaEngineSession(unittest.TestCase):
+
+    def setUp(self):
+        self.frames = [
+            history(EP=[MoveType.FOLD]),
+            history(EP=[MoveType.FOLD], MP=[MoveType.CALL], CO=[MoveType.FOLD]),
+            history(EP=[MoveType.FOLD], MP=[MoveType.CALL], CO=[MoveType.FOLD], BTN=[MoveType.FOLD],
+                    SB=[MoveType.CALL], BB=[MoveType.CHECK]),
+            history(EP=[MoveType.FOLD], MP=[MoveType.CALL, MoveType.CALL], CO=[MoveType.FOLD],
+                    BTN=[MoveType.FOLD], SB=[MoveType.CALL, MoveType.CHECK], BB=[MoveType.CHECK, MoveType.BET]),
+        ]
+
+    def test_growing_history_matches_full_replay(self):
+        session = OmahaEngineSession()
+
+        for frame in self.frames:
+            self.assertEqual(session.apply(frame), full_replay(frame))
+        self.assertEqual(session.rebuilds, 1)
+
+    def test_returned_moves_do_not_change_later(self):
+        session = OmahaEngineSession()
+        first = session.apply(self.frames[0])
+
+        session.apply(self.frames[1])
+
+        self.assertEqual(first, full_replay(self.frames[0]))
+
+    def test_conflicting_history_rebuilds(self):
+        session = OmahaEngineSession()
+        session.apply(self.frames[1])
+
+        corrected = history(EP=[MoveType.RAISE])
+
+        self.assertEqual(session.apply(corrected), full_replay(corrected))
+        self.assertEqual(session.rebuilds, 2)
+
+    def test_new_hand_key_rebuilds(self):
+        session = OmahaEngineSession()
+        session.apply(self.frames[0], hand_key=('AS', 'KD', '7C', '2H'))
+
+        session.apply(self.frames[0], hand_key=('QS', 'QD', '7C', '2H'))
+
+        self.assertEqual(session.rebuilds, 2)
+
+    def test_waiting_actor_resumes_without_rebuild(self):
+        session = OmahaEngineSession()
+        gap = history(EP=[MoveType.FOLD], CO=[MoveType.FOLD])
+
+        with self.assertRaises(InvalidPositionSequenceError):
+            session.apply(gap)
+        filled = history(EP=[MoveType.FOLD], MP=[MoveType.CALL], CO=[MoveType.FOLD])
+
+        self.assertEqual(session.apply(filled), full_replay(filled))
+        self.assertEqual(session.rebuilds, 1)
+
+    def test_invalid_action_raises_again_on_same_history(self):
+        session = OmahaEngineSession()
+        invalid = history(EP=[MoveType.CHECK])
+
+        for _ in range(2):
+            with self.assertRaises(InvalidActionError):
+                session.apply(invalid)
+
+
+if __name__ == '__main__':
+    unittest.main()
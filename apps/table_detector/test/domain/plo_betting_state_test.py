@@ -0,0 +1,119 @@
+import random
+import time
+import unittest
+
+from loguru import logger
+
+from shared.domain.moves import MoveType
+from shared.domain.position import Position
+from table_detector.domain.omaha_engine import OmahaEngine
+from table_detector.domain.plo_betting_state import PloBettingState
+
+EP, MP, CO = Position.EARLY_POSITION, Position.MIDDLE_POSITION, Position.CUTOFF
+BTN, SB, BB = Position.BUTTON, Position.SMALL_BLIND, Position.BIG_BLIND
+FOLD, CHECK, CALL = MoveType.FOLD, MoveType.CHECK, MoveType.CALL
+BET, RAISE = MoveType.BET, MoveType.RAISE
+
+# Action sequences of omaha_game_test.py
+SCENARIOS = [
+    (6, [(EP, FOLD), (MP, CALL), (CO, RAISE)]),
+    (6, [(EP, FOLD), (MP, CALL), (BTN, CALL)]),
+    (6, [(EP, FOLD), (MP, CALL), (CO, RAISE), (BTN, CALL), (SB, FOLD), (BB, CALL)]),
+    (2, [(SB, CALL), (BB, CHECK)]),
+    (6, [(EP, FOLD), (MP, FOLD), (CO, FOLD), (BTN, FOLD), (SB, FOLD)]),
+    (6, [(EP, CALL), (MP, RAISE), (CO, CALL), (BTN, RAISE), (SB, FOLD), (BB, CALL), (EP, CALL), (MP, CALL),
+         (CO, FOLD)]),
+    (2, [(SB, RAISE), (BB, RAISE), (SB, CALL)]),
+    (3, [(BTN, CALL), (SB, RAISE), (BB, CALL), (BTN, FOLD)]),
+    (4, [(CO, RAISE), (BTN, CALL), (SB, FOLD), (BB, CALL)]),
+    (5, [(EP, FOLD), (CO, CALL), (BTN, RAISE), (SB, FOLD), (BB, CALL)]),
+    (3, [(BTN, CALL), (SB, CALL), (BB, CHECK), (SB, CHECK)]),
+    (3, [(BTN, CALL), (SB, CALL), (BB, CHECK), (SB, CHECK), (BB, CHECK), (BTN, CHECK), (SB, BET)]),
+]
+
+
+def play(player_count, actions, strict):
+    """Moves by street and the error type (if any) of processing actions one by one"""
+    game = OmahaEngine(player_count, strict=strict)
+    try:
+        for position, action in actions:
+            game.process_action(position, action)
+    except Exception as e:
+        return game.get_moves_by_street(), type(e)
+    return game.get_moves_by_street(), None
+
+
+def play_move(game, position, move):
+    try:
+        game.process_action(position, move)
+    except Exception as e:
+        return type(e)
+    return None
+
+
+class TestPloBettingState(unittest.TestCase):
+
+    def test_blinds_and_opener_match_pokerkit(self):
+        for player_count in range(2, 7):
+            with self.subTest(player_count=player_count):
+                native = OmahaEngine(player_count, strict=False)
+                strict = OmahaEngine(player_count, strict=True)
+
+                self.assertEqual(native.seat_mapping, strict.seat_mapping)
+                self.assertEqual(native.get_current_position(), strict.get_current_position())
+                self.assertEqual(native.poker_state.bets, [int(b * 2) for b in strict.poker_state.bets])
+
+    def test_scenarios_match_pokerkit(self):
+        for player_count, actions in SCENARIOS:
+            with self.subTest(player_count=player_count, actions=actions):
+                self.assertEqual(play(player_count, actions, strict=False), play(player_count, actions, strict=True))
+
+    def test_random_hands_match_pokerkit(self):
+        rng = random.Random(15)
+        moves = [FOLD, CHECK, CALL, BET, RAISE]
+
+        for hand in range(150):
+            player_count = rng.randint(2, 6)
+            # Raise-heavy hands run stacks all-in, the others reach later streets
+            weights = [[1, 2, 3, 1, 1], [0.2, 1, 1, 3, 6]][hand % 2]
+            native = OmahaEngine(player_count, strict=False)
+            strict = OmahaEngine(player_count, strict=True)
+
+            for _ in range(150):
+                if strict.poker_state.actor_index is None:
+                    self.assertIsNone(native.poker_state.actor_index)
+                    break
+                position = strict.get_current_position()
+                self.assertEqual(native.get_current_position(), position)
+                self.assertEqual(native.get_current_street(), strict.get_current_street())
+
+                move = rng.choices(moves, weights)[0]
+                self.assertEqual(play_move(native, position, move), play_move(strict, position, move))
+                self.assertEqual(native.get_moves_by_street(), strict.get_moves_by_street())
+
+    def test_all_in_leaves_only_call_or_fold(self):
+        state = PloBettingState(3, starting_stack=20)
+        state.complete_bet_or_raise_to()    # BTN min-raises to 4
+        state.complete_bet_or_raise_to(20)  # SB shoves
+
+        self.assertEqual(state.actor_index, 1)
+        self.assertFalse(state.can_complete_bet_or_raise_to())
+        self.assertTrue(state.can_fold())
+        self.assertEqual(state.checking_or_calling_amount, 18)
+
+    def test_benchmark_against_pokerkit(self):
+        rounds = 20
+        timings = {}
+        for strict in (True, False):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for player_count, actions in SCENARIOS:
+                    play(player_count, actions, strict)
+            timings[strict] = (time.perf_counter() - start) * 1000 / (rounds * len(SCENARIOS))
+
+        logger.info(f"⏱️  Omaha scenario replay: pokerkit {timings[True]:.3f}ms, native {timings[False]:.3f}ms")
+        self.assertLess(timings[False], timings[True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import shutil
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytesseract
+
+from table_detector.services.bid_detection_service import (
+    MOSAIC_SPACER,
+    OCR_MIN_CONFIDENCE,
+    PLAYER_BID_POSITIONS,
+    TESSERACT_CONFIG,
+    _assign_words_to_bands,
+    _build_bid_mosaic,
+    _combine_with_confidence,
+    _extract_mosaic_bid_texts,
+    _preprocess_bid_region,
+    clear_ocr_cache,
+    detect_bids,
+    detect_bids_batch,
+    get_ocr_cache_stats
+)
+from table_detector.services.template_matcher_service import TemplateMatchService
+
+RESOURCES = Path(__file__).parent.parent / "resources"
+
+
+def load_resource(name):
+    return cv2.imread(str(RESOURCES / name))
+
+
+def preprocessed_region(image, position):
+    x, y, w, h = PLAYER_BID_POSITIONS[position]
+    return _preprocess_bid_region(image[y:y + h, x:x + w])
+
+
+def word(text, conf, left, top, width=40, height=64):
+    return {'text': text, 'conf': conf, 'left': left, 'top': top, 'width': width, 'height': height}
+
+
+def ocr_data(*words):
+    return {field: [w[field] for w in words] for field in ('text', 'conf', 'left', 'top', 'width', 'height')}
+
+
+class BidMosaicTest(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        TemplateMatchService.shutdown_pool()
+
+    def test_mosaic_keeps_every_region_in_its_band(self):
+        image = load_resource("detection/bids/5_move.png")
+        regions = {("table_a", 1): preprocessed_region(image, 1), ("table_b", 5): preprocessed_region(image, 5)}
+
+        mosaic, bands = _build_bid_mosaic(regions)
+
+        self.assertEqual([key for key, _, _ in bands], list(regions))
+        for key, top, bottom in bands:
+            region = regions[key]
+            self.assertEqual(bottom - top, region.shape[0])
+            np.testing.assert_array_equal(
+                mosaic[top:bottom, MOSAIC_SPACER:MOSAIC_SPACER + region.shape[1]], region
+            )
+        # Regions never touch each other or the mosaic border
+        self.assertEqual(bands[0][1], MOSAIC_SPACER)
+        self.assertEqual(bands[1][1] - bands[0][2], MOSAIC_SPACER)
+        self.assertEqual(mosaic.shape[0] - bands[1][2], MOSAIC_SPACER)
+
+    def test_words_map_back_to_their_region(self):
+        bands = [("a", 64, 184), ("b", 248, 368)]
+        data = ocr_data(
+            word("3.5", 91, 80, 90),
+            word("1", 88, 70, 270),
+            word(".", 60, 140, 300, width=12, height=12),
+            word("0", 85, 170, 270),
+            word("7", 20, 70, 100),  # low confidence
+            word("", 95, 0, 0),
+        )
+
+        words = _assign_words_to_bands(data, bands)
+
+        self.assertEqual([w['text'] for w in words["a"]], ["3.5"])
+        self.assertEqual((words["a"][0]['left'], words["a"][0]['top']), (80 - MOSAIC_SPACER, 90 - 64))
+        self.assertEqual([w['text'] for w in words["b"]], ["1", ".", "0"])
+
+    def test_glyph_reads_need_no_ocr(self):
+        images = {
+            "table_a": load_resource("detection/bids/4_move.png"),
+            "table_b": load_resource("detection/bids/9_bid.png"),
+        }
+
+        bids = detect_bids_batch(images)
+
+        self.assertEqual({table: {position: bid.amount_text for position, bid in table_bids.items()}
+                          for table, table_bids in bids.items()},
+                         {"table_a": {1: "1.0", 4: "3.5", 6: "0.5"}, "table_b": {2: "5.0"}})
+        self.assertEqual({position: bid.amount_text for position, bid in detect_bids(images["table_b"]).items()},
+                         {2: "5.0"})
+
+
+@unittest.skipUnless(shutil.which('tesseract'), "tesseract is not installed")
+class BidMosaicParityTest(unittest.TestCase):
+    """The single psm 6 mosaic read must agree with reading every region on its own with psm 7"""
+
+    @staticmethod
+    def read_region(region):
+        data = pytesseract.image_to_data(region, config=TESSERACT_CONFIG, output_type=pytesseract.Output.DICT)
+        words = _assign_words_to_bands(data, [("region", 0, region.shape[0])], spacer=0)
+        return _combine_with_confidence(words.get("region", []))[0]
+
+    def test_mosaic_reads_match_per_region_reads(self):
+        regions = {}
+        for path in sorted((RESOURCES / "detection").glob("*/*.png")):
+            image = cv2.imread(str(path))
+            for position in PLAYER_BID_POSITIONS:
+                regions[(path.name, position)] = preprocessed_region(image, position)
+
+        mosaic_texts = _extract_mosaic_bid_texts(*_build_bid_mosaic(regions))
+
+        for key, region in regions.items():
+            with self.subTest(region=key):
+                self.assertEqual(mosaic_texts[key][0], self.read_region(region))
+
+
+class BidOcrCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_ocr_cache()
+
+    def tearDown(self):
+        clear_ocr_cache()
+
+    @staticmethod
+    def fake_ocr(mosaic, config, output_type):
+        # One word in the first mosaic band
+        return ocr_data(word("4.5", 90, MOSAIC_SPACER + 10, MOSAIC_SPACER + 20))
+
+    def test_repeated_region_skips_ocr(self):
+        # Seat 5 is cut by the region edge, so the glyph reader leaves it to OCR
+        image = load_resource("detection/action/1.png")
+
+        with patch('table_detector.services.bid_detection_service.pytesseract.image_to_data',
+                   side_effect=self.fake_ocr) as image_to_data:
+            first = detect_bids(image)
+            second = detect_bids(image)
+
+        self.assertEqual(image_to_data.call_count, 1)
+        self.assertEqual(first[5].amount_text, "4.5")
+        self.assertEqual(second[5].amount_text, "4.5")
+        stats = get_ocr_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_weak_read_is_used_but_not_cached(self):
+        image = load_resource("detection/action/1.png")
+        weak = ocr_data(word("4.5", OCR_MIN_CONFIDENCE - 5, MOSAIC_SPACER + 10, MOSAIC_SPACER + 20))
+
+        with patch('table_detector.services.bid_detection_service.pytesseract.image_to_data',
+                   return_value=weak) as image_to_data:
+            self.assertEqual(detect_bids(image)[5].amount_text, "4.5")
+            self.assertEqual(detect_bids(image)[5].amount_text, "4.5")
+
+        self.assertEqual(image_to_data.call_count, 2)
+        self.assertEqual(get_ocr_cache_stats()['entries'], 0)
+
+    def test_unreadable_region_is_not_cached(self):
+        image = load_resource("detection/action/1.png")
+
+        for text in ("", "4..5"):
+            with self.subTest(text=text):
+                clear_ocr_cache()
+                garbled = ocr_data(word(text, 90, MOSAIC_SPACER + 10, MOSAIC_SPACER + 20))
+                with patch('table_detector.services.bid_detection_service.pytesseract.image_to_data',
+                           return_value=garbled) as image_to_data:
+                    self.assertNotIn(5, detect_bids(image))
+                    self.assertNotIn(5, detect_bids(image))
+
+                # Read again on the next frame instead of being remembered as "no bid"
+                self.assertEqual(image_to_data.call_count, 2)
+                self.assertEqual(get_ocr_cache_stats()['entries'], 0)
+
+    def test_failed_ocr_is_not_cached(self):
+        image = load_resource("detection/action/1.png")
+
+        with patch('table_detector.services.bid_detection_service.pytesseract.image_to_data',
+                   side_effect=RuntimeError("tesseract crashed")):
+            self.assertEqual(detect_bids(image), {})
+
+        self.assertEqual(get_ocr_cache_stats()['entries'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
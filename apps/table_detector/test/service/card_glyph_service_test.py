@@ -0,0 +1,82 @@
+import unittest
+
+from table_detector.services.card_glyph_service import CardGlyphService
+from table_detector.services.template_matcher_service import TemplateMatchService
+from table_detector.test.service.test_utils import load_image
+from table_detector.utils.detect_utils import DetectUtils
+
+
+class CardGlyphServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        CardGlyphService.clear_cache()
+
+    @classmethod
+    def tearDownClass(cls):
+        TemplateMatchService.shutdown_pool()
+
+    def test_banks_hold_thirteen_ranks_and_four_suits(self):
+        for category in ("player_cards", "table_cards"):
+            bank = CardGlyphService.get_bank(category)
+
+            self.assertEqual(sorted(bank.ranks.names), sorted("23456789TJQKA"))
+            self.assertEqual(sorted(bank.suits.names), sorted("CDHS"))
+            self.assertEqual(bank.template_count, 17)
+
+    def test_player_cards(self):
+        detections = CardGlyphService.find_player_cards(load_image("5.png"))
+
+        self.assertEqual([d.name for d in detections], ['8D', 'TC', '8H', 'TS'])
+
+    def test_dimmed_player_cards(self):
+        # Hero cards are drawn darker once the hand is folded
+        detections = CardGlyphService.find_player_cards(load_image("1.png"))
+
+        self.assertEqual([d.name for d in detections], ['7S', '2C', '3H', '4D'])
+
+    def test_template_name_case_is_kept(self):
+        detections = CardGlyphService.find_player_cards(load_image("4.png"))
+
+        self.assertEqual([d.name for d in detections], ['QD', 'Jh', 'TD', '3C'])
+
+    def test_table_cards_match_template_search(self):
+        cv2_image = load_image("1.png")
+
+        from_glyphs = CardGlyphService.find_table_cards(cv2_image)
+        from_templates = TemplateMatchService.find_table_cards(cv2_image, use_slots=False)
+
+        self.assertEqual([d.name for d in from_glyphs], ['5H', 'TH', 'JH', '6D', '3D'])
+        self.assertEqual([d.name for d in from_glyphs], [d.name for d in from_templates])
+        for glyph_detection, template_detection in zip(from_glyphs, from_templates):
+            for glyph_value, template_value in zip(glyph_detection.bounding_rect, template_detection.bounding_rect):
+                self.assertLessEqual(abs(glyph_value - template_value), 2)
+
+    def test_empty_table(self):
+        cv2_image = load_image("10.png")
+
+        self.assertEqual(CardGlyphService.find_player_cards(cv2_image), [])
+        self.assertEqual(CardGlyphService.find_table_cards(cv2_image), [])
+
+    def test_other_layouts_fall_back_to_templates(self):
+        cv2_image = load_image("12.png")
+
+        self.assertIsNone(CardGlyphService.find_player_cards(cv2_image))
+        self.assertEqual([d.name for d in DetectUtils.detect_player_cards(cv2_image)], ['8H', 'KH', '4D'])
+
+    def test_repeated_frame_is_served_from_cache(self):
+        cv2_image = load_image("9.png")
+
+        first = CardGlyphService.find_player_cards(cv2_image) + CardGlyphService.find_table_cards(cv2_image)
+        misses = CardGlyphService.get_cache_stats()['misses']
+        second = CardGlyphService.find_player_cards(cv2_image) + CardGlyphService.find_table_cards(cv2_image)
+        stats = CardGlyphService.get_cache_stats()
+
+        self.assertEqual(misses, 9)
+        self.assertEqual(stats['misses'], misses)
+        self.assertEqual(stats['hits'], 9)
+        self.assertEqual([(d.name, d.bounding_rect, d.match_score) for d in second],
+                         [(d.name, d.bounding_rect, d.match_score) for d in first])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
+from unittest.mock import patch
 
+from shared.domain.detection import Detection
 from table_detector.test.service.test_utils import load_image
-from table_detector.utils.detect_utils import DetectUtils
+from table_detector.utils.detect_utils import DetectUtils, PLAYER_POSITIONS
 
 
 class TestDetectUtils(unittest.TestCase):
@@ -26,4 +28,19 @@ class TestDetectUtils(unittest.TestCase):
 
         detections = DetectUtils.get_player_actions_detection(cv2_image)[1]
 
-        print(detections)
\ No newline at end of file
+        print(detections)
+
+    def test_native_positions_leave_out_failed_seats(self):
+        cv2_image = load_image("7.png")
+        btn = Detection("BTN", None, None, 0.99)
+        region_matches = [[btn], [], None] + [[]] * (len(PLAYER_POSITIONS) - 3)
+
+        with patch('table_detector.utils.detect_utils.TemplateMatchService.find_positions_in_regions',
+                   return_value=region_matches):
+            positions = DetectUtils._detect_native_positions(cv2_image)
+
+        seats = list(PLAYER_POSITIONS)
+        self.assertIs(positions[seats[0]], btn)
+        self.assertEqual(positions[seats[1]].name, "NO")
+        self.assertNotIn(seats[2], positions)
+        self.assertEqual(len(positions), len(PLAYER_POSITIONS) - 1)
@@ -0,0 +1,137 @@
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from table_detector.detection_client import DetectionClient
+from shared.protocol.message_protocol import GameUpdateMessage
+
+
+def snapshot(window_name):
+    game_snapshot = Mock()
+    game_snapshot.to_game_update_message.return_value = GameUpdateMessage(
+        type='game_update', client_id="c1", window_name=window_name, timestamp="t", game_data={})
+    return game_snapshot
+
+
+class DetectionClientSendTest(unittest.TestCase):
+
+    def setUp(self):
+        self.connector = Mock()
+        self.client = DetectionClient(client_id="c1", server_connector=self.connector)
+
+    def test_cycle_is_sent_as_one_batch(self):
+        broken = Mock()
+        broken.to_game_update_message.side_effect = ValueError("no cards")
+        removals = self.client._handle_removed_windows(["w3", "w4"])
+
+        self.client._send_updates_to_server([(snapshot("w1"), "w1"), (broken, "w2"), (snapshot("w5"), "w5")],
+                                            removals)
+
+        self.connector.send_batch.assert_called_once()
+        batch = self.connector.send_batch.call_args.args[0]
+        self.assertEqual((batch.type, batch.client_id), ('batch_update', "c1"))
+        self.assertEqual([update.window_name for update in batch.updates], ["w1", "w5"])
+        self.assertEqual(len(batch.removals), 1)
+        self.assertEqual(batch.removals[0].removed_windows, ["w3", "w4"])
+
+    def test_empty_cycle_sends_nothing(self):
+        self.client._send_updates_to_server([], [])
+
+        self.connector.send_batch.assert_not_called()
+
+
+def window(window_name):
+    captured_image = Mock()
+    captured_image.window_name = window_name
+    return captured_image
+
+
+class DetectionClientBudgetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = DetectionClient(client_id="c1")
+        self.client.poker_game_processor = Mock()
+        self.client.poker_game_processor.has_pending_bids.return_value = False
+        self.client.image_capture_service = Mock()
+        self.client.table_workers = 2
+        self.client.table_time_budget = 0.2
+        self.release = threading.Event()
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+
+        def process_window(captured_image, window_folder):
+            if captured_image.window_name.startswith("stuck"):
+                self.release.wait(5)
+            return f"snapshot of {captured_image.window_name}"
+
+        self.client.poker_game_processor.process_window.side_effect = process_window
+
+    def tearDown(self):
+        self.release.set()
+        self.client._table_pool.shutdown(wait=True)
+
+    def process(self, windows):
+        return self.client._handle_changed_windows(windows, self.folder.name)
+
+    def invalidated(self):
+        return [call.args[0] for call in self.client.image_capture_service.invalidate.call_args_list]
+
+    def test_over_budget_table_is_processed_again_next_cycle(self):
+        changed_games = self.process([window("fast"), window("stuck")])
+
+        self.assertEqual(changed_games, [("snapshot of fast", "fast")])
+        self.assertEqual(self.invalidated(), ["stuck"])
+
+        # Still running next cycle: skipped, and again left for the one after
+        changed_games = self.process([window("stuck")])
+        self.assertEqual(changed_games, [])
+        self.assertEqual(self.invalidated(), ["stuck", "stuck"])
+
+    def test_queued_tables_cannot_hold_the_cycle(self):
+        queued = window("queued")
+        started = time.perf_counter()
+
+        changed_games = self.process([window("stuck_1"), window("stuck_2"), queued])
+
+        # Two waves of tables on two workers, each with one table budget
+        self.assertLess(time.perf_counter() - started, 2 * 0.2 + 0.5)
+        self.assertEqual(changed_games, [])
+        self.assertEqual(sorted(self.invalidated()), ["queued", "stuck_1", "stuck_2"])
+        queued.close.assert_called_once()
+        self.assertNotIn("queued", self.client._tables_in_flight)
+        self.client.poker_game_processor.process_window.assert_called()
+        self.assertNotIn("queued", [call.args[0].window_name
+                                    for call in self.client.poker_game_processor.process_window.call_args_list])
+
+    def test_single_table_is_held_to_its_budget(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                self.client.table_workers = workers
+                self.client._table_pool = None
+                started = time.perf_counter()
+
+                changed_games = self.process([window(f"stuck_{workers}")])
+
+                self.assertLess(time.perf_counter() - started, 0.2 + 0.5)
+                self.assertEqual(changed_games, [])
+                self.assertIn(f"stuck_{workers}", self.invalidated())
+                self.release.set()
+                self.client._table_pool.shutdown(wait=True)
+                self.release.clear()
+
+    def test_late_table_does_not_write_the_next_cycles_timings(self):
+        self.process([window("fast"), window("stuck")])
+        first_cycle = self.client.last_table_timings
+
+        self.process([window("other_1"), window("other_2")])
+        self.release.set()
+        self.client._table_pool.shutdown(wait=True)
+
+        self.assertEqual(sorted(self.client.last_table_timings), ["other_1", "other_2"])
+        self.assertIn("stuck", first_cycle)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+from table_detector.services.bid_detection_service import PLAYER_BID_POSITIONS, detect_bids
+from table_detector.services.digit_glyph_service import DigitGlyphService, DIGIT_MATCH_THRESHOLD
+from table_detector.utils.opencv_utils import count_holes
+from table_detector.services.template_matcher_service import TemplateMatchService
+
+RESOURCES = Path(__file__).parent.parent / "resources"
+
+
+def load_resource(name):
+    return cv2.imread(str(RESOURCES / name))
+
+
+def bid_region(image, position):
+    x, y, w, h = PLAYER_BID_POSITIONS[position]
+    return image[y:y + h, x:x + w]
+
+
+# Digits without a template, drawn in the bid font over the '5' of "5.0" in 9_bid.png seat 2
+SIX = [".####", "##...", "##...", "####.", "##.##", "##.##", "##.##", ".###."]
+NINE = [".###.", "##.##", "##.##", "##.##", ".####", "...##", "...##", "####."]
+
+
+def with_first_digit(rows):
+    image = load_resource("detection/bids/9_bid.png")
+    x, y, _, _ = PLAYER_BID_POSITIONS[2]
+    image[y + 5:y + 13, x + 3:x + 8] = np.array([[255 if c == '#' else 0 for c in row] for row in rows],
+                                                dtype=np.uint8)[:, :, None]
+    return image
+
+
+class DigitGlyphServiceTest(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        TemplateMatchService.shutdown_pool()
+
+    def test_reads_bid_amounts(self):
+        samples = [
+            ("detection/bids/9_bid.png", 2, "5.0"),
+            ("detection/bids/1_move.png", 1, "0.5"),
+            ("detection/bids/1_move.png", 2, "1.0"),
+            ("detection/bids/4_move.png", 4, "3.5"),
+            ("tables/3_move_tern.png", 5, "4.7"),
+            ("tables/3_empty.png", 1, "3.5"),
+            ("tables/move_test.png", 3, "18.1"),
+            ("service/poker_game_processor/10.png", 4, "1.0"),
+        ]
+        for name, position, expected in samples:
+            with self.subTest(name=name, position=position):
+                text, confidence = DigitGlyphService.read_amount(bid_region(load_resource(name), position))
+
+                self.assertEqual(text, expected)
+                self.assertGreaterEqual(confidence, DIGIT_MATCH_THRESHOLD)
+
+    def test_empty_region_has_no_amount(self):
+        image = load_resource("detection/bids/9_bid.png")
+
+        for position in (1, 3, 4, 5, 6):
+            self.assertIsNone(DigitGlyphService.read_amount(bid_region(image, position)))
+
+    def test_unreadable_region_has_no_confidence(self):
+        # An amount cut off by the region edge must be left to OCR
+        _, confidence = DigitGlyphService.read_amount(bid_region(load_resource("detection/action/1.png"), 5))
+
+        self.assertEqual(confidence, 0.0)
+
+    def test_digit_without_template_is_not_read(self):
+        for name, rows in (("6", SIX), ("9", NINE)):
+            with self.subTest(digit=name):
+                image = with_first_digit(rows)
+
+                _, confidence = DigitGlyphService.read_amount(bid_region(image, 2))
+                # Left to OCR, which reads nothing here
+                with patch('table_detector.services.bid_detection_service.pytesseract.image_to_data',
+                           side_effect=RuntimeError("no tesseract")):
+                    bids = detect_bids(image)
+
+                self.assertLess(confidence, DIGIT_MATCH_THRESHOLD)
+                self.assertIsNone(bids.get(2))
+
+    def test_count_holes(self):
+        glyphs = {0: SIX[:3], 1: SIX, 2: [".###.", "#...#", ".###.", "#...#", ".###."]}
+        for holes, rows in glyphs.items():
+            mask = np.array([[c == '#' for c in row] for row in rows])
+            self.assertEqual(count_holes(mask), holes)
+
+    def test_detect_bids_reads_from_glyphs(self):
+        bids = detect_bids(load_resource("detection/bids/4_move.png"))
+
+        self.assertEqual({position: bid.amount_text for position, bid in bids.items()},
+                         {1: "1.0", 4: "3.5", 6: "0.5"})
+        self.assertEqual(bids[4].bounding_rect, PLAYER_BID_POSITIONS[4])
+
+
+if __name__ == '__main__':
+    unittest.main()
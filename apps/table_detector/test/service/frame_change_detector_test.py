@@ -0,0 +1,108 @@
+import unittest
+
+import numpy as np
+
+from table_detector.services.frame_change_detector import FrameChangeDetector
+from table_detector.services.image_capture_service import FULL_RESOLUTION_REGIONS
+from table_detector.services.roi_change_tracker import DETECTION_REGIONS, bid_region
+from table_detector.test.service.test_utils import load_image
+
+
+class FrameChangeDetectorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = load_image("1.png")
+
+    def test_new_window_counts_as_changed(self):
+        detector = FrameChangeDetector()
+
+        self.assertTrue(detector.has_changed("table", self.frame))
+        self.assertFalse(detector.has_changed("table", self.frame.copy()))
+        self.assertEqual(detector.window_names, ["table"])
+
+    def test_sampled_pixel_change_is_detected(self):
+        detector = FrameChangeDetector(stride=4)
+        detector.has_changed("table", self.frame)
+
+        changed = self.frame.copy()
+        changed[100, 200] = 255 - changed[100, 200]
+
+        self.assertTrue(detector.has_changed("table", changed))
+
+    def test_change_between_sampled_pixels_is_missed_outside_full_regions(self):
+        detector = FrameChangeDetector(stride=4)
+        detector.has_changed("table", self.frame)
+
+        # A 3x3 px change on rows/columns 1-3 never reaches the every-4th-pixel sample
+        changed = self.frame.copy()
+        changed[101:104, 201:204] = 255 - changed[101:104, 201:204]
+
+        self.assertFalse(detector.has_changed("table", changed))
+
+    def test_single_pixel_change_in_full_region_is_detected(self):
+        x, y, w, h = DETECTION_REGIONS[bid_region(1)]
+        detector = FrameChangeDetector(stride=4, tolerance=0.5, full_regions=FULL_RESOLUTION_REGIONS)
+        detector.has_changed("table", self.frame)
+
+        changed = self.frame.copy()
+        changed[y + 1, x + 1] = 255 - changed[y + 1, x + 1]
+
+        self.assertTrue(detector.has_changed("table", changed))
+        self.assertFalse(detector.has_changed("table", changed.copy()))
+
+    def test_masked_region_is_ignored(self):
+        timer = (700, 10, 60, 20)
+        detector = FrameChangeDetector(stride=2, masks=[timer])
+        detector.has_changed("table", self.frame)
+
+        changed = self.frame.copy()
+        changed[10:30, 700:760] = 0
+        self.assertFalse(detector.has_changed("table", changed))
+
+        changed[40, 40] = 255 - changed[40, 40]
+        self.assertTrue(detector.has_changed("table", changed))
+
+    def test_tolerance_ignores_flicker_but_not_real_changes(self):
+        detector = FrameChangeDetector(stride=1, tolerance=0.5)
+        detector.has_changed("table", self.frame)
+
+        flicker = self.frame.copy()
+        flicker[300:310, 300:310] = 255 - flicker[300:310, 300:310]
+        self.assertFalse(detector.has_changed("table", flicker))
+
+        self.assertTrue(detector.has_changed("table", load_image("3.png")))
+
+    def test_tolerance_compares_against_last_kept_frame(self):
+        detector = FrameChangeDetector(stride=1, tolerance=1.0)
+        detector.has_changed("table", self.frame)
+
+        # Each step alone is below the tolerance, together they are not
+        drifted = self.frame.astype(np.int16)
+        results = []
+        for _ in range(4):
+            drifted = np.clip(drifted + 1, 0, 255)
+            results.append(detector.has_changed("table", drifted.astype(np.uint8)))
+
+        self.assertEqual(results, [False, True, False, True])
+
+    def test_invalidated_window_counts_as_changed_once(self):
+        detector = FrameChangeDetector(tolerance=0.5)
+        detector.has_changed("table", self.frame)
+        detector.invalidate("table")
+        detector.invalidate("closed")
+
+        self.assertEqual(detector.window_names, ["table"])
+        self.assertTrue(detector.has_changed("table", self.frame))
+        self.assertFalse(detector.has_changed("table", self.frame))
+
+    def test_forget(self):
+        detector = FrameChangeDetector()
+        detector.has_changed("table", self.frame)
+        detector.forget("table")
+
+        self.assertEqual(detector.window_names, [])
+        self.assertTrue(detector.has_changed("table", self.frame))
+
+
+if __name__ == '__main__':
+    unittest.main()
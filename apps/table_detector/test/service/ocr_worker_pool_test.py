@@ -0,0 +1,156 @@
+import os
+import sys
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from table_detector.services.ocr_worker_pool import (
+    OcrTimeoutError,
+    OcrWorkerError,
+    OcrWorkerPool,
+    PytesseractEngine,
+    TesserocrEngine,
+    create_ocr_engine,
+    parse_tesseract_config
+)
+from table_detector.services.bid_detection_service import MOSAIC_TESSERACT_CONFIG, TESSERACT_CONFIG
+
+SLEEP, CRASH, FAIL = 1, 2, 3
+
+
+class FakeEngine:
+    """Reads the first pixel as the text; special values sleep, kill the worker or raise"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+
+    def image_to_data(self, image, config):
+        value = int(image.flat[0])
+        if value == SLEEP:
+            time.sleep(5)
+        elif value == CRASH:
+            os._exit(1)
+        elif value == FAIL:
+            raise ValueError("unreadable")
+        return {'text': [str(value)], 'conf': [90], 'left': [0], 'top': [0], 'width': [1], 'height': [1],
+                'pid': self.pid}
+
+    def image_to_string(self, image, config):
+        return f"{int(image.flat[0])} {config}"
+
+
+def broken_engine():
+    raise RuntimeError("Failed to init API, possibly an invalid tessdata path")
+
+
+def image(value):
+    return np.full((4, 4), value, dtype=np.uint8)
+
+
+class OcrWorkerPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = OcrWorkerPool(max_workers=2, timeout=2.0, engine_factory=FakeEngine)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_batch_keeps_input_order(self):
+        results = self.pool.image_to_data_batch([image(value) for value in range(10, 15)], TESSERACT_CONFIG)
+
+        self.assertEqual([data['text'][0] for data in results], ['10', '11', '12', '13', '14'])
+        # Spread over both workers
+        self.assertEqual(len({data['pid'] for data in results}), 2)
+        self.assertEqual(self.pool.get_stats()['requests'], 1)
+
+    def test_workers_are_reused_between_requests(self):
+        pids = {self.pool.image_to_data(image(10), TESSERACT_CONFIG)['pid'] for _ in range(6)}
+
+        self.assertTrue(pids <= {worker.process.pid for worker in self.pool._workers})
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_image_to_string(self):
+        self.assertEqual(self.pool.image_to_string(image(42), "--psm 7"), "42 --psm 7")
+
+    def test_timeout_restarts_worker(self):
+        with self.assertRaises(OcrTimeoutError):
+            self.pool.image_to_data(image(SLEEP), TESSERACT_CONFIG, timeout=0.3)
+
+        self.assertEqual(self.pool.image_to_data(image(10), TESSERACT_CONFIG)['text'], ['10'])
+        stats = self.pool.get_stats()
+        self.assertEqual((stats['timeouts'], stats['restarts'], stats['idle']), (1, 1, 2))
+
+    def test_crashed_worker_is_restarted(self):
+        with self.assertRaises(OcrWorkerError):
+            self.pool.image_to_data(image(CRASH), TESSERACT_CONFIG)
+
+        results = self.pool.image_to_data_batch([image(10), image(11)], TESSERACT_CONFIG)
+
+        self.assertEqual([data['text'][0] for data in results], ['10', '11'])
+        self.assertEqual(self.pool.get_stats()['restarts'], 1)
+
+    def test_engine_error_keeps_worker(self):
+        with self.assertRaises(OcrWorkerError):
+            self.pool.image_to_data(image(FAIL), TESSERACT_CONFIG)
+
+        self.assertEqual(self.pool.image_to_data(image(10), TESSERACT_CONFIG)['text'], ['10'])
+        self.assertEqual(self.pool.get_stats()['restarts'], 0)
+
+    def test_engine_that_fails_to_start_is_reported_without_restarts(self):
+        pool = OcrWorkerPool(max_workers=1, timeout=5.0, engine_factory=broken_engine)
+        self.addCleanup(pool.shutdown)
+
+        for _ in range(2):
+            with self.assertRaisesRegex(OcrWorkerError, "invalid tessdata path"):
+                pool.image_to_data(image(10), TESSERACT_CONFIG)
+
+        self.assertEqual(pool.get_stats()['restarts'], 0)
+
+    def test_shut_down_pool_rejects_requests(self):
+        self.pool.shutdown()
+
+        with self.assertRaises(OcrWorkerError):
+            self.pool.image_to_data(image(10), TESSERACT_CONFIG)
+
+
+class CreateOcrEngineTest(unittest.TestCase):
+
+    def test_unusable_tesserocr_falls_back_to_pytesseract(self):
+        with patch.object(TesserocrEngine, '__init__', side_effect=RuntimeError("no tessdata")):
+            self.assertIsInstance(create_ocr_engine(), PytesseractEngine)
+
+
+class TesserocrEngineTest(unittest.TestCase):
+
+    def test_each_config_keeps_its_own_settings(self):
+        tesserocr = Mock()
+        tesserocr.PyTessBaseAPI.side_effect = lambda **options: Mock(options=options)
+        with patch.dict(sys.modules, {'tesserocr': tesserocr}):
+            engine = TesserocrEngine()
+            for config in (TESSERACT_CONFIG, "", MOSAIC_TESSERACT_CONFIG, TESSERACT_CONFIG):
+                engine.image_to_string(image(10), config)
+
+        # One API per distinct config, none of them changed after it was created
+        created = [call.kwargs for call in tesserocr.PyTessBaseAPI.call_args_list]
+        self.assertEqual(created, [{}, {'psm': 7, 'variables': parse_tesseract_config(TESSERACT_CONFIG)[1]},
+                                   {'psm': 6, 'variables': parse_tesseract_config(MOSAIC_TESSERACT_CONFIG)[1]}])
+        for api in engine._apis.values():
+            api.SetPageSegMode.assert_not_called()
+            api.SetVariable.assert_not_called()
+
+
+class ParseTesseractConfigTest(unittest.TestCase):
+
+    def test_bid_configs(self):
+        self.assertEqual(parse_tesseract_config(TESSERACT_CONFIG), (7, {
+            'tessedit_char_whitelist': '0123456789.',
+            'load_system_dawg': '0',
+            'load_freq_dawg': '0',
+        }))
+        self.assertEqual(parse_tesseract_config(MOSAIC_TESSERACT_CONFIG)[0], 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+import cv2
+from PIL import Image
+
+from shared.domain.detected_bid import DetectedBid
+from table_detector.domain.captured_window import CapturedWindow
+from table_detector.services import poker_game_processor
+from table_detector.services.bid_detection_service import PLAYER_BID_POSITIONS
+from table_detector.services.poker_game_processor import PokerGameProcessor
+from table_detector.services.template_matcher_service import TemplateMatchService
+from table_detector.test.service.digit_glyph_service_test import load_resource
+
+
+def captured(cv2_image, window_name="table"):
+    image = Image.fromarray(cv2.cvtColor(cv2_image, cv2.COLOR_BGR2RGB))
+    return CapturedWindow(image, "frame.png", window_name)
+
+
+def bid(seat, amount_text):
+    return DetectedBid(seat, amount_text, PLAYER_BID_POSITIONS[seat], (0, 0))
+
+
+def amounts(bids):
+    return {seat: detected.amount_text for seat, detected in bids.items()}
+
+
+class ProcessorBidsTest(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        PokerGameProcessor.shutdown_bid_pool()
+        PokerGameProcessor.shutdown_detector_pool()
+        TemplateMatchService.shutdown_pool()
+
+    def setUp(self):
+        self.frame = load_resource("detection/bids/4_move.png")
+        self.processor = PokerGameProcessor()
+        self.processor.bid_detection_enabled = True
+        self.processor.bid_wait = 5.0
+
+    def bid_changed_frame(self, seat):
+        x, y, w, h = PLAYER_BID_POSITIONS[seat]
+        frame = self.frame.copy()
+        frame[y + h - 1, x + w - 1] = 0
+        return frame
+
+    def test_first_frame_reads_every_seat(self):
+        snapshot = self.processor.process_window(captured(self.frame), None)
+
+        self.assertEqual(amounts(snapshot.bids), {1: "1.0", 4: "3.5", 6: "0.5"})
+        self.assertIn('bids', snapshot.detector_timings)
+
+    def test_only_changed_bid_regions_are_read(self):
+        with patch.object(poker_game_processor, 'detect_bids_batch',
+                          side_effect=[{"table": {1: bid(1, "1.0"), 4: bid(4, "3.5")}}, {"table": {}}]) as detect_bids:
+            self.processor.process_window(captured(self.frame), None)
+            unchanged = self.processor.process_window(captured(self.frame), None)
+            changed = self.processor.process_window(captured(self.bid_changed_frame(4)), None)
+
+        self.assertEqual(detect_bids.call_count, 2)
+        self.assertEqual(detect_bids.call_args.kwargs['table_seats'], {"table": {4}})
+        self.assertEqual(amounts(unchanged.bids), {1: "1.0", 4: "3.5"})
+        self.assertNotIn('bids', unchanged.detector_timings)
+        self.assertEqual(amounts(changed.bids), {1: "1.0"})
+
+    def test_slow_read_does_not_hold_the_snapshot(self):
+        release = threading.Event()
+
+        def slow_detect_bids(cv2_images, table_seats=None):
+            release.wait(5)
+            return {"table": {4: bid(4, "3.5")}}
+
+        self.processor.bid_wait = 0.0
+        with patch.object(poker_game_processor, 'detect_bids_batch', side_effect=slow_detect_bids) as detect_bids:
+            first = self.processor.process_window(captured(self.frame), None)
+            # Seat 1 changes while the first read is still running
+            second = self.processor.process_window(captured(self.bid_changed_frame(1)), None)
+            release.set()
+            self.processor.bid_wait = 5.0
+            third = self.processor.process_window(captured(self.bid_changed_frame(1)), None)
+            fourth = self.processor.process_window(captured(self.bid_changed_frame(1)), None)
+
+        self.assertEqual((first.bids, second.bids), ({}, {}))
+        self.assertEqual(amounts(third.bids), {4: "3.5"})
+        # The seat that changed during the first read is read afterwards
+        self.assertEqual(detect_bids.call_args.kwargs['table_seats'], {"table": {1}})
+        self.assertEqual(amounts(fourth.bids), {4: "3.5"})
+
+    def test_late_read_reaches_the_next_snapshot_of_a_static_table(self):
+        release = threading.Event()
+
+        def slow_detect_bids(cv2_images, table_seats=None):
+            release.wait(5)
+            return {"table": {4: bid(4, "3.5")}}
+
+        self.processor.bid_wait = 0.0
+        with patch.object(poker_game_processor, 'detect_bids_batch', side_effect=slow_detect_bids) as detect_bids:
+            first = self.processor.process_window(captured(self.frame), None)
+            self.assertTrue(self.processor.has_pending_bids("table"))
+            release.set()
+            self.processor._bid_jobs["table"][0].result(timeout=5)
+
+            # Nothing changed on screen, the table is processed again only to pick up the read
+            self.assertTrue(self.processor.has_pending_bids("table"))
+            again = self.processor.process_window(captured(self.frame), None)
+
+        self.assertEqual(first.bids, {})
+        self.assertEqual(amounts(again.bids), {4: "3.5"})
+        self.assertFalse(self.processor.has_pending_bids("table"))
+        self.assertEqual(detect_bids.call_count, 1)
+
+    def test_bids_of_a_cycle_are_read_in_one_batch(self):
+        other = self.bid_changed_frame(4)
+        read = {"a": {1: bid(1, "1.0")}, "b": {4: bid(4, "3.5")}}
+
+        with patch.object(poker_game_processor, 'detect_bids_batch', return_value=read) as detect_bids:
+            windows = [captured(self.frame, "a"), captured(other, "b")]
+            self.processor.submit_bids(windows)
+            snapshots = [self.processor.process_window(window, None) for window in windows]
+
+        detect_bids.assert_called_once()
+        self.assertEqual(list(detect_bids.call_args.args[0]), ["a", "b"])
+        self.assertEqual(detect_bids.call_args.kwargs['table_seats'],
+                         {"a": set(PLAYER_BID_POSITIONS), "b": set(PLAYER_BID_POSITIONS)})
+        self.assertEqual([amounts(snapshot.bids) for snapshot in snapshots], [{1: "1.0"}, {4: "3.5"}])
+
+    def test_disabled_stage_never_reads(self):
+        self.processor.bid_detection_enabled = False
+
+        with patch.object(poker_game_processor, 'detect_bids_batch') as detect_bids:
+            snapshot = self.processor.process_window(captured(self.frame), None)
+
+        detect_bids.assert_not_called()
+        self.assertEqual(snapshot.bids, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import patch
+
+from table_detector.services.poker_game_processor import PokerGameProcessor
+from table_detector.services.template_matcher_service import TemplateMatchService
+from table_detector.test.service.test_utils import load_image
+from table_detector.utils.detect_utils import DetectUtils
+
+
+class CreateGameSnapshotTest(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        PokerGameProcessor.shutdown_detector_pool()
+        TemplateMatchService.shutdown_pool()
+
+    def test_parallel_snapshot_matches_sequential(self):
+        cv2_image = load_image("9.png")
+
+        parallel = PokerGameProcessor.create_game_snapshot(cv2_image)
+        with patch.object(PokerGameProcessor, '_detector_pool_size', 1):
+            PokerGameProcessor.shutdown_detector_pool()
+            sequential = PokerGameProcessor.create_game_snapshot(cv2_image)
+        PokerGameProcessor.shutdown_detector_pool()
+
+        self.assertEqual([c.name for c in parallel.player_cards], [c.name for c in sequential.player_cards])
+        self.assertEqual([c.name for c in parallel.table_cards], [c.name for c in sequential.table_cards])
+        self.assertEqual({k: v.name for k, v in parallel.positions.items()},
+                         {k: v.name for k, v in sequential.positions.items()})
+        self.assertEqual({k: [a.name for a in v] for k, v in parallel.actions.items()},
+                         {k: [a.name for a in v] for k, v in sequential.actions.items()})
+
+    def test_timings_are_recorded_per_detector(self):
+        snapshot = PokerGameProcessor.create_game_snapshot(load_image("2.png"))
+
+        self.assertEqual(set(snapshot.detector_timings), {'player_cards', 'table_cards', 'positions', 'actions'})
+        self.assertTrue(all(ms >= 0 for ms in snapshot.detector_timings.values()))
+
+    def test_first_failing_detector_in_order_raises(self):
+        def fail(message):
+            def raise_error(*args, **kwargs):
+                raise RuntimeError(message)
+            return raise_error
+
+        with patch.object(DetectUtils, 'detect_table_cards', side_effect=fail("table")), \
+                patch.object(DetectUtils, 'get_player_actions_detection', side_effect=fail("actions")):
+            with self.assertRaisesRegex(RuntimeError, "table"):
+                PokerGameProcessor.create_game_snapshot(load_image("2.png"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import patch
+
+import cv2
+from PIL import Image
+
+from shared.domain.detection import Detection
+from table_detector.domain.captured_window import CapturedWindow
+from table_detector.services.poker_game_processor import PokerGameProcessor
+from table_detector.services.position_cache import PositionCache
+from table_detector.services.template_matcher_service import TemplateMatchService
+from table_detector.test.service.test_utils import load_image
+from table_detector.utils.detect_utils import DetectUtils, JUROJIN_POSITION_REGIONS
+
+HAND = [Detection(name, None, None, 1.0) for name in ('AS', 'KD', '7C', '2H')]
+OTHER_HAND = [Detection(name, None, None, 1.0) for name in ('QS', 'QD', '7C', '2H')]
+FLOP = [Detection(name, None, None, 1.0) for name in ('8H', '6S', 'TD')]
+POSITIONS = {seat: Detection(name, None, None, 0.9)
+             for seat, name in zip(range(1, 7), ['BTN', 'SB', 'BB', 'EP', 'MP', 'CO'])}
+
+
+def captured(cv2_image):
+    image = Image.fromarray(cv2.cvtColor(cv2_image, cv2.COLOR_BGR2RGB))
+    return CapturedWindow(image, "frame.png", "table")
+
+
+class PositionCacheTest(unittest.TestCase):
+
+    def test_same_hand_hits(self):
+        cache = PositionCache()
+        cache.put("table", HAND, [], POSITIONS)
+
+        self.assertIs(cache.get("table", HAND, FLOP), POSITIONS)
+        self.assertEqual(cache.get_stats()['hits'], 1)
+
+    def test_new_hole_cards_invalidate(self):
+        cache = PositionCache()
+        cache.put("table", HAND, [], POSITIONS)
+
+        self.assertIsNone(cache.get("table", OTHER_HAND, []))
+        self.assertIsNone(cache.get("table", HAND, []))
+        self.assertEqual(cache.get_stats()['invalidations'], 1)
+
+    def test_board_reset_invalidates(self):
+        cache = PositionCache()
+        cache.put("table", HAND, FLOP, POSITIONS)
+
+        self.assertIsNone(cache.get("table", HAND, []))
+
+    def test_unresolved_positions_and_missing_cards_are_not_cached(self):
+        cache = PositionCache()
+        cache.put("table", HAND, [], {1: Detection("NO", None, None, 1)})
+        cache.put("other", HAND[:2], [], POSITIONS)
+
+        self.assertIsNone(cache.get("table", HAND, []))
+        self.assertIsNone(cache.get("other", HAND[:2], []))
+        self.assertEqual(cache.get_stats()['entries'], 0)
+
+    def test_invalidate_all_tables(self):
+        cache = PositionCache()
+        cache.put("first", HAND, [], POSITIONS)
+        cache.put("second", OTHER_HAND, [], POSITIONS)
+
+        cache.invalidate()
+
+        self.assertEqual(cache.get_stats()['entries'], 0)
+        self.assertEqual(cache.get_stats()['invalidations'], 2)
+
+
+class ProcessorPositionCacheTest(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        PokerGameProcessor.shutdown_detector_pool()
+        TemplateMatchService.shutdown_pool()
+
+    def setUp(self):
+        self.frame = load_image("1.png")
+        self.processor = PokerGameProcessor()
+        self.processor.position_cache_enabled = True
+
+    def badge_changed_frame(self, value):
+        coords = JUROJIN_POSITION_REGIONS[5]
+        frame = self.frame.copy()
+        frame[coords['y'] + 3, coords['x'] + 3] = value
+        return frame
+
+    def test_badge_change_within_hand_skips_position_detection(self):
+        with patch.object(DetectUtils, 'detect_player_cards', return_value=HAND), \
+                patch.object(DetectUtils, 'detect_positions', return_value=POSITIONS) as positions:
+            self.processor.process_window(captured(self.frame), None)
+            snapshot = self.processor.process_window(captured(self.badge_changed_frame(0)), None)
+
+        positions.assert_called_once()
+        self.assertNotIn('positions', snapshot.detector_timings)
+        self.assertEqual(snapshot.hero_position, 'BTN')
+        self.assertEqual(self.processor.get_position_cache_stats()['hits'], 1)
+
+    def test_forced_refresh_re_detects(self):
+        with patch.object(DetectUtils, 'detect_player_cards', return_value=HAND), \
+                patch.object(DetectUtils, 'detect_positions', return_value=POSITIONS) as positions:
+            self.processor.process_window(captured(self.frame), None)
+            self.processor.refresh_positions("table")
+            self.processor.process_window(captured(self.badge_changed_frame(0)), None)
+
+        self.assertEqual(positions.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
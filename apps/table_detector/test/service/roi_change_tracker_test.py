@@ -0,0 +1,134 @@
+import unittest
+from unittest.mock import patch
+
+from table_detector.services.poker_game_processor import PokerGameProcessor
+from table_detector.services.roi_change_tracker import (
+    RoiChangeTracker,
+    DETECTION_REGIONS,
+    BOARD_REGION,
+    actions_region
+)
+from table_detector.services.template_matcher_service import (
+    BOARD_CARD_SLOTS,
+    BOARD_SLOT_PADDING,
+    TemplateMatchService
+)
+from table_detector.test.service.poker_game_processor_bids_test import captured
+from table_detector.test.service.test_utils import load_image
+from table_detector.utils.detect_utils import DetectUtils, ACTION_POSITIONS
+
+
+def snapshot_summary(snapshot):
+    return (
+        [c.name for c in snapshot.player_cards],
+        [c.name for c in snapshot.table_cards],
+        {seat: p.name for seat, p in snapshot.positions.items()},
+        {seat: [a.name for a in actions] for seat, actions in snapshot.actions.items()},
+    )
+
+
+class RoiChangeTrackerTest(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        TemplateMatchService.shutdown_pool()
+
+    def test_first_frame_marks_every_region_changed(self):
+        tracker = RoiChangeTracker()
+
+        self.assertEqual(tracker.update("table", load_image("1.png")), set(DETECTION_REGIONS))
+
+    def test_identical_frame_has_no_changes(self):
+        tracker = RoiChangeTracker()
+        cv2_image = load_image("1.png")
+        tracker.update("table", cv2_image)
+
+        self.assertEqual(tracker.update("table", cv2_image.copy()), set())
+
+    def test_only_touched_region_changes(self):
+        tracker = RoiChangeTracker()
+        cv2_image = load_image("1.png")
+        tracker.update("table", cv2_image)
+
+        x, y, _, _ = ACTION_POSITIONS[5]
+        changed_image = cv2_image.copy()
+        changed_image[y + 5, x + 150] = 0
+
+        self.assertEqual(tracker.update("table", changed_image), {actions_region(5)})
+
+    def test_tables_are_tracked_separately(self):
+        tracker = RoiChangeTracker()
+        tracker.update("first", load_image("1.png"))
+
+        self.assertEqual(tracker.update("second", load_image("1.png")), set(DETECTION_REGIONS))
+
+        tracker.forget("first")
+        self.assertEqual(tracker.update("first", load_image("1.png")), set(DETECTION_REGIONS))
+
+    def test_uncommitted_frame_is_compared_again(self):
+        tracker = RoiChangeTracker()
+        tracker.update("table", load_image("1.png"))
+
+        changed, _ = tracker.diff("table", load_image("3.png"))
+
+        self.assertEqual(tracker.diff("table", load_image("3.png"))[0], changed)
+
+    def test_board_region_covers_the_slot_search_area(self):
+        tracker = RoiChangeTracker()
+        cv2_image = load_image("1.png")
+        tracker.update("table", cv2_image)
+
+        x, y, _, _ = BOARD_CARD_SLOTS[0]
+        changed_image = cv2_image.copy()
+        changed_image[y - BOARD_SLOT_PADDING, x - BOARD_SLOT_PADDING] = 255 - changed_image[
+            y - BOARD_SLOT_PADDING, x - BOARD_SLOT_PADDING]
+
+        self.assertIn(BOARD_REGION, tracker.update("table", changed_image))
+
+    def test_failed_frame_is_detected_again(self):
+        processor = PokerGameProcessor()
+        processor.bid_detection_enabled = False
+        processor.process_window(captured(load_image("1.png")), None)
+
+        with patch.object(DetectUtils, 'detect_table_cards', side_effect=RuntimeError("matcher crashed")):
+            with self.assertRaises(RuntimeError):
+                processor.process_window(captured(load_image("3.png")), None)
+        retried = processor.process_window(captured(load_image("3.png")), None)
+
+        self.assertIn('table_cards', retried.detector_timings)
+        self.assertEqual(snapshot_summary(retried), snapshot_summary(PokerGameProcessor.create_game_snapshot(
+            load_image("3.png"))))
+
+    def test_unchanged_regions_are_carried_over(self):
+        previous = PokerGameProcessor.create_game_snapshot(load_image("1.png"))
+
+        with patch.object(DetectUtils, 'detect_player_cards') as player_cards, \
+                patch.object(DetectUtils, 'detect_positions') as positions, \
+                patch.object(DetectUtils, 'get_player_actions_detection') as actions:
+            snapshot = PokerGameProcessor.create_game_snapshot(
+                load_image("1.png"), previous=previous, changed_regions={BOARD_REGION}
+            )
+
+        player_cards.assert_not_called()
+        positions.assert_not_called()
+        actions.assert_not_called()
+        self.assertEqual(list(snapshot.detector_timings), ['table_cards'])
+        self.assertEqual(snapshot_summary(snapshot), snapshot_summary(previous))
+
+    def test_incremental_snapshot_matches_full_detection(self):
+        # Same hero hand on both frames, board and actions differ
+        tracker = RoiChangeTracker()
+        first, second = load_image("1.png"), load_image("3.png")
+
+        previous = PokerGameProcessor.create_game_snapshot(first)
+        tracker.update("table", first)
+        changed_regions = tracker.update("table", second)
+
+        incremental = PokerGameProcessor.create_game_snapshot(second, previous, changed_regions)
+        full = PokerGameProcessor.create_game_snapshot(second)
+
+        self.assertEqual(snapshot_summary(incremental), snapshot_summary(full))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+
+from table_detector.services.template_bank import TemplateBank
+from table_detector.services.template_matcher_service import TemplateMatchService, MatchConfig
+from table_detector.test.service.test_utils import load_image
+
+
+class TemplateBankTest(unittest.TestCase):
+
+    def test_compile_prescales_into_contiguous_views(self):
+        templates = {
+            'a': np.full((20, 10, 3), 10, dtype=np.uint8),
+            'b': np.full((30, 16, 3), 200, dtype=np.uint8),
+        }
+
+        bank = TemplateBank.compile("test", templates, (1.0, 0.5))
+
+        self.assertEqual(bank.names, ['a', 'b'])
+        self.assertEqual(bank.entries[0].scaled[0.5].shape, (10, 5, 3))
+        self.assertEqual(bank.entries[1].scaled[1.0].shape, (30, 16, 3))
+        for entry in bank:
+            self.assertEqual((entry.width, entry.height), templates[entry.name].shape[1::-1])
+            for scaled in entry.scaled.values():
+                self.assertTrue(scaled.flags['C_CONTIGUOUS'])
+        np.testing.assert_array_equal(bank.entries[1].scaled[1.0], templates['b'])
+        self.assertTrue(bank.supports([0.5]))
+        self.assertFalse(bank.supports([2.0]))
+
+    def test_registry_bank_is_built_once(self):
+        registry = TemplateMatchService.TEMPLATE_REGISTRY
+
+        bank = registry.get_bank("player_cards")
+
+        self.assertIs(bank, registry.get_bank("player_cards"))
+        self.assertEqual(len(bank), len(registry.player_templates))
+
+    def test_bank_matches_like_plain_templates(self):
+        cv2_image = load_image("2.png")
+        registry = TemplateMatchService.TEMPLATE_REGISTRY
+        config = MatchConfig(search_region=(0.2, 0.5, 0.8, 0.95))
+
+        from_dict = TemplateMatchService.find_matches(cv2_image, registry.player_templates, config)
+        from_bank = TemplateMatchService.find_matches(cv2_image, registry.get_bank("player_cards"), config)
+
+        self.assertEqual([d.name for d in from_dict], [d.name for d in from_bank])
+        self.assertEqual([d.bounding_rect for d in from_dict], [d.bounding_rect for d in from_bank])
+
+    def test_unknown_category_raises(self):
+        with self.assertRaises(ValueError):
+            TemplateMatchService.TEMPLATE_REGISTRY.get_bank("positions")
@@ -0,0 +1,182 @@
+import threading
+import unittest
+from dataclasses import replace
+from unittest.mock import patch
+
+import cv2
+
+from table_detector.services.matching_pool import MatchingPool
+from table_detector.services import template_matcher_service
+from table_detector.services.template_matcher_service import TemplateMatchService, MatchConfig, BOARD_CARD_SLOTS
+from table_detector.test.service.test_utils import load_image
+from table_detector.utils.detect_utils import PLAYER_POSITIONS
+from table_detector.utils.opencv_utils import coords_to_search_region
+
+
+class TemplateMatchServiceTest(unittest.TestCase):
+
+    def tearDown(self):
+        TemplateMatchService.shutdown_pool()
+
+    def test_pool_is_reused_between_calls(self):
+        cv2_image = load_image("2.png")
+
+        TemplateMatchService.find_player_cards(cv2_image)
+        pool = TemplateMatchService.get_pool()
+        TemplateMatchService.find_table_cards(cv2_image)
+
+        self.assertIs(pool, TemplateMatchService.get_pool())
+        stats = TemplateMatchService.get_pool_stats()
+        self.assertGreater(stats['completed'], 0)
+        self.assertEqual(stats['queue_depth'], 0)
+
+    def test_shutdown_pool_recreates_on_next_use(self):
+        pool = TemplateMatchService.get_pool()
+        TemplateMatchService.shutdown_pool()
+
+        self.assertTrue(pool.is_shutdown)
+        self.assertIsNot(pool, TemplateMatchService.get_pool())
+
+    def test_configure_pool_size(self):
+        TemplateMatchService.configure_pool(2)
+        try:
+            self.assertEqual(TemplateMatchService.get_pool().max_workers, 2)
+        finally:
+            TemplateMatchService.configure_pool(0)
+
+    def test_slot_table_cards_match_full_image_search(self):
+        cv2_image = load_image("9.png")
+
+        from_slots = TemplateMatchService.find_table_cards_in_slots(cv2_image)
+        full_search = TemplateMatchService.find_table_cards(cv2_image, use_slots=False)
+
+        self.assertEqual([d.name for d in full_search], ['8H', '6S', 'TD', '7D', 'QD'])
+        self.assertEqual([d.name for d in from_slots], [d.name for d in full_search])
+        self.assertEqual([d.bounding_rect for d in from_slots], [d.bounding_rect for d in full_search])
+
+    def test_empty_board_needs_no_matching(self):
+        cv2_image = load_image("2.png")
+
+        self.assertEqual(TemplateMatchService.find_table_cards_in_slots(cv2_image), [])
+
+    def test_unrecognised_slots_fall_back(self):
+        # Board drawn with a card skin the table templates do not cover
+        cv2_image = load_image("12.png")
+
+        self.assertIsNone(TemplateMatchService.find_table_cards_in_slots(cv2_image))
+
+    def test_other_image_sizes_fall_back(self):
+        cv2_image = load_image("9.png")[:500, :700]
+
+        self.assertIsNone(TemplateMatchService.find_table_cards_in_slots(cv2_image))
+
+    def test_batched_regions_match_per_region_search(self):
+        cv2_image = load_image("9.png")
+        # Board cards cut from the frame itself, searched around every board slot
+        templates = {f"slot{i}": cv2_image[y:y + h, x:x + w].copy()
+                     for i, (x, y, w, h) in enumerate(BOARD_CARD_SLOTS[:3])}
+        search_regions = [coords_to_search_region(x - 10, y - 10, w + 20, h + 20)
+                          for x, y, w, h in BOARD_CARD_SLOTS]
+        config = MatchConfig(threshold=0.95, sort_by='score', match_method=cv2.TM_CCOEFF_NORMED)
+
+        batched = TemplateMatchService.find_matches_in_regions(cv2_image, templates, search_regions, config)
+
+        self.assertEqual([d[0].name if d else None for d in batched[:3]], ['slot0', 'slot1', 'slot2'])
+        for detections, search_region in zip(batched, search_regions):
+            single = TemplateMatchService.find_matches(
+                cv2_image, templates, replace(config, search_region=search_region))
+            self.assertEqual([(d.name, d.bounding_rect) for d in detections],
+                             [(d.name, d.bounding_rect) for d in single])
+
+    def test_batched_positions_match_per_region_search(self):
+        cv2_image = load_image("2.png")
+        search_regions = [
+            coords_to_search_region(coords['x'], coords['y'], coords['w'], coords['h'])
+            for coords in PLAYER_POSITIONS.values()
+        ]
+
+        batched = TemplateMatchService.find_positions_in_regions(cv2_image, search_regions)
+
+        self.assertEqual(len(batched), len(search_regions))
+        for detections, search_region in zip(batched, search_regions):
+            single = TemplateMatchService.find_positions(cv2_image, search_region)
+            self.assertEqual([d.name for d in detections], [d.name for d in single])
+
+    def test_failing_region_does_not_lose_the_others(self):
+        cv2_image = load_image("2.png")
+        search_regions = [
+            coords_to_search_region(coords['x'], coords['y'], coords['w'], coords['h'])
+            for coords in PLAYER_POSITIONS.values()
+        ]
+        expected = TemplateMatchService.find_positions_in_regions(cv2_image, search_regions)
+        match_templates = template_matcher_service.find_compiled_template_matches
+
+        def failing_in_first_region(image, compiled, search_region, *args):
+            if search_region == search_regions[0]:
+                raise cv2.error("template larger than region")
+            return match_templates(image, compiled, search_region, *args)
+
+        with patch.object(template_matcher_service, 'find_compiled_template_matches',
+                          side_effect=failing_in_first_region):
+            batched = TemplateMatchService.find_positions_in_regions(cv2_image, search_regions)
+            with self.assertRaises(cv2.error):
+                TemplateMatchService.find_positions(cv2_image, search_regions[0])
+
+        self.assertIsNone(batched[0])
+        self.assertEqual([[d.name for d in detections] for detections in batched[1:]],
+                         [[d.name for d in detections] for detections in expected[1:]])
+
+    def test_batched_matching_with_no_regions(self):
+        cv2_image = load_image("2.png")
+
+        self.assertEqual(TemplateMatchService.find_positions_in_regions(cv2_image, []), [])
+
+
+class MatchingPoolTest(unittest.TestCase):
+
+    def test_stats_track_completed_tasks(self):
+        pool = MatchingPool(max_workers=2)
+        try:
+            futures = [pool.submit(lambda x: x * 2, i) for i in range(10)]
+            self.assertEqual([f.result() for f in futures], [i * 2 for i in range(10)])
+
+            stats = pool.get_stats()
+            self.assertEqual(stats['submitted'], 10)
+            self.assertEqual(stats['completed'], 10)
+            self.assertEqual(stats['running'], 0)
+        finally:
+            pool.shutdown()
+
+    def test_submit_after_shutdown_runs_in_caller(self):
+        pool = MatchingPool(max_workers=1)
+        pool.shutdown()
+
+        self.assertFalse(pool.submit(pool.is_worker_thread).result())
+        with self.assertRaises(ZeroDivisionError):
+            pool.submit(lambda: 1 / 0).result()
+
+    def test_shutdown_during_submits_loses_no_task(self):
+        pool = MatchingPool(max_workers=2)
+        started = threading.Event()
+        futures = []
+
+        def submit_many():
+            for i in range(200):
+                futures.append(pool.submit(lambda x: x * 2, i))
+                started.set()
+
+        submitter = threading.Thread(target=submit_many)
+        submitter.start()
+        started.wait(timeout=2.0)
+        pool.shutdown(wait=False)
+        submitter.join(timeout=5.0)
+
+        self.assertEqual([f.result(timeout=5.0) for f in futures], [i * 2 for i in range(200)])
+
+    def test_is_worker_thread(self):
+        pool = MatchingPool(max_workers=1)
+        try:
+            self.assertFalse(pool.is_worker_thread())
+            self.assertTrue(pool.submit(pool.is_worker_thread).result())
+        finally:
+            pool.shutdown()
@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from table_detector.utils.cache_utils import LRUCache, image_digest
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = LRUCache(max_entries=4)
+        cache.put("a", 1)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("b", "missing"), "missing")
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_none_is_a_cacheable_value(self):
+        cache = LRUCache()
+        marker = object()
+        cache.put("empty", None)
+
+        self.assertIsNone(cache.get("empty", marker))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("b", "evicted"), "evicted")
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+
+    def test_entries_expire_after_ttl(self):
+        cache = LRUCache(ttl_seconds=2.0)
+        with patch('table_detector.utils.cache_utils.time.monotonic', return_value=100.0):
+            cache.put("a", 1)
+        with patch('table_detector.utils.cache_utils.time.monotonic', return_value=101.5):
+            self.assertEqual(cache.get("a"), 1)
+        with patch('table_detector.utils.cache_utils.time.monotonic', return_value=102.5):
+            self.assertEqual(cache.get("a", "expired"), "expired")
+
+        stats = cache.get_stats()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual((stats['hits'], stats['misses'], stats['expirations']), (1, 1, 1))
+
+
+class TestImageDigest(unittest.TestCase):
+
+    def test_equal_pixels_equal_digest(self):
+        image = np.random.default_rng(0).integers(0, 255, (40, 60, 3), dtype=np.uint8)
+        copy = image.copy()
+
+        self.assertEqual(image_digest(image[5:20, 10:30]), image_digest(copy[5:20, 10:30]))
+
+    def test_single_pixel_changes_digest(self):
+        image = np.zeros((20, 20, 3), dtype=np.uint8)
+        changed = image.copy()
+        changed[10, 10, 1] = 1
+
+        self.assertNotEqual(image_digest(image), image_digest(changed))
+
+    def test_shape_is_part_of_digest(self):
+        image = np.zeros((4, 6), dtype=np.uint8)
+
+        self.assertNotEqual(image_digest(image), image_digest(image.reshape(6, 4)))
+
+
+if __name__ == '__main__':
+    unittest.main()
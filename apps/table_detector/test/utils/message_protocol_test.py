@@ -0,0 +1,65 @@
+import json
+import unittest
+
+from shared.protocol.message_protocol import (
+    BatchUpdateMessage,
+    GameUpdateMessage,
+    MessageParser,
+    TableRemovalMessage,
+    diff_game_data,
+)
+
+
+class BatchUpdateMessageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.batch = BatchUpdateMessage(
+            type='batch_update',
+            client_id="c1",
+            timestamp="2024-01-01T00:00:00",
+            updates=[
+                GameUpdateMessage(type='game_update', client_id="c1", window_name="w1",
+                                  timestamp="2024-01-01T00:00:00", game_data={'street': 'flop'}, version=1),
+                GameUpdateMessage(type='game_update', client_id="c1", window_name="w2",
+                                  timestamp="2024-01-01T00:00:00", game_data={'street': 'turn'}, version=3,
+                                  base_version=2, removed_keys=['moves']),
+            ],
+            removals=[TableRemovalMessage(type='table_removal', client_id="c1", removed_windows=["w3", "w4"],
+                                          timestamp="2024-01-01T00:00:00")]
+        )
+
+    def test_round_trip(self):
+        data = json.loads(self.batch.to_json())
+
+        self.assertEqual([update['window_name'] for update in data['updates']], ["w1", "w2"])
+        self.assertNotIn('base_version', data['updates'][0])
+        self.assertEqual(BatchUpdateMessage.from_dict(data), self.batch)
+        self.assertEqual(MessageParser.parse_message(self.batch.to_json()), self.batch)
+
+    def test_missing_parts_default_to_empty(self):
+        message = BatchUpdateMessage.from_dict({'type': 'batch_update', 'client_id': "c1", 'timestamp': "t"})
+
+        self.assertEqual((message.updates, message.removals), ([], []))
+
+    def test_malformed_update_is_not_parsed(self):
+        data = self.batch.to_dict()
+        del data['updates'][1]['game_data']
+
+        self.assertIsNone(MessageParser.parse_data(data))
+
+
+class DiffGameDataTest(unittest.TestCase):
+
+    def test_changed_added_and_removed_keys(self):
+        previous = {'street': 'flop', 'pot': 1, 'moves': [{'seat': 1}], 'bids': []}
+        current = {'street': 'flop', 'pot': 2, 'moves': [{'seat': 1}, {'seat': 2}], 'hero': 'AsKs'}
+
+        self.assertEqual(diff_game_data(previous, current),
+                         ({'pot': 2, 'moves': [{'seat': 1}, {'seat': 2}], 'hero': 'AsKs'}, ['bids']))
+
+    def test_identical_data_has_no_delta(self):
+        self.assertEqual(diff_game_data({'street': 'flop'}, {'street': 'flop'}), ({}, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import time
+import unittest
+
+import numpy as np
+from loguru import logger
+
+from table_detector.services.template_matcher_service import TemplateMatchService
+from table_detector.test.service.test_utils import load_image
+from table_detector.utils.opencv_utils import find_response_peaks
+from table_detector.utils.template_matching_utils import (
+    filter_overlapping_detections,
+    find_single_template_matches,
+    non_max_suppression,
+    overlaps_with_existing
+)
+
+
+def reference_filter_overlapping_detections(detections, overlap_threshold=0.3):
+    """Pure-python greedy filter the vectorised NMS must agree with"""
+    ordered = sorted(detections, key=lambda x: x['match_score'], reverse=True)
+    filtered = []
+    for detection in ordered:
+        if not overlaps_with_existing(detection, filtered, overlap_threshold):
+            filtered.append(detection)
+    return filtered
+
+
+def raw_table_card_detections(image_name, threshold=0.93):
+    cv2_image = load_image(image_name)
+    bank = TemplateMatchService.TEMPLATE_REGISTRY.get_bank("table_cards")
+    detections = []
+    for compiled in bank:
+        detections.extend(find_single_template_matches(cv2_image, compiled.scaled[1.0], compiled.name,
+                                                       match_threshold=threshold, peak_distance=0))
+    return detections
+
+
+class TestNonMaxSuppression(unittest.TestCase):
+
+    def test_keeps_highest_score_of_overlapping_boxes(self):
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [50, 50, 10, 10]])
+        scores = np.array([0.9, 0.95, 0.8])
+
+        keep = non_max_suppression(boxes, scores, 0.3)
+
+        self.assertEqual(keep.tolist(), [1, 2])
+
+    def test_class_aware_keeps_overlapping_boxes_of_other_classes(self):
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [2, 2, 10, 10]])
+        scores = np.array([0.9, 0.95, 0.99])
+        class_ids = np.array([0, 1, 1])
+
+        keep = non_max_suppression(boxes, scores, 0.3, class_ids)
+
+        self.assertEqual(keep.tolist(), [2, 0])
+
+    def test_touching_boxes_do_not_overlap(self):
+        boxes = np.array([[0, 0, 10, 10], [10, 0, 10, 10]])
+        scores = np.array([0.9, 0.9])
+
+        self.assertEqual(non_max_suppression(boxes, scores, 0.0).tolist(), [0, 1])
+
+    def test_empty_input(self):
+        self.assertEqual(filter_overlapping_detections([]), [])
+        self.assertEqual(len(non_max_suppression(np.empty((0, 4)), np.empty(0))), 0)
+
+    def test_matches_reference_filter_on_table_images(self):
+        for image_name in ["1.png", "9.png"]:
+            with self.subTest(image=image_name):
+                detections = raw_table_card_detections(image_name)
+
+                expected = reference_filter_overlapping_detections(detections)
+                actual = filter_overlapping_detections(detections)
+
+                self.assertEqual([id(d) for d in expected], [id(d) for d in actual])
+
+    def test_benchmark_against_reference_filter(self):
+        detections = raw_table_card_detections("9.png")
+
+        start = time.perf_counter()
+        expected = reference_filter_overlapping_detections(detections)
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = filter_overlapping_detections(detections)
+        vectorised_time = time.perf_counter() - start
+
+        logger.info(f"⏱️  NMS over {len(detections)} raw hits: reference {reference_time * 1000:.1f}ms, "
+                    f"vectorised {vectorised_time * 1000:.1f}ms")
+        self.assertEqual(len(expected), len(actual))
+
+
+class TestResponsePeaks(unittest.TestCase):
+
+    def test_blob_collapses_to_its_maximum(self):
+        result = np.zeros((20, 20), dtype=np.float32)
+        result[5:8, 5:8] = 0.96
+        result[6, 6] = 0.99
+        result[15, 15] = 0.97
+
+        ys, xs = find_response_peaks(result, 0.95, peak_distance=2)
+
+        self.assertEqual(list(zip(ys.tolist(), xs.tolist())), [(6, 6), (15, 15)])
+
+    def test_zero_distance_keeps_every_pixel_over_threshold(self):
+        result = np.zeros((10, 10), dtype=np.float32)
+        result[2:4, 2:4] = 0.96
+
+        ys, xs = find_response_peaks(result, 0.95, peak_distance=0)
+
+        self.assertEqual(len(ys), 4)
+
+    def test_max_hits_keeps_best_peaks(self):
+        result = np.zeros((30, 30), dtype=np.float32)
+        result[5, 5] = 0.96
+        result[15, 15] = 0.99
+        result[25, 25] = 0.98
+
+        ys, xs = find_response_peaks(result, 0.95, peak_distance=2, max_hits=2)
+
+        self.assertEqual(list(zip(ys.tolist(), xs.tolist())), [(15, 15), (25, 25)])
+
+    def test_peaks_reduce_raw_hits_without_changing_matches(self):
+        cv2_image = load_image("9.png")
+        bank = TemplateMatchService.TEMPLATE_REGISTRY.get_bank("table_cards")
+
+        raw, peaks = [], []
+        for compiled in bank:
+            template = compiled.scaled[1.0]
+            raw.extend(find_single_template_matches(cv2_image, template, compiled.name, peak_distance=0))
+            peaks.extend(find_single_template_matches(cv2_image, template, compiled.name))
+
+        self.assertLess(len(peaks), len(raw))
+        self.assertEqual(
+            [(d['template_name'], d['bounding_rect']) for d in filter_overlapping_detections(raw)],
+            [(d['template_name'], d['bounding_rect']) for d in filter_overlapping_detections(peaks)]
+        )
@@ -2,13 +2,24 @@ import re
 import unittest
 
 import cv2
-import pytesseract
+import numpy as np
 from PIL import Image, ImageEnhance, ImageOps
 from loguru import logger
 from matplotlib import pyplot as plt
 
+from table_detector.services.ocr_worker_pool import OcrWorkerPool
+
 
 class TestPytesseract(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ocr = OcrWorkerPool(max_workers=1, timeout=30.0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.ocr.shutdown()
+
     def testPot(self):
         img = Image.open(
             f"Dropbox/data_screenshots/_20250610_023049/_20250610_025342/02_unknown__2_50__5_Pot_Limit_Omaha.png")
@@ -26,7 +37,7 @@ class TestPytesseract(unittest.TestCase):
 
         # OCR with digit whitelist
         config = "--psm 6 -c tessedit_char_whitelist=0123456789.:ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
-        text_full = pytesseract.image_to_string(resized_full, config=config)
+        text_full = self.ocr.image_to_string(np.array(resized_full), config)
 
         logger.info(text_full.strip())
 
@@ -60,7 +71,7 @@ class TestPytesseract(unittest.TestCase):
         config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789.'
 
         # Run OCR
-        data = pytesseract.image_to_data(resized, config=config, output_type=pytesseract.Output.DICT)
+        data = self.ocr.image_to_data(resized, config)
 
         # Filter results with confidence and non-empty text
         for i in range(len(data['text'])):
@@ -80,7 +91,7 @@ class TestPytesseract(unittest.TestCase):
             crop = cv2.bitwise_not(crop)
             _, crop = cv2.threshold(crop, 160, 255, cv2.THRESH_BINARY)
             crop = cv2.resize(crop, None, fx=2, fy=2)
-            text = pytesseract.image_to_string(crop, config=config)
+            text = self.ocr.image_to_string(crop, config)
             logger.info(f"{seat}: {text.strip()}")
 
         # for i in range(len(data['text'])):
@@ -149,7 +160,7 @@ class TestPytesseract(unittest.TestCase):
             "-c tessedit_char_whitelist=0123456789. "
             "-c load_system_dawg=0 -c load_freq_dawg=0"
         )
-        text = pytesseract.image_to_string(dilated, config=config).strip()
+        text = self.ocr.image_to_string(dilated, config).strip()
 
         logger.info("Detected bid:", text)
 
@@ -0,0 +1,74 @@
+import json
+import unittest
+import zlib
+
+from shared.protocol.wire_codec import (
+    DEFLATE_JSON_CONTENT_TYPE,
+    JSON_CONTENT_TYPE,
+    MAX_DECODED_BYTES,
+    WireDecodeError,
+    decode_message,
+    encode_message,
+    negotiate_content_type
+)
+
+CARDS = [{'name': name, 'display': f"{name[0]}♠", 'score': 0.987} for name in ('As', 'Kd', 'Qh', 'Jc')]
+BATCH = {
+    'type': 'batch_update',
+    'client_id': 'client_1',
+    'timestamp': '2026-01-01T12:00:00',
+    'updates': [{
+        'type': 'game_update',
+        'client_id': 'client_1',
+        'window_name': f'Table {index}',
+        'timestamp': '2026-01-01T12:00:00',
+        'game_data': {
+            'player_cards': CARDS,
+            'positions': [{'player': seat, 'player_label': f'Player {seat}', 'name': 'BTN',
+                           'is_main_player': seat == 1} for seat in range(1, 7)],
+            'bids': [{'player': 2, 'amount': 1.5, 'amount_text': '1.5'}],
+            'street': 'flop',
+            'rfi_action': None,
+        },
+        'detection_interval': 3,
+        'version': index,
+    } for index in range(4)],
+    'removals': [],
+}
+
+
+class WireCodecTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        for compress in (True, False):
+            with self.subTest(compress=compress):
+                self.assertEqual(decode_message(encode_message(BATCH, compress=compress)), BATCH)
+
+    def test_compressed_body_is_much_smaller_than_json(self):
+        self.assertLess(len(encode_message(BATCH)) * 5, len(json.dumps(BATCH)))
+
+    def test_rejects_foreign_or_corrupt_bodies(self):
+        payload = encode_message(BATCH)
+        for body in (json.dumps(BATCH).encode(), payload[:2] + b'\x09' + payload[3:], payload[:-5],
+                     payload[:4] + b'garbage', encode_message({}, compress=False)[:4] + b'[1, 2]'):
+            with self.subTest(body=body[:8]):
+                with self.assertRaises(WireDecodeError):
+                    decode_message(body)
+
+    def test_rejects_body_inflating_past_limit(self):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+        bomb = compressor.compress(b' ' * (MAX_DECODED_BYTES + 1)) + compressor.flush()
+        payload = encode_message({}, compress=True)[:4] + bomb
+
+        self.assertLess(len(payload), 64 * 1024)
+        with self.assertRaises(WireDecodeError):
+            decode_message(payload)
+
+    def test_negotiation_prefers_deflate(self):
+        self.assertEqual(negotiate_content_type([JSON_CONTENT_TYPE, DEFLATE_JSON_CONTENT_TYPE]), DEFLATE_JSON_CONTENT_TYPE)
+        self.assertEqual(negotiate_content_type([JSON_CONTENT_TYPE]), JSON_CONTENT_TYPE)
+        self.assertEqual(negotiate_content_type(None), JSON_CONTENT_TYPE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+
+def image_digest(image: np.ndarray) -> bytes:
+    """
+    Fast content hash of an image crop
+
+    Args:
+        image: Any numpy image or crop (non-contiguous views are fine)
+
+    Returns:
+        16 byte blake2b digest of the pixels and the shape
+    """
+    digest = hashlib.blake2b(np.ascontiguousarray(image).data, digest_size=16)
+    digest.update(repr(image.shape).encode())
+    return digest.digest()
+
+
+def sample_frame(frame: np.ndarray, stride: int = 4) -> np.ndarray:
+    """Every stride-th pixel of every stride-th row, as a view (no resize, no copy)"""
+    return frame[::stride, ::stride]
+
+
+def frame_signature(sample: np.ndarray) -> int:
+    """Non-cryptographic CRC32 of a (possibly strided) frame sample"""
+    return zlib.crc32(np.ascontiguousarray(sample).data)
+
+
+class LRUCache:
+    """
+    Thread safe, bounded least-recently-used cache with hit/miss counters.
+
+    Lookups return the caller's default on a miss, so None can be cached as a
+    real value (e.g. "this slot is empty"). With ttl_seconds set, entries older
+    than that count as misses and are dropped on lookup.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: Optional[float] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None \
+                    and time.monotonic() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = self._expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+            }
@@ -9,6 +9,7 @@ from loguru import logger
 
 from shared.domain.detection import Detection
 from table_detector.utils.opencv_utils import coords_to_search_region
+from table_detector.services.card_glyph_service import CardGlyphService
 from table_detector.services.template_matcher_service import TemplateMatchService
 
 # Debug: periodic capture for live tracking (per-table cooldown)
@@ -119,20 +120,24 @@ class DetectUtils:
             h, w = cv2_image.shape[:2]
             NO_RECT = (0, 0, 0, 0)
 
-            # Step 1: detect best badge per seat
-            raw: Dict[int, Detection] = {}
-            for seat in SEAT_STEP_MAP:
-                coords = JUROJIN_POSITION_REGIONS[seat]
-                search_region = coords_to_search_region(
-                    coords['x'], coords['y'], coords['w'], coords['h'],
+            # Step 1: detect best badge per seat, all seats in one matching round
+            seats = list(SEAT_STEP_MAP)
+            search_regions = [
+                coords_to_search_region(
+                    JUROJIN_POSITION_REGIONS[seat]['x'], JUROJIN_POSITION_REGIONS[seat]['y'],
+                    JUROJIN_POSITION_REGIONS[seat]['w'], JUROJIN_POSITION_REGIONS[seat]['h'],
                     image_width=w, image_height=h
                 )
-                try:
-                    matches = TemplateMatchService.find_positions(cv2_image, search_region)
+                for seat in seats
+            ]
+            raw: Dict[int, Detection] = {}
+            try:
+                region_matches = TemplateMatchService.find_positions_in_regions(cv2_image, search_regions)
+                for seat, matches in zip(seats, region_matches):
                     if matches and matches[0].name in VALID_POSITIONS:
                         raw[seat] = matches[0]
-                except Exception as e:
-                    logger.error(f"❌ Seat {seat} error: {e}")
+            except Exception as e:
+                logger.error(f"❌ Seat badge matching error: {e}")
 
             if not raw:
                 return None
@@ -194,16 +199,20 @@ class DetectUtils:
     @staticmethod
     def _detect_native_positions(cv2_image) -> Dict[int, Detection]:
         player_positions = {}
-        for player_num, coords in PLAYER_POSITIONS.items():
-            search_region = coords_to_search_region(coords['x'], coords['y'], coords['w'], coords['h'])
-            try:
-                detected = TemplateMatchService.find_positions(cv2_image, search_region)
-                if detected:
-                    player_positions[player_num] = detected[0]
-                else:
-                    player_positions[player_num] = Detection("NO", None, None, 1)
-            except Exception as e:
-                logger.error(f"❌ Native pos error P{player_num}: {e}")
+        player_nums = list(PLAYER_POSITIONS)
+        search_regions = [
+            coords_to_search_region(coords['x'], coords['y'], coords['w'], coords['h'])
+            for coords in PLAYER_POSITIONS.values()
+        ]
+        try:
+            region_matches = TemplateMatchService.find_positions_in_regions(cv2_image, search_regions)
+            for player_num, matches in zip(player_nums, region_matches):
+                if matches is None:
+                    # Matching failed (already logged): leave the seat out rather than report "no badge"
+                    continue
+                player_positions[player_num] = matches[0] if matches else Detection("NO", None, None, 1)
+        except Exception as e:
+            logger.error(f"❌ Native pos error: {e}")
 
         logger.info("    ✅ Found positions (native):")
         for pn, pos in player_positions.items():
@@ -246,16 +255,27 @@ class DetectUtils:
 
     @staticmethod
     def detect_player_cards(cv2_image) -> List[Detection]:
-        return TemplateMatchService.find_player_cards(cv2_image)
+        detections = CardGlyphService.find_player_cards(cv2_image)
+        if detections is None:
+            logger.debug("Hero card glyphs inconclusive, falling back to card templates")
+            return TemplateMatchService.find_player_cards(cv2_image)
+        return detections
 
     @staticmethod
     def detect_table_cards(cv2_image) -> List[Detection]:
-        return TemplateMatchService.find_table_cards(cv2_image)
+        detections = CardGlyphService.find_table_cards(cv2_image)
+        if detections is None:
+            logger.debug("Board card glyphs inconclusive, falling back to card templates")
+            return TemplateMatchService.find_table_cards(cv2_image)
+        return detections
 
     @staticmethod
-    def get_player_actions_detection(image: np.ndarray) -> Dict[int, List[Detection]]:
+    def get_player_actions_detection(image: np.ndarray, seats=None) -> Dict[int, List[Detection]]:
+        """Detect Jurojin actions for the given seats (all seats by default)"""
         player_actions = {}
         for player_id, region in ACTION_POSITIONS.items():
+            if seats is not None and player_id not in seats:
+                continue
             search_region = coords_to_search_region(
                 x=region[0], y=region[1], w=region[2], h=region[3],
             )
@@ -1,5 +1,5 @@
 import os
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 
 import cv2
 import numpy as np
@@ -56,6 +56,126 @@ def draw_detected_bids(
     return result
 
 
+def is_card_slot_occupied(image: np.ndarray, rect: Tuple[int, int, int, int],
+                          bright_level: int = 200, min_bright_ratio: float = 0.05) -> bool:
+    """
+    Cheap check whether a board slot holds a card
+
+    Card faces have white rank/suit glyphs and borders, while an empty slot is
+    only a thin dashed outline on the felt, so the share of bright pixels
+    separates the two without any template matching.
+    """
+    x, y, w, h = rect
+    region = image[y:y + h, x:x + w]
+    if region.size == 0:
+        return False
+
+    gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY) if region.ndim == 3 else region
+    return np.count_nonzero(gray > bright_level) >= min_bright_ratio * gray.size
+
+
+def glyph_channel(image: np.ndarray) -> np.ndarray:
+    """
+    Single channel in which white card glyphs stand out from any suit background
+
+    The four-colour deck draws white rank/suit glyphs on red, blue, green or grey
+    faces; the per-pixel minimum over BGR is high only for white, so the glyphs
+    look the same whatever the suit colour is.
+    """
+    if image.ndim == 2:
+        return image
+    return np.ascontiguousarray(image.min(axis=2))
+
+
+def _bright_runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """Start/end indices of consecutive True values in a 1-D mask"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.nonzero(edges == 1)[0].tolist(), np.nonzero(edges == -1)[0].tolist()))
+
+
+def extract_corner_glyphs(template: np.ndarray, bright_level: int = 170
+                          ) -> Optional[Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int]]]:
+    """
+    Locate the rank and suit glyphs in the top-left corner of a card template.
+
+    Args:
+        template: Card image (BGR or single channel)
+        bright_level: Glyph pixels are brighter than this in the glyph channel
+
+    Returns:
+        (rank_rect, suit_rect) as (x, y, w, h) inside the template, or None when
+        the corner does not split into a rank and a suit glyph
+    """
+    bright = glyph_channel(template) > bright_level
+    height, width = bright.shape
+
+    # Skip a card border drawn along the left edge
+    left = 0
+    for column in range(width // 4):
+        if bright[:, column].mean() >= 0.6:
+            left = column + 1
+    corner = bright[:, left:left + int(width * 0.4) + 1]
+
+    row_runs = _bright_runs(corner.any(axis=1))
+    if len(row_runs) < 2:
+        return None
+
+    rank_top, rank_bottom = row_runs[0]
+    rank_columns = np.nonzero(corner[rank_top:rank_bottom].any(axis=0))[0]
+    rank_rect = (left + int(rank_columns[0]), rank_top,
+                 int(rank_columns[-1] - rank_columns[0] + 1), rank_bottom - rank_top)
+
+    # The suit pip sits under the rank; cap its height so a large centre pip never merges in
+    suit_top = row_runs[1][0]
+    suit_bottom = min(row_runs[1][1], suit_top + rank_bottom - rank_top)
+    suit_columns = np.nonzero(corner[suit_top:suit_bottom, :rank_columns[-1] + 1].any(axis=0))[0]
+    if len(suit_columns) == 0:
+        return None
+    suit_rect = (left + int(suit_columns[0]), suit_top,
+                 int(suit_columns[-1] - suit_columns[0] + 1), suit_bottom - suit_top)
+
+    return rank_rect, suit_rect
+
+
+def segment_glyphs(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """
+    Split a binarised text line into glyph boxes, left to right.
+
+    Uses 4-connected components, so a decimal point touching a digit only at a
+    corner stays separate; pieces that share columns are merged back into one glyph.
+
+    Returns:
+        (x, y, w, h) per glyph
+    """
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask.astype(np.uint8), connectivity=4)
+    boxes = sorted(
+        (int(x), int(y), int(x + w), int(y + h))
+        for x, y, w, h, _ in stats[1:count]
+    )
+
+    glyphs: List[List[int]] = []
+    for left, top, right, bottom in boxes:
+        if glyphs and left < glyphs[-1][2]:
+            glyph = glyphs[-1]
+            glyph[1], glyph[2], glyph[3] = min(glyph[1], top), max(glyph[2], right), max(glyph[3], bottom)
+        else:
+            glyphs.append([left, top, right, bottom])
+
+    return [(left, top, right - left, bottom - top) for left, top, right, bottom in glyphs]
+
+
+def count_holes(mask: np.ndarray) -> int:
+    """
+    Enclosed background areas of a binarised glyph (0 has one, 8 two, 5 none).
+
+    The background is 4-connected, so a diagonal gap in a stroke does not open a hole.
+    """
+    padded = np.pad(mask.astype(np.uint8), 1)
+    count, _ = cv2.connectedComponents((padded == 0).astype(np.uint8), connectivity=4)
+    # Label 0 is the glyph itself and label 1 the background around it
+    return max(0, count - 2)
+
+
 def coords_to_search_region(x: int, y: int, w: int, h: int,
                             image_width= 784, image_height = 584) -> tuple[float, float, float, float]:
     left = x / image_width
@@ -71,35 +191,73 @@ def coords_to_search_region(x: int, y: int, w: int, h: int,
     return (left, top, right, bottom)
 
 
+# Columns of the match arrays produced by match_template_at_scale
+MATCH_X, MATCH_Y, MATCH_W, MATCH_H, MATCH_SCORE, MATCH_SCALE = range(6)
+MATCH_COLUMNS = 6
+
+
+def find_response_peaks(
+        result: np.ndarray,
+        match_threshold: float,
+        peak_distance: int = 2,
+        max_hits: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find local maxima above threshold in a matchTemplate response map
+
+    A pixel is a peak when no pixel within peak_distance (Chebyshev distance)
+    scores higher, so a blob of near-identical hits around one card collapses
+    to its best location. peak_distance=0 keeps every pixel above threshold.
+
+    Returns:
+        (ys, xs) of the peaks, best max_hits only when a cap is given
+    """
+    mask = result >= match_threshold
+    if peak_distance > 0 and mask.any():
+        kernel = np.ones((2 * peak_distance + 1, 2 * peak_distance + 1), dtype=np.uint8)
+        mask &= result >= cv2.dilate(result, kernel)
+
+    ys, xs = np.nonzero(mask)
+
+    if max_hits is not None and len(ys) > max_hits:
+        best = np.argpartition(-result[ys, xs], max_hits - 1)[:max_hits]
+        best.sort()  # keep row-major order, like np.where
+        ys, xs = ys[best], xs[best]
+
+    return ys, xs
+
+
 def match_template_at_scale(
         search_image: np.ndarray,
         template: np.ndarray,
-        template_name: str,
         scale: float,
         template_w: int,
         template_h: int,
         offset: Tuple[int, int],
         match_threshold: float = 0.955,
         min_card_size: int = 5,
-        match_method: int = cv2.TM_CCORR_NORMED
-) -> List[Dict]:
+        match_method: int = cv2.TM_CCORR_NORMED,
+        peak_distance: int = 2,
+        max_hits: Optional[int] = None
+) -> np.ndarray:
     """
     Perform template matching at a specific scale
 
     Args:
         search_image: Image region to search in
         template: Template image
-        template_name: Name of the template
         scale: Scale factor
         template_w: Template width
         template_h: Template height
         offset: (x, y) offset of search region
         match_threshold: Minimum match score to consider
         min_card_size: Minimum card size in pixels
-        match_method: OpenCV template matching method
+        match_method: OpenCV template matching method (higher score = better match)
+        peak_distance: Minimum distance between two reported hits, 0 reports every pixel over threshold
+        max_hits: Optional cap on the number of hits, best scores first
 
     Returns:
-        List of detection dictionaries
+        (N, MATCH_COLUMNS) float64 array of x, y, width, height, score, scale in image coordinates
     """
     scaled_w = int(template_w * scale)
     scaled_h = int(template_h * scale)
@@ -109,30 +267,42 @@ def match_template_at_scale(
     #         scaled_w > search_image.shape[1] or scaled_h > search_image.shape[0]):
     #     return []
 
-    # Resize template
-    scaled_template = cv2.resize(template, (scaled_w, scaled_h))
+    # Resize template unless it is already at the requested scale (scale 1.0 or a pre-scaled bank entry)
+    if template.shape[1] == scaled_w and template.shape[0] == scaled_h:
+        scaled_template = template
+    else:
+        scaled_template = cv2.resize(template, (scaled_w, scaled_h))
 
     # Perform template matching
     result = cv2.matchTemplate(search_image, scaled_template, match_method)
 
-    # Find all locations where match is above threshold
-    locations = np.where(result >= match_threshold)
-    detections = []
+    # Keep only local maxima above threshold
+    ys, xs = find_response_peaks(result, match_threshold, peak_distance, max_hits)
+
+    matches = np.empty((len(ys), MATCH_COLUMNS), dtype=np.float64)
+    matches[:, MATCH_X] = xs + offset[0]
+    matches[:, MATCH_Y] = ys + offset[1]
+    matches[:, MATCH_W] = scaled_w
+    matches[:, MATCH_H] = scaled_h
+    matches[:, MATCH_SCORE] = result[ys, xs]
+    matches[:, MATCH_SCALE] = scale
 
-    for y, x in zip(*locations):
-        match_score = result[y, x]
-        center_x = x + scaled_w // 2
-        center_y = y + scaled_h // 2
+    return matches
 
-        detection = {
+
+def match_array_to_dicts(matches: np.ndarray, template_name: str,
+                         template_w: int, template_h: int) -> List[Dict]:
+    """Expand a match array into the legacy per-hit detection dictionaries"""
+    detections = []
+    for x, y, w, h, match_score, scale in matches.tolist():
+        x, y, w, h = int(x), int(y), int(w), int(h)
+        detections.append({
             'template_name': template_name,
-            'match_score': float(match_score),
-            'bounding_rect': (x + offset[0], y + offset[1], scaled_w, scaled_h),
-            'center': (center_x + offset[0], center_y + offset[1]),
+            'match_score': match_score,
+            'bounding_rect': (x, y, w, h),
+            'center': (x + w // 2, y + h // 2),
             'scale': scale,
             'template_size': (template_w, template_h),
-            'scaled_size': (scaled_w, scaled_h)
-        }
-        detections.append(detection)
-
-    return detections
\ No newline at end of file
+            'scaled_size': (w, h)
+        })
+    return detections
@@ -1,94 +1,108 @@
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Tuple, Dict
+from dataclasses import dataclass
+from typing import List, Tuple, Dict, Optional
 
 import numpy as np
 from loguru import logger
 
 import cv2
 
-from table_detector.utils.opencv_utils import match_template_at_scale
+from table_detector.utils.opencv_utils import (
+    match_template_at_scale,
+    match_array_to_dicts,
+    MATCH_COLUMNS,
+    MATCH_SCORE,
+    MATCH_X,
+    MATCH_Y,
+    MATCH_W,
+    MATCH_H
+)
 
 
-def find_template_matches_parallel(
+@dataclass(frozen=True)
+class CompiledTemplate:
+    name: str
+    width: int
+    height: int
+    scaled: Dict[float, np.ndarray]  # scale factor -> pre-resized, C-contiguous template
+
+
+def find_single_template_matches(
         image: np.ndarray,
-        templates: Dict[str, np.ndarray],
+        template: np.ndarray,
+        template_name: str,
         search_region: Tuple[float, float, float, float] = None,
         scale_factors: List[float] = None,
         match_threshold: float = 0.955,
         min_card_size: int = 20,
-        max_workers: int = 4,
-        match_method: int = cv2.TM_CCORR_NORMED
+        match_method: int = cv2.TM_CCORR_NORMED,
+        peak_distance: int = 2,
+        max_hits: Optional[int] = None
 ) -> List[Dict]:
-    """
-    Find matches for all templates in the image using parallel execution
-
-    Args:
-        image: Input image
-        templates: Dictionary of template_name -> template_image
-        search_region: (left, top, right, bottom) as ratios of image size
-        scale_factors: List of scale factors to try
-        match_threshold: Minimum match score to consider
-        min_card_size: Minimum card size in pixels
-        max_workers: Maximum number of parallel workers
-
-    Returns:
-        List of detection dictionaries
-    """
     if scale_factors is None:
         scale_factors = [1.0]
 
-    all_detections = []
+    try:
+        detections = []
+        search_image, offset = extract_search_region(image, search_region)
+        template_h, template_w = template.shape[:2]
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all template matching tasks in parallel
-        futures = []
-        for template_name, template in templates.items():
-            future = executor.submit(
-                find_single_template_matches,
-                image, template, template_name,
-                search_region, scale_factors, match_threshold, min_card_size
+        for scale in scale_factors:
+            scale_matches = match_template_at_scale(
+                search_image, template, scale,
+                template_w, template_h, offset, match_threshold, min_card_size,
+                match_method, peak_distance, max_hits
             )
-            futures.append(future)
+            detections.extend(match_array_to_dicts(scale_matches, template_name, template_w, template_h))
 
-        # Collect results
-        for future in futures:
-            detections = future.result()
-            all_detections.extend(detections)
+    except Exception as e:
+        logger.error(f"{e} template name: {template_name}")
+        raise e
 
-    return all_detections
+    return detections
 
 
-def find_single_template_matches(
+def find_compiled_template_matches(
         image: np.ndarray,
-        template: np.ndarray,
-        template_name: str,
+        compiled: CompiledTemplate,
         search_region: Tuple[float, float, float, float] = None,
         scale_factors: List[float] = None,
         match_threshold: float = 0.955,
         min_card_size: int = 20,
-        match_method: int = cv2.TM_CCORR_NORMED
-) -> List[Dict]:
+        match_method: int = cv2.TM_CCORR_NORMED,
+        peak_distance: int = 2,
+        max_hits: Optional[int] = None
+) -> np.ndarray:
+    """
+    Match one TemplateBank entry at every scale using its pre-scaled templates
+
+    Returns:
+        (N, MATCH_COLUMNS) match array, see match_template_at_scale
+    """
     if scale_factors is None:
         scale_factors = [1.0]
 
     try:
-        detections = []
         search_image, offset = extract_search_region(image, search_region)
-        template_h, template_w = template.shape[:2]
 
-        for scale in scale_factors:
-            scale_detections = match_template_at_scale(
-                search_image, template, template_name, scale,
-                template_w, template_h, offset, match_threshold, min_card_size,
-                match_method
+        scale_matches = [
+            match_template_at_scale(
+                search_image, compiled.scaled[scale], scale,
+                compiled.width, compiled.height, offset, match_threshold, min_card_size,
+                match_method, peak_distance, max_hits
             )
-            detections.extend(scale_detections)
+            for scale in scale_factors
+        ]
 
     except Exception as e:
-        logger.error(f"{e} template name: {template_name}")
+        logger.error(f"{e} template name: {compiled.name}")
         raise e
 
-    return detections
+    if len(scale_matches) == 1:
+        return scale_matches[0]
+    matches = np.concatenate(scale_matches) if scale_matches else np.empty((0, MATCH_COLUMNS))
+    if max_hits is not None and len(matches) > max_hits:
+        matches = matches[np.argsort(-matches[:, MATCH_SCORE], kind='stable')[:max_hits]]
+    return matches
 
 
 def extract_search_region(
@@ -110,7 +124,8 @@ def extract_search_region(
 
 def filter_overlapping_detections(
         detections: List[Dict],
-        overlap_threshold: float = 0.3
+        overlap_threshold: float = 0.3,
+        class_aware: bool = False
 ) -> List[Dict]:
     """
     Remove overlapping detections, keeping the ones with highest match scores
@@ -118,22 +133,80 @@ def filter_overlapping_detections(
     Args:
         detections: List of detection dictionaries
         overlap_threshold: Maximum allowed overlap ratio
+        class_aware: Only suppress detections of the same template
 
     Returns:
-        Filtered list of detections
+        Filtered list of detections, highest score first
     """
     if not detections:
         return []
 
-    # Sort by match score (highest first)
-    detections.sort(key=lambda x: x['match_score'], reverse=True)
-    filtered = []
+    boxes = np.array([d['bounding_rect'] for d in detections], dtype=np.int64).reshape(-1, 4)
+    scores = np.array([d['match_score'] for d in detections], dtype=np.float64)
+    class_ids = None
+    if class_aware:
+        names = [d['template_name'] for d in detections]
+        class_ids = np.unique(names, return_inverse=True)[1]
+
+    keep = non_max_suppression(boxes, scores, overlap_threshold, class_ids)
+    return [detections[i] for i in keep]
+
+
+def non_max_suppression(
+        boxes: np.ndarray,
+        scores: np.ndarray,
+        overlap_threshold: float = 0.3,
+        class_ids: np.ndarray = None
+) -> np.ndarray:
+    """
+    Greedy NMS over (x, y, width, height) boxes, vectorised per accepted box
+
+    Gives the same result as accepting detections in descending score order
+    (stable for equal scores) and rejecting any whose IoU with an accepted
+    detection is above overlap_threshold.
+
+    Args:
+        boxes: (N, 4) array of (x, y, width, height)
+        scores: (N,) array of match scores
+        overlap_threshold: Maximum allowed overlap ratio (IoU)
+        class_ids: Optional (N,) array; when given, only boxes of the same class suppress each other
+
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    boxes = np.asarray(boxes, dtype=np.int64)
+    x1 = boxes[:, 0]
+    y1 = boxes[:, 1]
+    x2 = x1 + boxes[:, 2]
+    y2 = y1 + boxes[:, 3]
+    areas = boxes[:, 2] * boxes[:, 3]
+
+    order = np.argsort(-np.asarray(scores, dtype=np.float64), kind='stable')
+    keep = []
 
-    for detection in detections:
-        if not overlaps_with_existing(detection, filtered, overlap_threshold):
-            filtered.append(detection)
+    while order.size > 0:
+        current = order[0]
+        keep.append(current)
+        rest = order[1:]
 
-    return filtered
+        x_overlap = np.maximum(0, np.minimum(x2[current], x2[rest]) - np.maximum(x1[current], x1[rest]))
+        y_overlap = np.maximum(0, np.minimum(y2[current], y2[rest]) - np.maximum(y1[current], y1[rest]))
+        intersection = x_overlap * y_overlap
+        union = areas[current] + areas[rest] - intersection
+
+        iou = np.zeros(rest.shape, dtype=np.float64)
+        np.divide(intersection, union, out=iou, where=(intersection > 0) & (union > 0))
+
+        suppressed = iou > overlap_threshold
+        if class_ids is not None:
+            suppressed &= class_ids[rest] == class_ids[current]
+
+        order = rest[~suppressed]
+
+    return np.array(keep, dtype=np.intp)
 
 
 def overlaps_with_existing(
@@ -194,6 +267,33 @@ def calculate_overlap_ratio(
     return intersection_area / union_area if union_area > 0 else 0.0
 
 
+def sort_match_indices(
+        matches: np.ndarray,
+        indices: np.ndarray,
+        sort_by: str = 'x'
+) -> np.ndarray:
+    """
+    Order match array rows the same way sort_detections_by_position orders dictionaries
+
+    Args:
+        matches: (N, MATCH_COLUMNS) match array
+        indices: Rows to order (e.g. NMS survivors, highest score first)
+        sort_by: 'x', 'y' (by box center, stable) or 'score'
+
+    Returns:
+        Reordered indices
+    """
+    if sort_by == 'score':
+        return indices[np.argsort(-matches[indices, MATCH_SCORE], kind='stable')]
+    elif sort_by == 'x':
+        centers = matches[indices, MATCH_X] + matches[indices, MATCH_W] // 2
+    elif sort_by == 'y':
+        centers = matches[indices, MATCH_Y] + matches[indices, MATCH_H] // 2
+    else:
+        raise ValueError(f"Invalid sort_by value: {sort_by}")
+    return indices[np.argsort(centers, kind='stable')]
+
+
 def sort_detections_by_position(
         detections: List[Dict],
         sort_by: str = 'x'